@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('app.py', '.'), ('config.py', '.'), ('optimizer.py', '.'), ('excel_handler.py', '.')]
+datas = [('app.py', '.'), ('config.py', '.'), ('optimizer.py', '.'), ('excel_handler.py', '.'), ('remnant_store.py', '.'), ('patterns.py', '.'), ('bounds.py', '.'), ('fitscan.py', '.'), ('scoring.py', '.'), ('profiling.py', '.'), ('saw_schedule.py', '.'), ('objective.py', '.'), ('orders.py', '.'), ('online.py', '.'), ('job_store.py', '.'), ('serialization.py', '.'), ('table_io.py', '.'), ('ingest.py', '.'), ('validation.py', '.')]
 binaries = []
 hiddenimports = ['streamlit', 'streamlit.web.cli', 'streamlit.runtime.scriptrunner.magic_funcs', 'pandas', 'openpyxl', 'plotly', 'plotly.graph_objects', 'plotly.express', 'altair', 'PIL', 'PIL.Image', 'packaging', 'packaging.version', 'packaging.specifiers', 'packaging.requirements', 'pyarrow', 'tornado', 'tornado.web', 'click', 'validators', 'watchdog']
 tmp_ret = collect_all('streamlit')
@@ -2,19 +2,31 @@
 Streamlit web interface for cutting optimization application.
 """
 import streamlit as st
-import pandas as pd
 from pathlib import Path
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import io
+import json
+import math
+import uuid
 
-from optimizer import CuttingOptimizer, Cut, Bar
+from optimizer import CuttingOptimizer, Bar, DemandLine, optimize_demand_profiled
 from excel_handler import ExcelHandler
-from config import DEFAULT_BAR_LENGTH
+from remnant_store import RemnantStore
+from job_store import JobStore
+from patterns import group_bars_by_pattern
+import ingest
+import profiling
+import table_io
+from config import (
+    DEFAULT_BAR_LENGTH, REMNANT_MIN_LENGTH, STOCK_LENGTHS, STOCK_SHEET_NAME,
+    APP_CACHE_TTL, APP_CACHE_MAX_ENTRIES, APP_WORKERS
+)
 import random
 
 
-def create_bar_visualization(bar: Bar, bar_length: float, material_name: str = ""):
+def create_bar_visualization(bar: Bar, material_name: str = ""):
     """Create a visual representation of a single bar with its cuts."""
     
     # Generate consistent colors for different cut lengths
@@ -26,6 +38,7 @@ def create_bar_visualization(bar: Bar, bar_length: float, material_name: str = "
     # Create SVG visualization
     height = 80
     width = 800
+    bar_length = bar.bar_length  # Remnants can be shorter than the standard bar
     scale = width / bar_length
     
     svg = f'<svg width="{width}" height="{height}" style="border: 1px solid #ddd; border-radius: 4px; background: #f8f9fa;">'
@@ -69,6 +82,8 @@ def create_bar_visualization(bar: Bar, bar_length: float, material_name: str = "
     
     # Add bar info
     info_text = f"Stange {bar.bar_number}: {len(bar.cuts)} Schnitte | "
+    if bar.remnant_id is not None:
+        info_text = f"Stange {bar.bar_number} (Reststück #{bar.remnant_id}): {len(bar.cuts)} Schnitte | "
     info_text += f"Genutzt: {bar.total_used:.0f}mm ({bar.efficiency:.1f}%) | "
     info_text += f"Rest: {bar.waste:.0f}mm"
     svg += f'<text x="{width/2}" y="8" font-size="11" fill="#333" text-anchor="middle" font-weight="bold">{info_text}</text>'
@@ -80,6 +95,8 @@ def create_bar_visualization(bar: Bar, bar_length: float, material_name: str = "
 
 def create_efficiency_chart(results: dict):
     """Create a bar chart showing efficiency by material."""
+    import plotly.graph_objects as go
+    
     materials = []
     efficiencies = []
     bar_counts = []
@@ -117,6 +134,8 @@ def create_efficiency_chart(results: dict):
 
 def create_waste_chart(results: dict):
     """Create a bar chart showing total waste by material."""
+    import plotly.graph_objects as go
+    
     materials = []
     wastes = []
     
@@ -147,6 +166,352 @@ def create_waste_chart(results: dict):
     return fig
 
 
+# Caches: upload -> demand, (demand, parameters) -> results, results -> charts
+# and exports. Results are identified by a key (hash of demand and parameters),
+# so the cached chart and export functions never hash the Bar objects.
+# Uploads and exports stay in memory; nothing is written to the working
+# directory, so concurrent sessions cannot overwrite each other's files.
+
+@st.cache_resource
+def solver_pool() -> ProcessPoolExecutor:
+    """Solver processes shared by all sessions, so optimizations of several sessions run in parallel."""
+    return ProcessPoolExecutor(max_workers=APP_WORKERS)
+
+
+@st.cache_resource
+def pdf_styles():
+    """PDF paragraph styles, built once per server process."""
+    from pdf_generator import build_styles
+    return build_styles()
+
+
+@st.cache_resource
+def job_store() -> JobStore:
+    """Job history shared by all sessions."""
+    return JobStore()
+
+
+def remember_job(demand: tuple, params: dict, results: dict):
+    """Store a finished run in the job history, with the stage timings so far."""
+    profiler = profiling.active()
+    job_store().save(demand, params, results, timings=profiler.report() if profiler is not None else None)
+
+
+@st.cache_data(max_entries=APP_CACHE_MAX_ENTRIES, ttl=APP_CACHE_TTL, show_spinner=False)
+def load_demand(files: tuple) -> tuple:
+    """
+    Parse uploaded Stücklisten (Excel, CSV or Parquet) into one set of demand lines.
+
+    Args:
+        files: Tuples (file name, file content); all sheets matching
+               INPUT_SHEET_PATTERN are read, pieces are tagged with their
+               file and/or sheet if there are several
+
+    Returns:
+        Tuple (demand lines, stock lengths of the stock sheets of the
+        workbooks, SheetInfo with validation report per sheet)
+
+    Raises:
+        ValueError: If a workbook has no sheet matching INPUT_SHEET_PATTERN
+    """
+    demand, sheets = ingest.ingest(list(files), workers=1)
+    stock_lengths = {}
+    for file_name, file_bytes in files:
+        if table_io.file_format(file_name) == 'excel':
+            stock_lengths.update(ExcelHandler.read_stock_lengths(io.BytesIO(file_bytes)))
+    return tuple(demand), stock_lengths, tuple(sheets)
+
+
+@st.cache_data(show_spinner=False)
+def example_input() -> bytes:
+    """Example Stückliste as workbook bytes (the same for all sessions)."""
+    buffer = io.BytesIO()
+    ExcelHandler.create_example_input(buffer)
+    return buffer.getvalue()
+
+
+def solve(demand: tuple, params: dict, remnant_store: RemnantStore = None) -> dict:
+    """Optimize demand lines with the sidebar parameters in the solver pool."""
+    options = dict(params)
+    multiplier = options.pop('multiplier')
+    results, report = solver_pool().submit(
+        optimize_demand_profiled, demand, multiplier, remnant_store=remnant_store, **options
+    ).result()
+    
+    # Stage timings of the worker go to the session's profiler
+    profiler = profiling.active()
+    if profiler is not None:
+        profiler.merge(report)
+    return results
+
+
+@st.cache_data(max_entries=APP_CACHE_MAX_ENTRIES, ttl=APP_CACHE_TTL, show_spinner=False)
+def solve_cached(demand: tuple, params: dict) -> tuple:
+    """
+    solve() for runs without the remnant inventory, cached per demand and
+    parameters. A job of the current solver version with the same demand and
+    parameters in the job history is reopened instead of solved again (e.g.
+    after a server restart).
+    
+    Returns:
+        Tuple (results, ID of the reopened history job or None if solved)
+    """
+    job_id = job_store().find(demand, params)
+    if job_id is not None:
+        return job_store().load(job_id).results, job_id
+    results = solve(demand, params)
+    remember_job(demand, params, results)
+    return results, None
+
+
+def run_optimization(demand: tuple, params: dict, remnant_store: RemnantStore = None,
+                     reuse_history: bool = True) -> tuple:
+    """
+    Optimize through the result cache.
+    
+    Runs with the remnant inventory book remnants in and out, so they are
+    never cached and get a key of their own; so do runs with reuse_history
+    off, which always solve again.
+    
+    Returns:
+        Tuple (results key, results, ID of the reused history job or None)
+    """
+    if remnant_store is not None or not reuse_history:
+        results = solve(demand, params, remnant_store)
+        remember_job(demand, params, results)
+        return uuid.uuid4().hex, results, None
+    key = hashlib.sha256(repr((demand, sorted(params.items()))).encode('utf-8')).hexdigest()
+    return (key, *solve_cached(demand, params))
+
+
+def show_reused_job(job_id: int):
+    """Note that a result was taken from the job history instead of solved."""
+    if job_id is not None:
+        st.info(f"🗂️ Ergebnis aus dem Auftragsverlauf übernommen (Auftrag #{job_id}). "
+                "Für eine neue Berechnung „Ergebnisse aus dem Verlauf wiederverwenden“ in den "
+                "Einstellungen abwählen.")
+
+
+@st.cache_data(max_entries=APP_CACHE_MAX_ENTRIES, ttl=APP_CACHE_TTL, show_spinner=False)
+def cached_charts(results_key: str, _results: dict) -> tuple:
+    """Efficiency and waste chart of a result."""
+    return create_efficiency_chart(_results), create_waste_chart(_results)
+
+
+@st.cache_data(max_entries=APP_CACHE_MAX_ENTRIES, ttl=APP_CACHE_TTL, show_spinner=False)
+def cached_exports(results_key: str, _results: dict, bar_length: float, kerf: float, algorithm: str) -> dict:
+    """Excel files (formatted and structured) and both PDF plans of a result as bytes."""
+    from pdf_generator import WorkPlanPDFGenerator
+    
+    buffer = io.BytesIO()
+    ExcelHandler.write_results_to_excel(_results, buffer, bar_length)
+    structured = io.BytesIO()
+    ExcelHandler.write_structured_results(_results, structured)
+    pdf_gen = WorkPlanPDFGenerator(_results, bar_length, kerf, algorithm, styles=pdf_styles())
+    return {
+        'excel': buffer.getvalue(),
+        'excel_structured': structured.getvalue(),
+        'pdf_compact': pdf_gen.generate_compact_plan(),
+        'pdf_visual': pdf_gen.generate_visual_plan(),
+    }
+
+
+def display_job_history():
+    """Past jobs: reopen one without solving, compare two, waste trend per material."""
+    import pandas as pd
+    
+    store = job_store()
+    jobs = store.list_jobs(limit=50)
+    if not jobs:
+        st.caption("Noch keine gespeicherten Optimierungen.")
+        return
+    
+    labels = {info.job_id: f"#{info.job_id} · {info.created_at.replace('T', ' ')} · "
+                           f"{info.total_bars} Stangen · {info.total_waste:.0f} mm Verschnitt"
+              for info in jobs}
+    ids = list(labels)
+    col1, col2 = st.columns(2)
+    selected = col1.selectbox("Auftrag", ids, format_func=labels.get, key='history_job')
+    if col1.button("📂 Öffnen", use_container_width=True):
+        job = store.load(selected)
+        st.session_state['results'] = job.results
+        st.session_state['results_key'] = f"job-{selected}"
+        for key in ('bar_length', 'multiplier', 'algorithm', 'kerf'):
+            st.session_state[key] = job.params.get(key)
+        if job.timings:
+            st.session_state['profile'] = job.timings
+        st.rerun()
+    
+    other = col2.selectbox("Vergleichen mit", ids, index=min(1, len(ids) - 1), format_func=labels.get,
+                           key='history_other')
+    if other != selected:
+        diff = store.diff(other, selected)
+        if diff['params']:
+            col2.caption("Geänderte Parameter: " + ", ".join(
+                f"{key}: {a} → {b}" for key, (a, b) in diff['params'].items()))
+        col2.dataframe(pd.DataFrame([
+            {'Material': code, 'Stangen': f"{values['bars'][0]} → {values['bars'][1]}",
+             'Schnitte': f"{values['cuts'][0]} → {values['cuts'][1]}",
+             'Verschnitt (mm)': f"{values['waste'][0]:.0f} → {values['waste'][1]:.0f}"}
+            for code, values in diff['materials'].items()
+        ]), use_container_width=True, hide_index=True)
+    
+    trend = store.trend(period='month')
+    if trend:
+        st.caption("Verschnitt pro Material und Monat")
+        st.dataframe(pd.DataFrame(trend).pivot(index='period', columns='material_code', values='waste_percent')
+                     .round(1), use_container_width=True)
+
+
+def display_profile(report: dict):
+    """Show stage timings and counters of the last run (Performance panel)."""
+    import pandas as pd
+    
+    stages = report['stages']
+    total = report['total_seconds'] or 1.0
+    st.caption(f"Gesamtzeit: {report['total_seconds'] * 1000:.0f} ms (Stufen können verschachtelt sein)")
+    st.dataframe(pd.DataFrame([{
+        'Stufe': s['name'],
+        'Aufrufe': s['calls'],
+        'Zeit (ms)': round(s['seconds'] * 1000, 1),
+        'Anteil': f"{s['seconds'] / total * 100:.1f}%"
+    } for s in stages]), use_container_width=True, hide_index=True)
+    
+    counters = report['counters']
+    labels = {'cuts_placed': "Platzierte Schnitte", 'bars_scanned': "Geprüfte Stangen", 'fit_checks': "Passt-Prüfungen"}
+    cols = st.columns(len(labels))
+    for col, (key, label) in zip(cols, labels.items()):
+        col.metric(label, f"{counters.get(key, 0):,}".replace(',', '.'))
+    
+    st.download_button(
+        label="⬇️ Profil als JSON",
+        data=json.dumps(report, indent=2),
+        file_name=f"profil_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
+        mime="application/json"
+    )
+
+
+def display_results(results: dict, bar_length: float, kerf: float, algorithm: str, results_key: str):
+    """Show optimization results per material and the export options."""
+    import pandas as pd
+    
+    st.header("🎯 Ergebnisse")
+    
+    for material_code, data in results.items():
+        with st.expander(f"**{material_code}** - {data['name']}", expanded=True):
+            bars = data['bars']
+            
+            # Statistics
+            col1, col2, col3, col4, col5 = st.columns(5)
+            
+            stats = CuttingOptimizer.calculate_statistics(bars, data.get('lower_bound'))
+            
+            col1.metric("Stangen", stats['total_bars'])
+            col2.metric("Schnitte", stats['total_cuts'])
+            col3.metric("Verschnitt", f"{stats['total_waste']:.0f} mm")
+            col4.metric("Ø Effizienz", f"{stats['average_efficiency']:.1f}%")
+            if 'lower_bound' in stats:
+                col5.metric(
+                    "Untere Schranke",
+                    stats['lower_bound'],
+                    delta="optimal" if stats['proven_optimal'] else f"+{stats['gap_bars']} Stangen",
+                    delta_color="off" if stats['proven_optimal'] else "inverse",
+                    help="Mindestens benötigte Stangen (Martello-Toth-Schranke). "
+                         "Der Abstand zeigt, wie viele Stangen höchstens noch einzusparen wären."
+                )
+            
+            # Identical bars grouped as cutting patterns
+            pattern_groups = group_bars_by_pattern(bars)
+            if len(pattern_groups) < len(bars):
+                st.markdown(f"**🧩 Schnittmuster ({len(pattern_groups)} verschiedene):**")
+                pattern_data = []
+                for pattern_cuts, pattern_bars in pattern_groups:
+                    pattern_data.append({
+                        'Anzahl': len(pattern_bars),
+                        'Schnitte': ' / '.join(f"{c:.0f}" for c in pattern_cuts),
+                        'Länge': f"{pattern_bars[0].bar_length:.0f} mm",
+                        'Rest': f"{pattern_bars[0].waste:.0f} mm",
+                        'Stangen': ', '.join(str(bar.bar_number) for bar in pattern_bars)
+                    })
+                st.dataframe(pd.DataFrame(pattern_data), use_container_width=True, hide_index=True)
+            
+            # Visual representation of bars
+            st.markdown("**📊 Visuelle Darstellung der Schnitte:**")
+            with profiling.stage('app.visualization'):
+                for bar in bars[:10]:  # Show first 10 bars
+                    st.markdown(create_bar_visualization(bar, data['name']), unsafe_allow_html=True)
+                    st.markdown("<br>", unsafe_allow_html=True)
+            
+            if len(bars) > 10:
+                st.info(f"ℹ️ {len(bars) - 10} weitere Stangen nicht visualisiert (siehe Tabelle unten)")
+            
+            # Bar details table
+            bar_data = []
+            for bar in bars:
+                bar_data.append({
+                    'Stange': bar.bar_number,
+                    'Herkunft': f"Reststück #{bar.remnant_id}" if bar.remnant_id is not None else "Neu",
+                    'Länge': f"{bar.bar_length:.0f} mm",
+                    'Schnitte': ' / '.join(f"{c:.1f}" for c in bar.cuts),
+                    'Anzahl': len(bar.cuts),
+                    'Gesamt': f"{bar.total_used:.1f} mm",
+                    'Rest': f"{bar.waste:.1f} mm",
+                    'Effizienz': f"{bar.efficiency:.1f}%"
+                })
+            
+            st.dataframe(pd.DataFrame(bar_data), use_container_width=True)
+    
+    # Export results
+    st.markdown("---")
+    st.subheader("📥 Export-Optionen")
+    
+    exports = cached_exports(results_key, results, bar_length, kerf, algorithm)
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # Excel Export
+    with col1:
+        st.download_button(
+            label="📊 Excel herunterladen",
+            data=exports['excel'],
+            file_name="zuschnitt_optimiert.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True
+        )
+    
+    # PDF Export - Compact
+    with col2:
+        st.download_button(
+            label="📄 PDF Kompakt",
+            data=exports['pdf_compact'],
+            file_name=f"arbeitsplan_kompakt_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+            mime="application/pdf",
+            use_container_width=True,
+            help="Kompakter Arbeitsplan - 1 Seite pro Material"
+        )
+    
+    # PDF Export - Visual
+    with col3:
+        st.download_button(
+            label="📋 PDF Visuell",
+            data=exports['pdf_visual'],
+            file_name=f"arbeitsplan_visuell_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
+            mime="application/pdf",
+            use_container_width=True,
+            help="Visueller Arbeitsplan mit Grafiken und Checklisten"
+        )
+    
+    # Excel Export - numeric tables for other tools
+    with col4:
+        st.download_button(
+            label="🔢 Excel Daten",
+            data=exports['excel_structured'],
+            file_name="zuschnitt_daten.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True,
+            help="Tabellen mit Zahlenzellen: Materialien, Muster (mit Anzahl) und alle Schnitte"
+        )
+
+
 def main():
     st.set_page_config(
         page_title="Zuschnittoptimierung",
@@ -162,12 +527,14 @@ def main():
     
     algorithm = st.sidebar.selectbox(
         "Algorithmus",
-        options=['BFD', 'FFD', 'Heuristic'],
+        options=['BFD', 'FFD', 'Heuristic', 'Pattern', 'Multi'],
         index=0,
         help="""Wählen Sie den Optimierungsalgorithmus:
         • BFD: Best Fit Decreasing - Beste Materialausnutzung
         • FFD: First Fit Decreasing - Schnellste Berechnung
-        • Heuristic: Intelligente Kombination - Ausgewogene Lösung"""
+        • Heuristic: Intelligente Kombination - Ausgewogene Lösung
+        • Pattern: Schnittmuster-Tabelle - Stark bei Serien mit wenigen Längen
+        • Multi: Alle Verfahren - Beste Abwägung aus Stangen, Schnittverlust und Schnitten"""
     )
     
     bar_length = st.sidebar.number_input(
@@ -197,6 +564,78 @@ def main():
         help="Alle Mengen mit diesem Faktor multiplizieren (z.B. 3 für 3-fache Menge)"
     )
     
+    use_multi_stock = st.sidebar.checkbox(
+        "📐 Mehrere Stangenlängen",
+        value=False,
+        help=f"""Wählt pro Stange die passende Lagerlänge (z.B. 6000/6500/12000 mm).
+        Materialspezifische Längen kommen aus config.py oder dem Blatt '{STOCK_SHEET_NAME}' der Excel-Datei."""
+    )
+    
+    stock_lengths = None
+    stock_objective = 'material'
+    stock_lengths_valid = True  # False: invalid input, no optimization until corrected
+    if use_multi_stock:
+        default_lengths = ", ".join(f"{length:.0f}" for length, _ in STOCK_LENGTHS.get('default', []))
+        stock_text = st.sidebar.text_input(
+            "Lagerlängen (mm)",
+            value=default_lengths,
+            help="Kommagetrennte Längen für alle Materialien ohne eigene Definition"
+        )
+        stock_objective = st.sidebar.radio(
+            "Optimierungsziel",
+            options=['material', 'cost'],
+            format_func=lambda option: "Materialmenge" if option == 'material' else "Kosten",
+            horizontal=True
+        )
+        
+        stock_lengths = dict(STOCK_LENGTHS)
+        try:
+            lengths = [float(value) for value in stock_text.split(',') if value.strip()]
+        except ValueError:
+            lengths = None
+        if not lengths or any(not (math.isfinite(length) and length > 0) for length in lengths):
+            # Never fall back to lengths the user did not enter
+            stock_lengths_valid = False
+            st.sidebar.error("⚠️ Ungültige Lagerlängen: bitte positive, endliche Längen in mm, "
+                             "durch Komma getrennt, eingeben (z.B. 6000, 6500, 12000)")
+        else:
+            stock_lengths['default'] = [(length, None) for length in lengths]
+    
+    use_remnants = st.sidebar.checkbox(
+        "♻️ Reststücklager verwenden",
+        value=False,
+        help=f"""Gelagerte Reststücke werden vor neuen Stangen verplant.
+        Verbrauchte Reststücke werden ausgebucht, neue Reststücke ab {REMNANT_MIN_LENGTH} mm eingelagert."""
+    )
+    
+    remnant_store = None
+    if use_remnants:
+        remnant_store = RemnantStore()
+        inventory = remnant_store.summary()
+        if inventory:
+            st.sidebar.caption("Lagerbestand: " + ", ".join(
+                f"{code}: {info['count']} Stk." for code, info in inventory.items()
+            ))
+        else:
+            st.sidebar.caption("Lagerbestand: keine Reststücke")
+    
+    reuse_history = st.sidebar.checkbox(
+        "🗂️ Ergebnisse aus dem Verlauf wiederverwenden",
+        value=True,
+        help="""Gleiche Stückliste und Einstellungen werden aus dem Auftragsverlauf geöffnet statt neu berechnet.
+        Abwählen, um neu zu berechnen."""
+    )
+    
+    # Parameters of the optimization (part of the result cache key)
+    optimization_params = {
+        'bar_length': bar_length,
+        'algorithm': algorithm,
+        'kerf': kerf,
+        'multiplier': multiplier,
+        'stock_lengths': stock_lengths,
+        'stock_objective': stock_objective,
+    }
+    
     # Main content
     tab1, tab2, tab3, tab4 = st.tabs(["📝 Manuelle Eingabe", "📤 Excel Upload", "📊 Statistiken", "ℹ️ Hilfe"])
     
@@ -277,6 +716,7 @@ def main():
             st.subheader(f"📋 Aktuelle Schnittliste ({len(st.session_state['manual_entries'])} Einträge)")
             
             # Create DataFrame for display
+            import pandas as pd
             df_entries = pd.DataFrame(st.session_state['manual_entries'])
             
             # Add delete buttons
@@ -331,121 +771,32 @@ def main():
             st.markdown("---")
             
             # Optimize button
-            if st.button("🚀 Optimierung starten", type="primary", use_container_width=True):
-                with st.spinner(f"Optimierung läuft ({algorithm})..."):
-                    # Convert manual entries to Cut objects
-                    cuts = []
-                    for entry in st.session_state['manual_entries']:
-                        for _ in range(entry['Anzahl']):
-                            cuts.append(Cut(
-                                length=float(entry['Länge (mm)']),
-                                material_code=entry['Material'],
-                                material_name=entry['Materialname']
-                            ))
-                    
-                    optimizer = CuttingOptimizer(bar_length=bar_length, algorithm=algorithm, kerf=kerf)
-                    results = optimizer.optimize_by_material(cuts, multiplier=multiplier)
+            if st.button("🚀 Optimierung starten", type="primary", use_container_width=True,
+                         disabled=not stock_lengths_valid):
+                profiler = profiling.Profiler()
+                with st.spinner(f"Optimierung läuft ({algorithm})..."), profiling.profile(profiler):
+                    # Manual entries are demand lines already
+                    demand = tuple(
+                        DemandLine(float(entry['Länge (mm)']), int(entry['Anzahl']), entry['Material'], entry['Materialname'])
+                        for entry in st.session_state['manual_entries']
+                    )
+                    results_key, results, reused_job = run_optimization(demand, optimization_params,
+                                                                        remnant_store, reuse_history)
                     
                     # Store in session state
                     st.session_state['results'] = results
+                    st.session_state['results_key'] = results_key
                     st.session_state['bar_length'] = bar_length
                     st.session_state['multiplier'] = multiplier
                     st.session_state['algorithm'] = algorithm
                     st.session_state['kerf'] = kerf
                 
                 st.success(f"✅ Optimierung abgeschlossen mit {algorithm}!")
+                show_reused_job(reused_job)
                 
-                # Display results (same as Excel upload)
-                st.header("🎯 Ergebnisse")
-                
-                for material_code, data in results.items():
-                    with st.expander(f"**{material_code}** - {data['name']}", expanded=True):
-                        bars = data['bars']
-                        
-                        # Statistics
-                        col1, col2, col3, col4 = st.columns(4)
-                        
-                        total_bars = len(bars)
-                        total_cuts = sum(len(bar.cuts) for bar in bars)
-                        total_waste = sum(bar.waste for bar in bars)
-                        avg_efficiency = sum(bar.efficiency for bar in bars) / len(bars) if bars else 0
-                        
-                        col1.metric("Stangen", total_bars)
-                        col2.metric("Schnitte", total_cuts)
-                        col3.metric("Verschnitt", f"{total_waste:.0f} mm")
-                        col4.metric("Ø Effizienz", f"{avg_efficiency:.1f}%")
-                        
-                        # Visual representation of bars
-                        st.markdown("**📊 Visuelle Darstellung der Schnitte:**")
-                        for bar in bars[:10]:  # Show first 10 bars
-                            st.markdown(create_bar_visualization(bar, bar_length, data['name']), unsafe_allow_html=True)
-                            st.markdown("<br>", unsafe_allow_html=True)
-                        
-                        if len(bars) > 10:
-                            st.info(f"ℹ️ {len(bars) - 10} weitere Stangen nicht visualisiert (siehe Tabelle unten)")
-                        
-                        # Bar details table
-                        bar_data = []
-                        for bar in bars:
-                            bar_data.append({
-                                'Stange': bar.bar_number,
-                                'Schnitte': ' / '.join(f"{c:.1f}" for c in bar.cuts),
-                                'Anzahl': len(bar.cuts),
-                                'Gesamt': f"{bar.total_used:.1f} mm",
-                                'Rest': f"{bar.waste:.1f} mm",
-                                'Effizienz': f"{bar.efficiency:.1f}%"
-                            })
-                        
-                        st.dataframe(pd.DataFrame(bar_data), use_container_width=True)
-                
-                # Export results
-                st.markdown("---")
-                st.subheader("📥 Export-Optionen")
-                
-                col1, col2, col3 = st.columns(3)
-                
-                # Excel Export
-                with col1:
-                    output_path = "zuschnitt_optimiert.xlsx"
-                    ExcelHandler.write_results_to_excel(results, output_path, bar_length)
-                    
-                    with open(output_path, "rb") as file:
-                        st.download_button(
-                            label="📊 Excel herunterladen",
-                            data=file,
-                            file_name="zuschnitt_optimiert.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
-                
-                # PDF Export - Compact
-                with col2:
-                    from pdf_generator import WorkPlanPDFGenerator
-                    
-                    pdf_gen = WorkPlanPDFGenerator(results, bar_length, kerf, algorithm)
-                    pdf_compact = pdf_gen.generate_compact_plan()
-                    
-                    st.download_button(
-                        label="📄 PDF Kompakt",
-                        data=pdf_compact,
-                        file_name=f"arbeitsplan_kompakt_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True,
-                        help="Kompakter Arbeitsplan - 1 Seite pro Material"
-                    )
-                
-                # PDF Export - Visual
-                with col3:
-                    pdf_visual = pdf_gen.generate_visual_plan()
-                    
-                    st.download_button(
-                        label="📋 PDF Visuell",
-                        data=pdf_visual,
-                        file_name=f"arbeitsplan_visuell_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True,
-                        help="Visueller Arbeitsplan mit Grafiken und Checklisten"
-                    )
+                with profiling.profile(profiler):
+                    display_results(results, bar_length, kerf, algorithm, results_key)
+                st.session_state['profile'] = profiler.report()
         
         else:
             st.info("👆 Fügen Sie Schnitte zur Liste hinzu, um mit der Optimierung zu beginnen.")
@@ -468,7 +819,12 @@ def main():
     with tab2:
         st.header("Excel-Datei hochladen")
         st.markdown("""
-        Laden Sie eine Excel-Datei mit folgender Struktur hoch:
+        Laden Sie eine Excel-, CSV- oder Parquet-Datei mit den Spalten
+        **Länge**, **Anzahl**, **Material** und **Materialname** hoch.
+        Die Kopfzeile wird am Namen erkannt (auch Menge, Stück, Werkstoff,
+        Bezeichnung, ...), die Reihenfolge ist beliebig. Eine Einheit in der
+        Kopfzeile („Länge [cm]“, „Länge in m“) oder eine Spalte **Einheit**
+        rechnet die Längen in mm um. Ohne erkannte Kopfzeile gilt:
         - **Spalte A:** Länge (mm)
         - **Spalte B:** Anzahl
         - **Spalte C:** Materialcode
@@ -478,169 +834,122 @@ def main():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            uploaded_file = st.file_uploader(
-                "Wählen Sie eine Excel-Datei",
-                type=['xlsx', 'xls'],
-                help="Das Blatt muss 'Stueckliste' heißen"
+            uploaded_files = st.file_uploader(
+                "Wählen Sie eine oder mehrere Stücklisten",
+                type=['xlsx', 'xls', 'csv', 'parquet'],
+                accept_multiple_files=True,
+                help="Excel: Alle Blätter, deren Name mit 'Stueckliste' beginnt (z.B. eines pro Baugruppe). "
+                     "CSV: Trennzeichen , ; oder Tab (bei ; und Tab mit Dezimalkomma). "
+                     "Mehrere Dateien oder Blätter werden gemeinsam optimiert und je Datei/Blatt ausgewiesen."
             )
         
         with col2:
             if st.button("📄 Beispieldatei erstellen", use_container_width=True):
                 try:
-                    ExcelHandler.create_example_input("example_input.xlsx")
+                    example = example_input()
                     st.success("✅ Beispieldatei 'example_input.xlsx' erstellt!")
-                    with open("example_input.xlsx", "rb") as file:
-                        st.download_button(
-                            label="⬇️ Beispiel herunterladen",
-                            data=file,
-                            file_name="example_input.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
+                    st.download_button(
+                        label="⬇️ Beispiel herunterladen",
+                        data=example,
+                        file_name="example_input.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True
+                    )
                 except Exception as e:
                     st.error(f"❌ Fehler: {str(e)}")
         
-        if uploaded_file is not None:
+        if uploaded_files:
             try:
-                # Save uploaded file temporarily
-                temp_path = "temp_input.xlsx"
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                # Read demand (parsed once per uploaded file content)
+                profiler = profiling.Profiler()
+                with st.spinner("Daten werden gelesen..."), profiling.profile(profiler):
+                    demand, file_stock_lengths, sheets = load_demand(
+                        tuple((uploaded.name, uploaded.getvalue()) for uploaded in uploaded_files))
+                    if use_multi_stock:
+                        # Stock lengths from the workbook override the sidebar/config
+                        optimization_params['stock_lengths'] = {**stock_lengths, **file_stock_lengths}
+                
+                # Pieces and total length per material, from the demand lines
+                material_summary = {}
+                for line in demand:
+                    summary = material_summary.setdefault(
+                        line.material_code, {'name': line.material_name, 'count': 0, 'length': 0.0})
+                    summary['count'] += line.quantity
+                    summary['length'] += line.length * line.quantity
                 
-                # Read cuts
-                with st.spinner("Daten werden gelesen..."):
-                    cuts = ExcelHandler.read_cuts_from_excel(temp_path)
+                total_cuts = sum(summary['count'] for summary in material_summary.values())
+                st.success(f"✅ {total_cuts} Schnitte aus {len(material_summary)} Materialien geladen")
                 
-                st.success(f"✅ {len(cuts)} Schnitte aus {len(set(c.material_code for c in cuts))} Materialien geladen")
+                # Validation report: rejected rows and unit conversions per sheet
+                for info in sheets:
+                    report = info.report
+                    if not report.issues and set(report.units) <= {'mm'}:
+                        continue
+                    source = info.file + (f" / {info.sheet}" if info.sheet else "")
+                    with st.expander(f"⚠️ Prüfbericht {source}: {report.summary()}",
+                                     expanded=report.rejected > 0):
+                        if report.issues:
+                            import pandas as pd
+                            st.dataframe(pd.DataFrame([{
+                                'Zeile': issue.row,
+                                'Spalte': issue.column,
+                                'Wert': issue.value,
+                                'Problem': issue.message,
+                                'Zeile übernommen': not issue.error,
+                            } for issue in report.issues[:1000]]), use_container_width=True, hide_index=True)
+                        header = "erkannt" if report.mapping.detected else "nicht erkannt (Spalten A-D)"
+                        st.caption(f"Kopfzeile {header}, Längen in {report.mapping.unit}, "
+                                   f"geprüft in {report.seconds * 1000:.0f} ms")
                 
                 # Preview data
                 with st.expander("📋 Datenvorschau"):
                     preview_data = []
-                    material_summary = {}
-                    
-                    for cut in cuts:
-                        key = (cut.material_code, cut.material_name)
-                        if key not in material_summary:
-                            material_summary[key] = []
-                        material_summary[key].append(cut.length)
-                    
-                    for (mat_code, mat_name), lengths in material_summary.items():
+                    for mat_code, summary in material_summary.items():
                         preview_data.append({
                             'Material': mat_code,
-                            'Name': mat_name,
-                            'Anzahl Schnitte': len(lengths),
-                            'Durchschn. Länge': f"{sum(lengths)/len(lengths):.1f} mm"
+                            'Name': summary['name'],
+                            'Anzahl Schnitte': summary['count'],
+                            'Durchschn. Länge': f"{summary['length'] / summary['count']:.1f} mm"
                         })
                     
+                    import pandas as pd
                     st.dataframe(pd.DataFrame(preview_data), use_container_width=True)
+                    
+                    # Pieces per file/sheet (several files or assemblies)
+                    sources = {}
+                    for line in demand:
+                        if line.order_id is not None:
+                            sources[line.order_id] = sources.get(line.order_id, 0) + line.quantity
+                    if sources:
+                        st.dataframe(pd.DataFrame([{'Datei/Blatt': source, 'Anzahl Schnitte': count}
+                                                   for source, count in sources.items()]),
+                                     use_container_width=True, hide_index=True)
                 
                 # Optimize
-                if st.button("🚀 Optimierung starten", type="primary", use_container_width=True):
-                    with st.spinner(f"Optimierung läuft ({algorithm})..."):
-                        optimizer = CuttingOptimizer(bar_length=bar_length, algorithm=algorithm, kerf=kerf)
-                        results = optimizer.optimize_by_material(cuts, multiplier=multiplier)
+                if st.button("🚀 Optimierung starten", type="primary", use_container_width=True,
+                             disabled=not stock_lengths_valid):
+                    with st.spinner(f"Optimierung läuft ({algorithm})..."), profiling.profile(profiler):
+                        results_key, results, reused_job = run_optimization(demand, optimization_params,
+                                                                            remnant_store, reuse_history)
                         
                         # Store in session state
                         st.session_state['results'] = results
+                        st.session_state['results_key'] = results_key
                         st.session_state['bar_length'] = bar_length
                         st.session_state['multiplier'] = multiplier
                         st.session_state['algorithm'] = algorithm
                         st.session_state['kerf'] = kerf
                     
                     st.success(f"✅ Optimierung abgeschlossen mit {algorithm}!")
+                    show_reused_job(reused_job)
                     
-                    # Display results
-                    st.header("🎯 Ergebnisse")
-                    
-                    for material_code, data in results.items():
-                        with st.expander(f"**{material_code}** - {data['name']}", expanded=True):
-                            bars = data['bars']
-                            
-                            # Statistics
-                            col1, col2, col3, col4 = st.columns(4)
-                            
-                            total_bars = len(bars)
-                            total_cuts = sum(len(bar.cuts) for bar in bars)
-                            total_waste = sum(bar.waste for bar in bars)
-                            avg_efficiency = sum(bar.efficiency for bar in bars) / len(bars) if bars else 0
-                            
-                            col1.metric("Stangen", total_bars)
-                            col2.metric("Schnitte", total_cuts)
-                            col3.metric("Verschnitt", f"{total_waste:.0f} mm")
-                            col4.metric("Ø Effizienz", f"{avg_efficiency:.1f}%")
-                            
-                            # Visual representation of bars
-                            st.markdown("**📊 Visuelle Darstellung der Schnitte:**")
-                            for bar in bars[:10]:  # Show first 10 bars
-                                st.markdown(create_bar_visualization(bar, bar_length, data['name']), unsafe_allow_html=True)
-                                st.markdown("<br>", unsafe_allow_html=True)
-                            
-                            if len(bars) > 10:
-                                st.info(f"ℹ️ {len(bars) - 10} weitere Stangen nicht visualisiert (siehe Tabelle unten)")
-                            
-                            # Bar details table
-                            bar_data = []
-                            for bar in bars:
-                                bar_data.append({
-                                    'Stange': bar.bar_number,
-                                    'Schnitte': ' / '.join(f"{c:.1f}" for c in bar.cuts),
-                                    'Anzahl': len(bar.cuts),
-                                    'Gesamt': f"{bar.total_used:.1f} mm",
-                                    'Rest': f"{bar.waste:.1f} mm",
-                                    'Effizienz': f"{bar.efficiency:.1f}%"
-                                })
-                            
-                            st.dataframe(pd.DataFrame(bar_data), use_container_width=True)
-                    
-                    # Export results
-                    st.markdown("---")
-                    st.subheader("📥 Export-Optionen")
-                    
-                    col1, col2, col3 = st.columns(3)
-                    
-                    # Excel Export
-                    with col1:
-                        output_path = "zuschnitt_optimiert.xlsx"
-                        ExcelHandler.write_results_to_excel(results, output_path, bar_length)
-                        
-                        with open(output_path, "rb") as file:
-                            st.download_button(
-                                label="📊 Excel herunterladen",
-                                data=file,
-                                file_name="zuschnitt_optimiert.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                use_container_width=True
-                            )
-                    
-                    # PDF Export - Compact
-                    with col2:
-                        from pdf_generator import WorkPlanPDFGenerator
-                        
-                        pdf_gen = WorkPlanPDFGenerator(results, bar_length, kerf, algorithm)
-                        pdf_compact = pdf_gen.generate_compact_plan()
-                        
-                        st.download_button(
-                            label="📄 PDF Kompakt",
-                            data=pdf_compact,
-                            file_name=f"arbeitsplan_kompakt_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                            mime="application/pdf",
-                            use_container_width=True,
-                            help="Kompakter Arbeitsplan - 1 Seite pro Material"
-                        )
-                    
-                    # PDF Export - Visual
-                    with col3:
-                        pdf_visual = pdf_gen.generate_visual_plan()
-                        
-                        st.download_button(
-                            label="📋 PDF Visuell",
-                            data=pdf_visual,
-                            file_name=f"arbeitsplan_visuell_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                            mime="application/pdf",
-                            use_container_width=True,
-                            help="Visueller Arbeitsplan mit Grafiken und Checklisten"
-                        )
+                    with profiling.profile(profiler):
+                        display_results(results, bar_length, kerf, algorithm, results_key)
+                    st.session_state['profile'] = profiler.report()
                 
+            except ValueError as e:
+                # Unreadable input, e.g. a workbook without a Stueckliste sheet
+                st.error(f"❌ Stückliste konnte nicht verarbeitet werden: {str(e)}")
             except Exception as e:
                 st.error(f"❌ Fehler bei der Verarbeitung: {str(e)}")
                 st.exception(e)
@@ -659,25 +968,38 @@ def main():
             total_cuts_all = sum(sum(len(bar.cuts) for bar in data['bars']) for data in results.values())
             total_waste_all = sum(sum(bar.waste for bar in data['bars']) for data in results.values())
             
-            col1, col2, col3, col4 = st.columns(4)
+            total_bound_all = sum(data.get('lower_bound', 0) for data in results.values())
+            
+            col1, col2, col3, col4, col5 = st.columns(5)
             col1.metric("Materialien", total_materials)
             col2.metric("Stangen gesamt", total_bars_all)
             col3.metric("Schnitte gesamt", total_cuts_all)
             col4.metric("Verschnitt gesamt", f"{total_waste_all:.0f} mm")
+            col5.metric("Abstand zur Schranke", f"{max(0, total_bars_all - total_bound_all)} Stangen",
+                        help=f"Untere Schranke gesamt: {total_bound_all} Stangen")
             
             # Charts
             st.subheader("Visualisierungen")
             
+            efficiency_chart, waste_chart = cached_charts(st.session_state['results_key'], results)
             col1, col2 = st.columns(2)
             
             with col1:
-                st.plotly_chart(create_efficiency_chart(results), use_container_width=True)
+                st.plotly_chart(efficiency_chart, use_container_width=True)
             
             with col2:
-                st.plotly_chart(create_waste_chart(results), use_container_width=True)
+                st.plotly_chart(waste_chart, use_container_width=True)
+            
+            # Timing breakdown of the last run
+            if 'profile' in st.session_state:
+                with st.expander("⏱️ Performance", expanded=False):
+                    display_profile(st.session_state['profile'])
             
         else:
             st.info("ℹ️ Führen Sie zuerst eine Optimierung durch, um Statistiken zu sehen.")
+        
+        with st.expander("🗂️ Auftragsverlauf", expanded='results' not in st.session_state):
+            display_job_history()
     
     with tab4:
         st.header("ℹ️ Über diese Anwendung")
@@ -705,6 +1027,16 @@ def main():
         - Berücksichtigt zukünftige Schnitte bei der Platzierung
         - Ausgewogene Balance zwischen Effizienz und Geschwindigkeit
         
+        **Pattern** - Empfohlen für Serien mit wenigen verschiedenen Längen
+        - Berechnet alle sinnvollen Schnittmuster einer Stange vorab
+        - Wiederholt jeweils das Muster mit dem geringsten Rest
+        - Gleiche Stangen werden als Muster gruppiert
+        
+        **Multi** - Empfohlen, wenn auch Sägezeit und Schnittverlust zählen
+        - Rechnet mit allen Algorithmen und bewertet jede Lösung
+        - Gewichtet Stangenanzahl, Schnittverlust und Anzahl Schnitte
+        - Endstücke ohne Rest brauchen keinen zusätzlichen Schnitt
+        
         #### 📊 Vorteile
         
         - ✅ Minimiert Materialverschnitt
@@ -721,7 +1053,7 @@ def main():
         
         #### 🔧 Technische Details
         
-        - **Algorithmen:** BFD, FFD, Heuristic (wählbar)
+        - **Algorithmen:** BFD, FFD, Heuristic, Pattern, Multi (wählbar)
         - **Komplexität:** O(n log n + n·m) wobei n=Schnitte, m=Stangen
         - **Sprache:** Python 3.10+
         - **Framework:** Streamlit
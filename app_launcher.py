@@ -97,4 +97,8 @@ serverAddress = "localhost"
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Die App rechnet in Worker-Prozessen; im PyInstaller-Bundle starten diese
+    # sonst erneut den Launcher
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
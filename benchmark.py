@@ -0,0 +1,309 @@
+"""
+Benchmark suite for optimizer, Excel I/O and PDF generation.
+
+Generates seeded synthetic Stücklisten (10 to 100k pieces, 1 to 50 materials),
+times every algorithm, ExcelHandler.read_cuts_from_excel, the CSV reader,
+ExcelHandler.write_results_to_excel, both PDF plans and the result
+serialization (pickle vs. columnar JSON vs. binary, dump + load and size),
+and tracks the peak memory of every stage. The startup stage imports the application modules in
+fresh interpreters and records which heavy libraries each one pulls in. Results are written as JSON so runs of different
+versions can be compared.
+
+Usage:
+    python benchmark.py                          # all scenarios -> benchmark_results.json
+    python benchmark.py --quick                  # up to 10k pieces
+    python benchmark.py --output neu.json --compare alt.json
+"""
+import argparse
+import io
+import json
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import INPUT_SHEET_NAME
+
+# (pieces, materials)
+SCENARIOS = [(10, 1), (100, 2), (1000, 5), (10000, 20), (100000, 50)]
+QUICK_SCENARIOS = [(10, 1), (100, 2), (1000, 5), (10000, 20)]
+ALGORITHMS = ['FFD', 'BFD', 'Heuristic', 'Pattern', 'Multi']
+BAR_LENGTH = 6000
+KERF = 3.0
+SEED = 42
+FORMAT_VERSION = 1
+STARTUP_MODULES = ['optimizer', 'excel_handler', 'service', 'pdf_generator', 'cli']
+HEAVY_MODULES = ['numpy', 'pandas', 'openpyxl', 'plotly', 'reportlab']
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def generate_stueckliste(pieces: int, materials: int, seed: int = SEED) -> List[Tuple[float, int, str, str]]:
+    """
+    Create a reproducible cut list.
+
+    Every material gets its own set of 3 to 30 lengths (5 mm raster), rows
+    carry quantities of 1 to 20 like real series orders.
+
+    Returns:
+        Rows (length, quantity, material code, material name) with `pieces` pieces in total
+    """
+    rng = random.Random(f"{seed}-{pieces}-{materials}")
+    palettes = [
+        [rng.randrange(150, BAR_LENGTH - 100, 5) for _ in range(rng.randint(3, 30))]
+        for _ in range(materials)
+    ]
+    rows = []
+    remaining = pieces
+    while remaining > 0:
+        material = rng.randrange(materials)
+        quantity = min(remaining, rng.randint(1, 20))
+        rows.append((float(rng.choice(palettes[material])), quantity, f"M{material + 1:02d}", f"Material {material + 1}"))
+        remaining -= quantity
+    return rows
+
+
+def write_input_file(rows: List[Tuple], path: str):
+    """Write rows as an input workbook (sheet Stueckliste, header in row 1)."""
+    import pandas as pd
+    df = pd.DataFrame(rows, columns=['Länge (mm)', 'Anzahl', 'Material', 'Materialname'])
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name=INPUT_SHEET_NAME, index=False)
+
+
+def measure(func: Callable, repeat: int = 1, memory: bool = True) -> Dict:
+    """
+    Time a function (best of `repeat` runs) and measure its peak memory in an extra traced run.
+
+    Returns:
+        Dictionary with 'seconds', 'peak_memory_kb' and the function result under 'result'
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_memory_kb': peak, 'result': result}
+
+
+def git_version() -> str:
+    """Short commit hash of the working tree, or 'unknown'."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure_startup(module: str, repeat: int) -> Dict:
+    """
+    Import a module in fresh interpreters (best of `repeat` runs).
+
+    Returns:
+        Dictionary with 'seconds' and the heavy libraries it loaded under 'loaded'
+    """
+    script = STARTUP_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(max(repeat, 3)):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        measurement = json.loads(output)
+        if best is None or measurement['seconds'] < best['seconds']:
+            best = measurement
+    return best
+
+
+def run_startup(repeat: int) -> List[Dict]:
+    """
+    Measure the import time of the application modules.
+
+    Returns:
+        One record per module
+    """
+    records = []
+    for module in STARTUP_MODULES:
+        measurement = measure_startup(module, repeat)
+        records.append({
+            'scenario': 'startup', 'pieces': 0, 'materials': 0, 'stage': f'import:{module}',
+            'seconds': round(measurement['seconds'], 6), 'peak_memory_kb': None,
+            'loaded': measurement['loaded'],
+        })
+        loaded = ", ".join(measurement['loaded']) or "-"
+        print(f"  {'startup':>10s} {'import:' + module:28s} {measurement['seconds'] * 1000:10.1f} ms  lädt: {loaded}")
+    return records
+
+
+def run_scenario(pieces: int, materials: int, repeat: int, memory: bool,
+                 stages: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Run all stages for one scenario.
+
+    Returns:
+        One record per stage
+    """
+    from excel_handler import ExcelHandler
+    from optimizer import Cut, CuttingOptimizer
+    from pdf_generator import WorkPlanPDFGenerator
+    from serialization import from_binary, from_json, to_binary, to_json
+    import table_io
+    from optimizer import DemandLine
+    from table_io import DEMAND_HEADERS
+    from validation import validate_table
+
+    rows = generate_stueckliste(pieces, materials)
+    cuts = [Cut(length, code, name) for length, quantity, code, name in rows for _ in range(quantity)]
+    scenario = f"{pieces}x{materials}"
+    records = []
+
+    def record(stage: str, measurement: Dict, **extra):
+        records.append({
+            'scenario': scenario, 'pieces': pieces, 'materials': materials, 'stage': stage,
+            'seconds': round(measurement['seconds'], 6), 'peak_memory_kb': measurement['peak_memory_kb'],
+            **extra
+        })
+        memory_text = f"{measurement['peak_memory_kb']:>10d} KB" if measurement['peak_memory_kb'] is not None else ""
+        print(f"  {scenario:>10s} {stage:28s} {measurement['seconds'] * 1000:10.1f} ms {memory_text}")
+
+    def wanted(stage: str) -> bool:
+        return stages is None or stage.split(':')[0] in stages
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = os.path.join(temp_dir, 'stueckliste.xlsx')
+        write_input_file(rows, input_path)
+        if wanted('read_excel'):
+            record('read_excel', measure(lambda: ExcelHandler.read_cuts_from_excel(input_path), repeat, memory))
+        csv_path = os.path.join(temp_dir, 'stueckliste.csv')
+        table_io.write_demand_csv([DemandLine(*row) for row in rows], csv_path)
+        if wanted('read_csv'):
+            record('read_csv', measure(lambda: table_io.read_cuts(csv_path), repeat, memory))
+    if wanted('validate'):
+        table = [list(DEMAND_HEADERS.values())] + rows
+        record('validate', measure(lambda: validate_table(table), repeat, memory), rows=len(rows))
+
+    results = None
+    for algorithm in ALGORITHMS:
+        if not wanted(f'optimize:{algorithm}') and not (results is None and algorithm == 'BFD'):
+            continue
+        optimizer = CuttingOptimizer(bar_length=BAR_LENGTH, algorithm=algorithm, kerf=KERF)
+        measurement = measure(lambda: optimizer.optimize_by_material(cuts), repeat, memory)
+        if algorithm == 'BFD':
+            results = measurement['result']
+        if wanted(f'optimize:{algorithm}'):
+            bars = sum(len(data['bars']) for data in measurement['result'].values())
+            bound = sum(data['lower_bound'] for data in measurement['result'].values())
+            record(f'optimize:{algorithm}', measurement, bars=bars, lower_bound=bound)
+
+    # Output stages use the BFD result
+    excel_writers = {
+        'write_excel': lambda output: ExcelHandler.write_results_to_excel(results, output, BAR_LENGTH),
+        'write_excel:structured': lambda output: ExcelHandler.write_structured_results(results, output),
+    }
+    for stage, write in excel_writers.items():
+        if wanted(stage):
+            output = io.BytesIO()
+            write(output)
+            record(stage, measure(lambda: write(io.BytesIO()), repeat, memory), bytes=len(output.getvalue()))
+    generator = WorkPlanPDFGenerator(results, BAR_LENGTH, KERF, 'BFD')
+    if wanted('pdf_compact'):
+        record('pdf_compact', measure(generator.generate_compact_plan, repeat, memory))
+    if wanted('pdf_visual'):
+        record('pdf_visual', measure(generator.generate_visual_plan, repeat, memory))
+    serializers = {'pickle': (pickle.dumps, pickle.loads), 'json': (to_json, from_json),
+                   'binary': (to_binary, from_binary)}
+    for name, (dump, load) in serializers.items():
+        if wanted(f'serialize:{name}'):
+            size = len(dump(results))
+            record(f'serialize:{name}', measure(lambda: load(dump(results)), repeat, memory), bytes=size)
+    return records
+
+
+def compare(current: Dict, previous: Dict):
+    """Print the runtime ratio current/previous per scenario and stage."""
+    old = {(r['scenario'], r['stage']): r for r in previous['results']}
+    print(f"\nVergleich mit {previous['meta'].get('version', '?')} ({previous['meta'].get('timestamp', '?')}):")
+    print(f"  {'Szenario':>10s} {'Stufe':28s} {'alt [ms]':>10s} {'neu [ms]':>10s} {'Faktor':>8s}")
+    for r in current['results']:
+        before = old.get((r['scenario'], r['stage']))
+        if before is None:
+            continue
+        ratio = r['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        print(f"  {r['scenario']:>10s} {r['stage']:28s} {before['seconds'] * 1000:10.1f} "
+              f"{r['seconds'] * 1000:10.1f} {ratio:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für Optimierer, Excel-Ein-/Ausgabe und PDF-Export")
+    parser.add_argument('--quick', action='store_true', help="Nur Szenarien bis 10.000 Teile")
+    parser.add_argument('--scenario', action='append', metavar='TEILExMATERIALIEN',
+                        help="Eigenes Szenario, z.B. 5000x10 (mehrfach möglich)")
+    parser.add_argument('--stage', action='append',
+                        choices=['startup', 'read_excel', 'read_csv', 'validate', 'optimize', 'write_excel',
+                                 'pdf_compact', 'pdf_visual', 'serialize'],
+                        help="Nur diese Stufen messen (mehrfach möglich)")
+    parser.add_argument('--repeat', type=int, default=1, help="Läufe pro Messung, der schnellste zählt")
+    parser.add_argument('--no-memory', action='store_true', help="Speicherspitze nicht messen")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON-Ergebnisdatei")
+    parser.add_argument('--compare', help="Frühere JSON-Ergebnisdatei zum Vergleich")
+    args = parser.parse_args()
+
+    if args.scenario:
+        scenarios = [tuple(int(part) for part in entry.lower().split('x')) for entry in args.scenario]
+    else:
+        scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+
+    print("=" * 80)
+    print(f"BENCHMARK (Stange {BAR_LENGTH}mm, Schnittbreite {KERF}mm, Seed {SEED})")
+    print("=" * 80)
+
+    records = []
+    if args.stage is None or 'startup' in args.stage:
+        records.extend(run_startup(args.repeat))
+    for pieces, materials in scenarios:
+        records.extend(run_scenario(pieces, materials, args.repeat, not args.no_memory, args.stage))
+
+    output = {
+        'meta': {
+            'format': FORMAT_VERSION,
+            'version': git_version(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': SEED,
+            'bar_length': BAR_LENGTH,
+            'kerf': KERF,
+            'repeat': args.repeat,
+        },
+        'results': records,
+    }
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(output, handle, indent=2)
+    print(f"\nErgebnisse gespeichert: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            compare(output, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
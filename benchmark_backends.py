@@ -0,0 +1,72 @@
+"""
+Benchmark: pure Python vs. NumPy fit scan for BFD and Heuristic.
+
+Times both backends on random cut lists of growing size and reports the
+smallest size from which NumPy is faster (the crossover point). Use the
+result to tune NUMPY_MIN_CUTS in config.py.
+
+Usage: python benchmark_backends.py [--repeat N]
+"""
+import argparse
+import random
+import time
+
+import fitscan
+from config import NUMPY_MIN_CUTS
+from optimizer import CuttingOptimizer
+
+SIZES = [100, 250, 500, 1000, 2000, 4000, 8000, 16000]
+BAR_LENGTH = 6000
+KERF = 3.0
+
+
+def random_cuts(count: int, seed: int = 42) -> list:
+    """Cut list with 1 mm resolution, i.e. few equal lengths (worst case for the scan)."""
+    rng = random.Random(seed)
+    return [rng.randint(200, 2900) for _ in range(count)]
+
+
+def best_time(algorithm: str, backend: str, cuts: list, repeat: int) -> float:
+    """Fastest of `repeat` runs in seconds."""
+    optimizer = CuttingOptimizer(bar_length=BAR_LENGTH, algorithm=algorithm, kerf=KERF, backend=backend)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        optimizer.optimize(cuts)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    if not fitscan.available():
+        print("NumPy ist nicht installiert - nur das Python-Backend ist verfügbar.")
+        return
+
+    print("=" * 80)
+    print(f"FIT SCAN BENCHMARK (Stange {BAR_LENGTH}mm, Schnittbreite {KERF}mm)")
+    print("=" * 80)
+
+    for algorithm in ['BFD', 'Heuristic']:
+        print(f"\n{algorithm}:")
+        print(f"  {'Schnitte':>8s} {'Python [ms]':>12s} {'NumPy [ms]':>12s} {'Faktor':>8s}")
+        crossover = None
+        for size in SIZES:
+            cuts = random_cuts(size)
+            python_time = best_time(algorithm, 'python', cuts, args.repeat)
+            numpy_time = best_time(algorithm, 'numpy', cuts, args.repeat)
+            if crossover is None and numpy_time < python_time:
+                crossover = size
+            print(f"  {size:8d} {python_time * 1000:12.1f} {numpy_time * 1000:12.1f} "
+                  f"{python_time / numpy_time:8.2f}")
+        found = f"ab {crossover} Schnitten" if crossover else "nicht erreicht"
+        print(f"  Übergangspunkt: {found} (NUMPY_MIN_CUTS = {NUMPY_MIN_CUTS})")
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    main()
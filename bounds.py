@@ -0,0 +1,104 @@
+"""
+Lower bounds for the number of bars needed for a cutting list.
+
+With n pieces per bar there are n-1 kerfs, so adding one kerf to every piece
+and to the bar length turns the problem into plain bin packing:
+piece size = length + kerf, bar capacity = bar_length + kerf.
+"""
+import math
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, List
+
+EPSILON = 1e-9
+
+
+def _ceil(value: float) -> int:
+    """Ceiling that ignores floating point noise just above an integer."""
+    return max(0, math.ceil(value - EPSILON))
+
+
+def continuous_bound(cuts: List[float], bar_length: float, kerf: float = 0.0) -> int:
+    """
+    Continuous (material) bound: total length including kerf divided by the bar length.
+
+    Args:
+        cuts: List of cut lengths
+        bar_length: Bar length in mm
+        kerf: Saw blade kerf in mm
+
+    Returns:
+        Minimum number of bars
+    """
+    if not cuts:
+        return 0
+    capacity = bar_length + kerf
+    return _ceil(sum(length + kerf for length in cuts) / capacity)
+
+
+def martello_toth_bound(cuts: List[float], bar_length: float, kerf: float = 0.0) -> int:
+    """
+    Martello-Toth L2 bound.
+
+    For every threshold k <= C/2, pieces larger than C-k need a bar each,
+    pieces in (C/2, C-k] need a bar each as well, and the pieces in [k, C/2]
+    can only use the space left in those bars plus additional bars.
+
+    Args:
+        cuts: List of cut lengths
+        bar_length: Bar length in mm
+        kerf: Saw blade kerf in mm
+
+    Returns:
+        Minimum number of bars (always >= the continuous bound)
+    """
+    if not cuts:
+        return 0
+    capacity = bar_length + kerf
+    sizes = sorted(length + kerf for length in cuts)
+    prefix = [0.0] + list(accumulate(sizes))
+    n = len(sizes)
+    half = capacity / 2
+
+    def total(lo: int, hi: int) -> float:
+        return prefix[hi] - prefix[lo]
+
+    # Pieces above C/2 never share a bar with each other
+    big_start = bisect_right(sizes, half + EPSILON)
+
+    best = 0
+    # Thresholds: 0 and every distinct piece size up to C/2
+    thresholds = [0.0] + sorted(set(sizes[:big_start]))
+    for k in thresholds:
+        j1_start = bisect_right(sizes, capacity - k + EPSILON)  # sizes > C - k
+        j3_start = bisect_left(sizes, k - EPSILON)               # sizes >= k
+        j1 = n - j1_start
+        j2 = j1_start - big_start if j1_start > big_start else 0
+        j2_sum = total(big_start, j1_start) if j2 else 0.0
+        j3_sum = total(j3_start, big_start) if j3_start < big_start else 0.0
+        free_in_j2 = j2 * capacity - j2_sum
+        bound = j1 + j2 + _ceil((j3_sum - free_in_j2) / capacity)
+        best = max(best, bound)
+
+    return max(best, continuous_bound(cuts, bar_length, kerf))
+
+
+def lower_bound(cuts: List[float], bar_length: float, kerf: float = 0.0) -> int:
+    """Best available lower bound for the number of bars."""
+    return martello_toth_bound(cuts, bar_length, kerf)
+
+
+def gap_statistics(bar_count: int, bound: int) -> Dict[str, float]:
+    """
+    Gap between a solution and its lower bound.
+
+    Returns:
+        Dictionary with 'lower_bound', 'gap_bars', 'gap_percent' and 'proven_optimal'
+    """
+    gap = max(0, bar_count - bound)
+    return {
+        'lower_bound': bound,
+        'gap_bars': gap,
+        'gap_percent': (gap / bound * 100) if bound > 0 else 0.0,
+        'proven_optimal': gap == 0,
+    }
@@ -25,6 +25,21 @@ PyInstaller.__main__.run([
     '--add-data=optimizer.py;.',
     '--add-data=excel_handler.py;.',
     '--add-data=pdf_generator.py;.',
+    '--add-data=remnant_store.py;.',
+    '--add-data=patterns.py;.',
+    '--add-data=bounds.py;.',
+    '--add-data=fitscan.py;.',
+    '--add-data=scoring.py;.',
+    '--add-data=profiling.py;.',
+    '--add-data=saw_schedule.py;.',
+    '--add-data=objective.py;.',
+    '--add-data=orders.py;.',
+    '--add-data=online.py;.',
+    '--add-data=job_store.py;.',
+    '--add-data=serialization.py;.',
+    '--add-data=table_io.py;.',
+    '--add-data=ingest.py;.',
+    '--add-data=validation.py;.',
     
     # Streamlit und Abhängigkeiten
     '--hidden-import=streamlit',
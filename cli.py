@@ -0,0 +1,193 @@
+"""
+Command line interface for the cutting optimization.
+
+Reads a Stückliste (Excel, CSV or Parquet), optimizes it and writes the Excel result and optionally
+the PDF work plans. With --profile the time per pipeline stage and the solver
+counters are printed (and saved as JSON with --profile-json); --cprofile
+writes a cProfile file for pstats/snakeviz.
+
+Several Stücklisten (and several sheets matching --sheets in one workbook,
+e.g. one per assembly) are read concurrently and tagged with their file
+and/or sheet name: their pieces are packed jointly and bars, material and
+cost per file or sheet are printed.
+
+Usage:
+    python cli.py stueckliste.xlsx -o zuschnitt.xlsx --bar-length 6000 --kerf 3
+    python cli.py stueckliste.xlsx --pdf-compact plan.pdf --profile --profile-json profil.json
+    python cli.py stueckliste.xlsx --cprofile zuschnitt.prof
+    python cli.py stueckliste.csv -o zuschnitt.xlsx --result-csv zuschnitt.csv
+    python cli.py stueckliste.xlsx --result-xlsx daten.xlsx    # numeric tables for other tools
+    python cli.py auftrag1.xlsx auftrag2.xlsx auftrag3.xlsx -o tag.xlsx
+    python cli.py projekt.xlsx --sheets 'Baugruppe*' --tag sheet
+    python cli.py stueckliste.xlsx --result ergebnis.json   # or .bin (binary)
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+
+import ingest
+import profiling
+import table_io
+from config import DEFAULT_BAR_LENGTH, DEFAULT_KERF, INGEST_WORKERS, INPUT_SHEET_PATTERN
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer
+from orders import order_summary
+from serialization import to_binary, to_json
+
+ALGORITHMS = ['BFD', 'FFD', 'Heuristic', 'Pattern', 'Multi']
+
+
+def run(args) -> tuple:
+    """
+    Run the pipeline: read, optimize, export.
+    
+    Returns:
+        Tuple (results by material, plans by order or None for a single file)
+    """
+    demand, sheets = ingest.ingest(args.input, pattern=args.sheets, tag=args.tag, workers=args.workers)
+    optimizer = CuttingOptimizer(bar_length=args.bar_length, algorithm=args.algorithm, kerf=args.kerf)
+    results = optimizer.optimize_demand(demand, multiplier=args.multiplier)
+    plans = optimizer.split_by_order(results) if any(line.order_id is not None for line in demand) else None
+    if len(sheets) > 1:
+        print_sheets(sheets)
+    print_validation(sheets)
+
+    if args.output:
+        ExcelHandler.write_results_to_excel(results, args.output, args.bar_length)
+    if args.pdf_compact or args.pdf_visual:
+        # reportlab is only loaded when a PDF is generated
+        from pdf_generator import WorkPlanPDFGenerator
+        generator = WorkPlanPDFGenerator(results, args.bar_length, args.kerf, args.algorithm)
+        if args.pdf_compact:
+            generator.generate_compact_plan(args.pdf_compact)
+        if args.pdf_visual:
+            generator.generate_visual_plan(args.pdf_visual)
+    if args.result_xlsx:
+        ExcelHandler.write_structured_results(results, args.result_xlsx)
+    if args.result_csv:
+        table_io.write_results_csv(results, args.result_csv)
+    if args.result_parquet:
+        table_io.write_results_parquet(results, args.result_parquet)
+    if args.result:
+        if args.result.lower().endswith('.json'):
+            with open(args.result, 'w', encoding='utf-8') as f:
+                f.write(to_json(results))
+        else:
+            with open(args.result, 'wb') as f:
+                f.write(to_binary(results))
+    return results, plans
+
+
+def print_sheets(sheets: list):
+    """Rows and pieces per ingested sheet."""
+    print(f"{'Datei':30s} {'Blatt':20s} {'Zeilen':>7s} {'Teile':>7s}  Kennung")
+    for info in sheets:
+        print(f"{os.path.basename(info.file):30s} {info.sheet:20s} {info.rows:7d} {info.pieces:7d}  {info.tag or '-'}")
+    print()
+
+
+def print_validation(sheets: list, limit: int = 20):
+    """Rejected rows and unit conversions per sheet (only sheets with something to report)."""
+    for info in sheets:
+        report = info.report
+        if not report.issues and set(report.units) <= {'mm'}:
+            continue
+        source = os.path.basename(info.file) + (f" / {info.sheet}" if info.sheet else "")
+        print(f"Prüfbericht {source}: {report.summary()}")
+        for issue in report.issues[:limit]:
+            print(f"  Zeile {issue.row}: {issue.message} ({issue.column} = {issue.value!r})")
+        if len(report.issues) > limit:
+            print(f"  ... {len(report.issues) - limit} weitere")
+        print()
+
+
+def print_summary(results: dict):
+    """Bars, cuts and waste per material."""
+    print(f"{'Material':12s} {'Stangen':>8s} {'Schranke':>9s} {'Schnitte':>9s} {'Verschnitt':>12s}")
+    for material_code, data in results.items():
+        bars = data['bars']
+        print(f"{material_code:12s} {len(bars):8d} {data['lower_bound']:9d} "
+              f"{sum(len(bar.cuts) for bar in bars):9d} {sum(bar.waste for bar in bars):10.0f}mm")
+
+
+def print_orders(plans: dict):
+    """Pieces, bars, shared bars, material and cost per order."""
+    print(f"\n{'Auftrag':20s} {'Teile':>7s} {'Stangen':>8s} {'geteilt':>8s} {'Material':>10s} {'Kosten':>9s}")
+    for row in order_summary(plans):
+        print(f"{str(row['order_id']):20s} {row['pieces']:7d} {row['bars']:8d} {row['shared_bars']:8d} "
+              f"{row['material_m']:9.2f}m {row['cost']:9.2f}")
+
+
+def print_profile(report: dict):
+    """Stage timings and counters."""
+    total = report['total_seconds'] or 1.0
+    print(f"\n{'Stufe':28s} {'Aufrufe':>8s} {'Zeit [ms]':>10s} {'Anteil':>7s}")
+    for entry in report['stages']:
+        print(f"{entry['name']:28s} {entry['calls']:8d} {entry['seconds'] * 1000:10.1f} "
+              f"{entry['seconds'] / total * 100:6.1f}%")
+    print(f"{'gesamt':28s} {'':8s} {report['total_seconds'] * 1000:10.1f}")
+    for name, value in report['counters'].items():
+        print(f"  {name}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Zuschnittoptimierung über die Kommandozeile")
+    parser.add_argument('input', nargs='+',
+                        help="Stückliste(n): Excel (Blatt 'Stueckliste'), CSV oder Parquet; "
+                             "mehrere Dateien = mehrere Aufträge")
+    parser.add_argument('--sheets', default=INPUT_SHEET_PATTERN,
+                        help="Blätter jeder Arbeitsmappe, Muster wie 'Baugruppe*' (Standard: %(default)s)")
+    parser.add_argument('--tag', choices=ingest.TAG_MODES, default='auto',
+                        help="Teile kennzeichnen nach Blatt, Datei, beidem oder nicht (Standard: %(default)s)")
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS,
+                        help="Prozesse zum Einlesen mehrerer Dateien (Standard: %(default)s)")
+    parser.add_argument('-o', '--output', help="Ergebnis als Excel-Datei")
+    parser.add_argument('--bar-length', type=float, default=DEFAULT_BAR_LENGTH, help="Stangenlänge in mm (Standard: %(default)s)")
+    parser.add_argument('--kerf', type=float, default=DEFAULT_KERF, help="Schnittbreite in mm (Standard: %(default)s)")
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='BFD', help="Algorithmus (Standard: %(default)s)")
+    parser.add_argument('--multiplier', type=int, default=1, help="Anzahl Wiederholungen (Standard: %(default)s)")
+    parser.add_argument('--pdf-compact', help="Kompakten Arbeitsplan als PDF speichern")
+    parser.add_argument('--pdf-visual', help="Visuellen Arbeitsplan als PDF speichern")
+    parser.add_argument('--result-xlsx',
+                        help="Ergebnis als Excel-Tabellen mit Zahlenzellen speichern (Materialien, Muster, Schnitte)")
+    parser.add_argument('--result-csv', help="Schnitte als CSV speichern (eine Zeile pro Schnitt)")
+    parser.add_argument('--result-parquet', help="Schnitte als Parquet speichern (benötigt pyarrow)")
+    parser.add_argument('--result', help="Ergebnis speichern: .json spaltenweise, sonst binär")
+    parser.add_argument('--profile', action='store_true', help="Zeit pro Verarbeitungsstufe ausgeben")
+    parser.add_argument('--profile-json', help="Zeiten und Zähler als JSON speichern")
+    parser.add_argument('--cprofile', help="cProfile-Ausgabe speichern (für pstats/snakeviz)")
+    args = parser.parse_args()
+
+    profiler = profiling.Profiler()
+    cprofiler = cProfile.Profile() if args.cprofile else None
+    try:
+        with profiling.profile(profiler):
+            if cprofiler:
+                cprofiler.enable()
+            try:
+                results, plans = run(args)
+            finally:
+                if cprofiler:
+                    cprofiler.disable()
+    except Exception as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_summary(results)
+    if plans:
+        print_orders(plans)
+    if args.profile:
+        print_profile(profiler.report())
+    if args.profile_json:
+        profiler.to_json(args.profile_json)
+        print(f"\nProfil gespeichert: {args.profile_json}")
+    if cprofiler:
+        cprofiler.dump_stats(args.cprofile)
+        print(f"\ncProfile gespeichert: {args.cprofile}")
+        pstats.Stats(cprofiler).sort_stats('cumulative').print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,105 @@ EXCEL_COLUMNS = {
 # Input/Output settings
 INPUT_SHEET_NAME = "Stueckliste"
 OUTPUT_SHEET_NAME = "Zuschnitt"
+STOCK_SHEET_NAME = "Lagerlaengen"  # Optional sheet with stock lengths per material
+INPUT_SHEET_PATTERN = "Stueckliste*"  # Sheets read by ingest.py (one per assembly, fnmatch pattern)
+# Sheets of the structured export (ExcelHandler.write_structured_results)
+MATERIAL_SHEET_NAME = "Materialien"
+PATTERN_SHEET_NAME = "Muster"
+CUTS_SHEET_NAME = "Schnitte"
+
+# Header detection and validation of input rows (validation.py).
+# Headers are compared without case, umlauts, spaces and unit, e.g.
+# "Länge [cm]" matches 'Länge' with unit cm. Without a header row the
+# EXCEL_COLUMNS positions are used.
+HEADER_ALIASES = {
+    'length': ['Länge', 'Length', 'Schnittlänge', 'Zuschnittlänge', 'Zuschnitt', 'Fertiglänge', 'L'],
+    'quantity': ['Anzahl', 'Menge', 'Stück', 'Stückzahl', 'Stk', 'Anz', 'Quantity', 'Qty'],
+    'material': ['Material', 'Materialcode', 'Materialnummer', 'Werkstoff', 'Artikel', 'Artikelnummer', 'Code'],
+    'name': ['Materialname', 'Bezeichnung', 'Materialbezeichnung', 'Beschreibung', 'Name', 'Text'],
+    'unit': ['Einheit', 'Unit', 'ME'],  # optional: length unit per row
+}
+LENGTH_UNITS = {'mm': 1.0, 'cm': 10.0, 'm': 1000.0}  # factor to mm
+INPUT_LENGTH_UNIT = "mm"      # unit of lengths without unit in header or unit column
+HEADER_SCAN_ROWS = 10         # rows searched for the header row
+
+# Stock lengths per material for the multi-length mode.
+# Each entry is (length in mm, price per bar); use None as price to minimise
+# material instead of cost. 'default' applies to all materials not listed.
+# Example: 'ST37': [(6000, 30.0), (6500, 32.0), (12000, 58.0)]
+STOCK_LENGTHS = {
+    'default': [(6000, None), (6500, None), (12000, None)],
+}
 
 # Optimization settings
 OPTIMIZATION_TOLERANCE = 0.1  # mm tolerance for cutting precision
+
+# Cutting pattern table (patterns.py)
+PATTERN_MAX_COUNT = 20000   # stop enumerating after this many patterns
+PATTERN_MAX_LENGTHS = 40    # more distinct lengths per material: pack with BFD
+PATTERN_CACHE_SIZE = 256    # pattern tables kept in memory
+
+# NumPy fit scan for BFD and Heuristic (see benchmark_backends.py)
+NUMPY_MIN_CUTS = 500        # smaller cut lists per material use the pure Python loops
+
+# Heuristic scoring per material code (scoring.py); 'default' applies to all others.
+# Keys: scorer ('standard' or 'best_fit') and the ScoreParams fields.
+HEURISTIC_SCORING = {
+    'default': {
+        'scorer': 'standard',
+        'useful_remnant': 100,      # mm remaining that still count as useful
+        'useful_bonus': 50,
+        'nearly_full_ratio': 0.05,  # share of the bar length
+        'nearly_full_penalty': 100,
+    },
+}
+
+# Saw schedule (saw_schedule.py): bars and cuts are re-sequenced for few
+# length stop changes; the times estimate the saw time in the work plans
+SAW_SCHEDULE = True           # False keeps the packing order
+SAW_TIME_PER_CUT = 20         # seconds per cut (clamp, saw, remove piece)
+SAW_TIME_PER_STOP = 45        # seconds per length stop change (set and check)
+SAW_TIME_PER_BAR = 30         # seconds to load a bar
+
+# Multi-objective mode (algorithm 'Multi', objective.py): every algorithm below
+# is run and the solution with the lowest weighted cost is kept
+MULTI_OBJECTIVE_ALGORITHMS = ['BFD', 'FFD', 'Heuristic', 'Pattern']
+OBJECTIVE_WEIGHTS = {
+    'bars': 1.0,        # per bar
+    'kerf_loss': 0.001, # per mm lost to the saw blade (1 m = 1 bar)
+    'cuts': 0.01,       # per saw cut (100 cuts = 1 bar)
+}
+
+# Online packing (online.py): open bars are closed (released to the saw) when
+# they are filled to the threshold or have been open for the time limit
+ONLINE_FILL_THRESHOLD = 0.97    # share of the bar length
+ONLINE_MAX_OPEN_SECONDS = 4 * 3600  # None: no time limit
+
+# Remnant inventory (Reststücklager)
+REMNANT_DB_PATH = "reststuecke.db"  # SQLite file for the remnant inventory
+REMNANT_MIN_LENGTH = 500            # mm, shorter remnants are scrapped
+
+# Job history (job_store.py)
+JOB_DB_PATH = "auftragsverlauf.db"  # SQLite file for finished optimization jobs
+SOLVER_VERSION = 1                  # raise on solver changes; jobs of older versions are never reused
+
+# Streamlit caches (app.py)
+APP_CACHE_TTL = 3600          # seconds a cached demand, result or export stays valid
+APP_CACHE_MAX_ENTRIES = 32    # entries kept per cached function
+APP_WORKERS = 2               # solver processes shared by all sessions
+
+# Local HTTP/JSON optimization service (service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8502
+SERVICE_WORKERS = 2           # worker processes for solving
+SERVICE_CACHE_SIZE = 128      # finished results kept in the LRU cache
+SERVICE_BATCH_WINDOW = 0.01   # seconds to collect requests into one batch
+SERVICE_MAX_BATCH = 16        # max requests sent to a worker at once
+SERVICE_MAX_BODY = 10 * 1024 * 1024  # max request body in bytes
+SERVICE_MAX_PIECES = 500000   # max pieces per job (quantities x multiplier)
+
+# CSV/Parquet input (table_io.py)
+CSV_CHUNK_ROWS = 50000        # rows parsed per chunk when streaming a CSV file
+
+# Multi-sheet/multi-file ingestion (ingest.py)
+INGEST_WORKERS = 4            # processes parsing files concurrently
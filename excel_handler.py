@@ -1,67 +1,169 @@
 """
 Excel input/output handler for cutting optimization.
+
+Results are written either as the formatted work sheet "Zuschnitt"
+(write_results_to_excel) or as plain tables with numeric cells for other
+tools (write_structured_results): one row per material, per cutting pattern
+and per cut, streamed in openpyxl write-only mode.
+
+pandas and openpyxl are imported inside the methods that use them, so
+importing this module (and the optimizer) stays fast.
 """
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from typing import List, Dict
+import itertools
+from typing import Iterable, List, Dict, Optional, Tuple
 from pathlib import Path
 
-from optimizer import Cut, Bar
-from config import EXCEL_COLUMNS, INPUT_SHEET_NAME, OUTPUT_SHEET_NAME
+from optimizer import Cut, Bar, DemandLine, StockLength
+from bounds import gap_statistics
+from saw_schedule import saw_statistics, format_duration
+import profiling
+from validation import ValidationReport, validate_table
+from config import (
+    INPUT_SHEET_NAME, OUTPUT_SHEET_NAME, STOCK_SHEET_NAME,
+    MATERIAL_SHEET_NAME, PATTERN_SHEET_NAME, CUTS_SHEET_NAME
+)
+
+# Columns of the structured export (lengths in mm); pattern rows continue
+# with the cut lengths in columns "Länge 1" ... "Länge n"
+MATERIAL_HEADERS = ['Material', 'Materialname', 'Stangen', 'Reststücke', 'Muster', 'Schnitte',
+                    'Stangenlänge gesamt', 'Genutzt', 'Verschnitt', 'Effizienz %', 'Untere Schranke',
+                    'Anschlagwechsel', 'Sägezeit s']
+PATTERN_HEADERS = ['Material', 'Materialname', 'Muster', 'Anzahl', 'Reststücke', 'Stangenlänge', 'Schnitte',
+                   'Genutzt', 'Rest', 'Effizienz %']
+EXCEL_MAX_ROWS = 1048576  # rows per sheet, header included
 
 
 class ExcelHandler:
     """Handles reading input and writing output Excel files."""
     
     @staticmethod
-    def read_cuts_from_excel(file_path: str) -> List[Cut]:
+    def _read_input_rows(file_path, report: Optional[ValidationReport] = None) -> "pd.DataFrame":
+        """
+        Read and validate the rows of the input sheet.
+        
+        The header row and the columns are detected by name (see
+        validation.py); lengths are converted to mm.
+        
+        Returns:
+            DataFrame with the columns length, quantity, material_code and
+            material_name; invalid rows are dropped and listed in `report`
+        """
+        import pandas as pd
+        
+        with profiling.stage('excel.read'):
+            df = pd.read_excel(file_path, sheet_name=INPUT_SHEET_NAME, header=None)
+        
+        with profiling.stage('excel.validate'):
+            rows, _ = validate_table(df, report=report)
+            return rows
+    
+    @staticmethod
+    def read_cuts_from_excel(file_path: str, report: Optional[ValidationReport] = None) -> List[Cut]:
         """
         Read cutting requirements from Excel file.
         
         Args:
             file_path: Path to input Excel file
+            report: Optional report that receives the rejected rows
             
         Returns:
             List of Cut objects
         """
         try:
-            # Read the Excel file
-            df = pd.read_excel(file_path, sheet_name=INPUT_SHEET_NAME, header=None)
+            rows = ExcelHandler._read_input_rows(file_path, report)
             
-            cuts = []
+            with profiling.stage('excel.expand'):
+                # Add each cut quantity times
+                return [
+                    Cut(length=length, material_code=material_code, material_name=material_name)
+                    for length, quantity, material_code, material_name in rows.itertuples(index=False)
+                    for _ in range(quantity)
+                ]
+        
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Input file not found: {file_path}")
+        except Exception as e:
+            raise Exception(f"Error reading Excel file: {str(e)}")
+    
+    @staticmethod
+    def read_demand_from_excel(file_path: str, report: Optional[ValidationReport] = None) -> List[DemandLine]:
+        """
+        Read the cutting requirements as aggregated demand.
+        
+        Rows with the same material and length are summed into one line, so
+        preview, totals and the optimizer input (CuttingOptimizer.optimize_demand)
+        work on distinct lines instead of single pieces.
+        
+        Args:
+            file_path: Path to input Excel file
+            report: Optional report that receives the rejected rows
             
-            # Process each row (skip header row 0)
-            for idx, row in df.iterrows():
-                if idx == 0:  # Skip header
-                    continue
-                
-                try:
-                    length = float(row[EXCEL_COLUMNS['length']])
-                    quantity = int(row[EXCEL_COLUMNS['quantity']])
-                    material_code = str(row[EXCEL_COLUMNS['material']]).strip()
-                    material_name = str(row[EXCEL_COLUMNS['name']]).strip()
-                    
-                    # Validate data
-                    if material_code and length > 0 and quantity > 0:
-                        # Add each cut quantity times
-                        for _ in range(quantity):
-                            cuts.append(Cut(
-                                length=length,
-                                material_code=material_code,
-                                material_name=material_name
-                            ))
-                except (ValueError, KeyError, IndexError):
-                    # Skip invalid rows
-                    continue
-            
-            return cuts
+        Returns:
+            Demand lines in order of first appearance; the material name is
+            taken from the first row of each material
+        """
+        try:
+            rows = ExcelHandler._read_input_rows(file_path, report)
+            
+            with profiling.stage('excel.aggregate'):
+                names = rows.groupby('material_code', sort=False)['material_name'].first()
+                grouped = rows.groupby(['material_code', 'length'], sort=False)['quantity'].sum()
+                return [
+                    DemandLine(float(length), int(quantity), material_code, names[material_code])
+                    for (material_code, length), quantity in grouped.items()
+                ]
         
         except FileNotFoundError:
             raise FileNotFoundError(f"Input file not found: {file_path}")
         except Exception as e:
             raise Exception(f"Error reading Excel file: {str(e)}")
     
+    @staticmethod
+    def read_stock_lengths(file_path: str) -> Dict[str, List[StockLength]]:
+        """
+        Read stock lengths per material from the optional stock sheet.
+        
+        The sheet has the columns Material, Länge (mm) and Preis (optional,
+        per bar). Material '*' applies to all materials without own entries.
+        
+        Args:
+            file_path: Path to input Excel file
+            
+        Returns:
+            Dictionary mapping material codes (or 'default') to stock lengths;
+            empty if the workbook has no stock sheet
+        """
+        import pandas as pd
+        
+        try:
+            df = pd.read_excel(file_path, sheet_name=STOCK_SHEET_NAME, header=None)
+        except ValueError:
+            # Sheet does not exist
+            return {}
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Input file not found: {file_path}")
+        
+        stock_lengths: Dict[str, List[StockLength]] = {}
+        for idx, row in df.iterrows():
+            if idx == 0:  # Skip header
+                continue
+            
+            try:
+                material_code = str(row[0]).strip()
+                length = float(row[1])
+                cost = float(row[2]) if len(row) > 2 and pd.notna(row[2]) else None
+            except (ValueError, KeyError, IndexError):
+                # Skip invalid rows
+                continue
+            
+            if not material_code or material_code == 'nan' or not length > 0:
+                continue
+            if material_code == '*':
+                material_code = 'default'
+            stock_lengths.setdefault(material_code, []).append(StockLength(length, cost))
+        
+        return stock_lengths
+    
     @staticmethod
     def write_results_to_excel(results: Dict[str, Dict], output_path: str, bar_length: float):
         """
@@ -72,6 +174,19 @@ class ExcelHandler:
             output_path: Path for output Excel file
             bar_length: Standard bar length used
         """
+        with profiling.stage('excel.build'):
+            wb = ExcelHandler._build_results_workbook(results, bar_length)
+        
+        # Save workbook
+        with profiling.stage('excel.save'):
+            wb.save(output_path)
+    
+    @staticmethod
+    def _build_results_workbook(results: Dict[str, Dict], bar_length: float) -> "Workbook":
+        """Build the formatted result workbook (sheet Zuschnitt) in memory."""
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill, Alignment
+        
         wb = Workbook()
         ws = wb.active
         ws.title = OUTPUT_SHEET_NAME
@@ -121,8 +236,15 @@ class ExcelHandler:
             
             # Bar details
             for bar in bars:
-                # Bar number
-                ws.cell(row=current_row, column=1, value=bar.bar_number)
+                # Bar number (remnants from the inventory are marked with their ID and length)
+                if bar.remnant_id is not None:
+                    bar_label = f"{bar.bar_number} (Rest #{bar.remnant_id}, {bar.bar_length:.0f} mm)"
+                    ws.cell(row=current_row, column=1, value=bar_label)
+                elif bar.bar_length != bar_length:
+                    # Multi-length mode: show the stock length of this bar
+                    ws.cell(row=current_row, column=1, value=f"{bar.bar_number} ({bar.bar_length:.0f} mm)")
+                else:
+                    ws.cell(row=current_row, column=1, value=bar.bar_number)
                 
                 # Cuts (formatted as "length1 / length2 / ...")
                 cuts_str = " / ".join(f"{cut:.1f}" for cut in bar.cuts)
@@ -150,13 +272,33 @@ class ExcelHandler:
             ws.cell(row=current_row, column=1).font = header_font
             current_row += 1
             
+            # Bars needed per stock length (purchase list)
+            stock_counts: Dict[float, int] = {}
+            for bar in bars:
+                if bar.remnant_id is None:
+                    stock_counts[bar.bar_length] = stock_counts.get(bar.bar_length, 0) + 1
+            stock_str = ", ".join(f"{count}x {length:.0f} mm" for length, count in sorted(stock_counts.items()))
+            
             summary_data = [
                 ("Anzahl Stangen:", total_bars),
+                ("Stangenbedarf:", stock_str),
                 ("Anzahl Schnitte:", total_cuts),
                 ("Gesamtverschnitt:", f"{total_waste:.1f} mm"),
                 ("Durchschn. Effizienz:", f"{avg_efficiency:.1f}%")
             ]
             
+            # Estimated saw time in the listed order
+            saw = saw_statistics(bars)
+            summary_data.append(("Anschlagwechsel:", saw['stop_changes']))
+            summary_data.append(("Sägezeit (geschätzt):", format_duration(saw['seconds'])))
+            
+            # Lower bound and gap (how far from a proven optimum)
+            if data.get('lower_bound') is not None:
+                gap = gap_statistics(total_bars, data['lower_bound'])
+                gap_str = "optimal" if gap['proven_optimal'] else f"{gap['gap_bars']} Stangen ({gap['gap_percent']:.1f}%)"
+                summary_data.append(("Untere Schranke:", gap['lower_bound']))
+                summary_data.append(("Abstand zur Schranke:", gap_str))
+            
             for label, value in summary_data:
                 ws.cell(row=current_row, column=1, value=label)
                 ws.cell(row=current_row, column=2, value=value)
@@ -177,8 +319,100 @@ class ExcelHandler:
             adjusted_width = min(max_length + 2, 50)
             ws.column_dimensions[column_letter].width = adjusted_width
         
-        # Save workbook
-        wb.save(output_path)
+        return wb
+    
+    @staticmethod
+    def write_structured_results(results: Dict[str, Dict], output_path):
+        """
+        Write results as plain tables with numeric cells for other tools.
+        
+        Every sheet has one header row (filter, frozen) and one record per
+        row, lengths in mm as numbers:
+        - Materialien: one row per material (bars, waste, efficiency, bound)
+        - Muster: one row per cutting pattern with the number of bars cut
+          that way and the cut lengths in columns "Länge 1" ... "Länge n"
+        - Schnitte: one row per cut in saw order (table_io.RESULT_HEADERS)
+        
+        The workbook is written in openpyxl write-only mode: rows are
+        streamed to the file without cell objects, so large results stay
+        fast and need little memory.
+        
+        Args:
+            results: Results of optimize_by_material/optimize_demand
+            output_path: Path or binary file object for the Excel file
+        """
+        from openpyxl import Workbook
+        from patterns import group_bars_by_pattern
+        from table_io import RESULT_HEADERS, result_rows
+        
+        with profiling.stage('excel.structured'):
+            wb = Workbook(write_only=True)
+            groups = {code: group_bars_by_pattern(data['bars']) for code, data in results.items()}
+            width = max((len(cuts) for patterns in groups.values() for cuts, _ in patterns), default=0)
+            
+            ExcelHandler._write_table(wb, MATERIAL_SHEET_NAME, MATERIAL_HEADERS,
+                                      ExcelHandler._material_rows(results, groups))
+            ExcelHandler._write_table(wb, PATTERN_SHEET_NAME,
+                                      PATTERN_HEADERS + [f"Länge {i}" for i in range(1, width + 1)],
+                                      ExcelHandler._pattern_rows(results, groups))
+            # A sheet holds EXCEL_MAX_ROWS rows: further cuts continue on "Schnitte 2", ...
+            cuts = result_rows(results)
+            for part in itertools.count(1):
+                title = CUTS_SHEET_NAME if part == 1 else f"{CUTS_SHEET_NAME} {part}"
+                rows = itertools.islice(cuts, EXCEL_MAX_ROWS - 1)
+                if ExcelHandler._write_table(wb, title, RESULT_HEADERS, rows) < EXCEL_MAX_ROWS - 1:
+                    break
+            wb.save(output_path)
+    
+    @staticmethod
+    def _material_rows(results: Dict[str, Dict], groups: Dict[str, List]) -> Iterable[tuple]:
+        """Rows of the Materialien sheet (MATERIAL_HEADERS)."""
+        for material_code, data in results.items():
+            bars: List[Bar] = data['bars']
+            if not bars:
+                continue
+            stock = sum(bar.bar_length for bar in bars)
+            used = sum(bar.total_used for bar in bars)
+            saw = saw_statistics(bars)
+            yield (material_code, data['name'], len(bars), sum(bar.remnant_id is not None for bar in bars),
+                   len(groups[material_code]), saw['cuts'], stock, round(used, 3), round(stock - used, 3),
+                   round(used / stock * 100, 2) if stock > 0 else 0.0, data.get('lower_bound'),
+                   saw['stop_changes'], round(saw['seconds'], 1))
+    
+    @staticmethod
+    def _pattern_rows(results: Dict[str, Dict], groups: Dict[str, List[Tuple]]) -> Iterable[tuple]:
+        """Rows of the Muster sheet (PATTERN_HEADERS, then the cut lengths)."""
+        for material_code, data in results.items():
+            for number, (cuts, bars) in enumerate(groups[material_code], start=1):
+                bar = bars[0]
+                yield (material_code, data['name'], number, len(bars),
+                       sum(other.remnant_id is not None for other in bars), bar.bar_length, len(cuts),
+                       round(bar.total_used, 3), round(bar.waste, 3), round(bar.efficiency, 2)) + cuts
+    
+    @staticmethod
+    def _write_table(wb: "Workbook", title: str, headers: List[str], rows: Iterable[tuple]) -> int:
+        """Stream one sheet: bold header row, then the rows; filter over all rows. Returns the row count."""
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+        
+        ws = wb.create_sheet(title)
+        ws.freeze_panes = 'A2'
+        header_font = Font(bold=True)
+        header_cells = []
+        for col, header in enumerate(headers, start=1):
+            ws.column_dimensions[get_column_letter(col)].width = max(len(header) + 2, 10)
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        count = 0
+        for row in rows:
+            ws.append(row)
+            count += 1
+        ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{count + 1}"
+        return count
     
     @staticmethod
     def create_example_input(output_path: str = "example_input.xlsx"):
@@ -186,8 +420,10 @@ class ExcelHandler:
         Create an example input Excel file with sample data.
         
         Args:
-            output_path: Path for the example file
+            output_path: Path or binary file object for the example file
         """
+        import pandas as pd
+        
         data = {
             'Länge (mm)': [2500, 1800, 1200, 900, 2400, 1500, 800, 2200, 1000, 1600],
             'Anzahl': [3, 5, 4, 6, 2, 4, 8, 3, 5, 4],
@@ -201,5 +437,14 @@ class ExcelHandler:
         
         df = pd.DataFrame(data)
         
+        # Optional stock lengths for the multi-length mode
+        stock_data = {
+            'Material': ['*', '*', '*', 'ALU', 'ALU'],
+            'Länge (mm)': [6000, 6500, 12000, 3000, 6000],
+            'Preis': [None, None, None, 24.0, 42.0]
+        }
+        df_stock = pd.DataFrame(stock_data)
+        
         with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
             df.to_excel(writer, sheet_name=INPUT_SHEET_NAME, index=False)
+            df_stock.to_excel(writer, sheet_name=STOCK_SHEET_NAME, index=False)
@@ -0,0 +1,92 @@
+"""
+Vectorized fit scan for the greedy solvers.
+
+Keeps used length, bar length and "has cuts" of all bars in NumPy arrays so
+fit masks and scores for one cut length are computed for every bar at once.
+The arithmetic mirrors Bar.can_fit / Bar.waste exactly, so the vectorized
+solvers place every cut in the same bar as the pure Python loops.
+"""
+from typing import List
+
+from objective import EPSILON
+
+# NumPy is optional and imported on first use, so importing the optimizer
+# does not load it; without NumPy the pure Python solvers are used instead.
+np = None
+_checked = False
+
+
+def available() -> bool:
+    """Check whether the NumPy backend can be used (imports NumPy on the first call)."""
+    global np, _checked
+    if not _checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+        _checked = True
+    return np is not None
+
+
+class FitScan:
+    """Array view of the open bars of one solver run."""
+
+    def __init__(self, bars: List, capacity: int, kerf: float = 0.0):
+        """
+        Initialize the arrays from the initial bars.
+
+        Args:
+            bars: Initial bars (stock or one empty bar)
+            capacity: Maximum number of bars the run can open (initial bars + cuts)
+            kerf: Saw blade kerf in mm
+        """
+        self.kerf = kerf
+        self.count = 0
+        self.total_used = np.zeros(capacity)
+        self.bar_length = np.zeros(capacity)
+        self.has_cuts = np.zeros(capacity, dtype=bool)
+        for index, bar in enumerate(bars):
+            self.update(index, bar)
+
+    def update(self, index: int, bar):
+        """Copy the state of a (new or changed) bar into the arrays."""
+        self.total_used[index] = bar.total_used
+        self.bar_length[index] = bar.bar_length
+        self.has_cuts[index] = len(bar.cuts) > 0
+        self.count = max(self.count, index + 1)
+
+    def remaining_after(self, cut_length: float):
+        """
+        Fit mask and remaining length after adding the cut, for every bar.
+
+        Returns:
+            Tuple (fits, remaining_after, bar_length) of arrays over the open bars
+        """
+        n = self.count
+        total_used = self.total_used[:n]
+        bar_length = self.bar_length[:n]
+        additional = np.where(self.has_cuts[:n], cut_length + self.kerf, cut_length)
+        fits = total_used + additional <= bar_length + EPSILON
+        remaining = (bar_length - total_used) - additional
+        return fits, remaining, bar_length
+
+    def best_fit_order(self, cut_length: float) -> List[int]:
+        """Indices of bars that fit the cut, least remaining length first (ties by index)."""
+        fits, remaining, _ = self.remaining_after(cut_length)
+        candidates = np.flatnonzero(fits)
+        order = np.argsort(remaining[candidates], kind='stable')
+        return candidates[order].tolist()
+
+    def heuristic_scores(self, cut_length: float, scorer) -> "np.ndarray":
+        """
+        Heuristic score of every bar for the cut, -inf where it does not fit.
+
+        Args:
+            cut_length: Cut length in mm
+            scorer: Function (remaining_after, bar_length) -> scores working on arrays
+        """
+        fits, remaining, bar_length = self.remaining_after(cut_length)
+        scores = np.full(len(self.total_used), -np.inf)
+        scores[:self.count] = np.where(fits, scorer(remaining, bar_length), -np.inf)
+        return scores
@@ -0,0 +1,181 @@
+"""
+Ingestion of projects split across several sheets and files.
+
+Every workbook is opened once (openpyxl read-only mode) and all sheets whose
+name matches a pattern (e.g. "Stueckliste*" for one sheet per assembly) are
+streamed row by row and validated in chunks of CSV_CHUNK_ROWS rows
+(table_io.iter_row_chunks, as for CSV); columns are found and rows validated
+by validation.py. Old .xls workbooks are read whole with pandas.
+CSV and Parquet files count as one sheet. Files are parsed concurrently in a
+process pool (parsing is pure Python, so threads would share one core) and
+merged into one list of demand lines.
+
+Every line is tagged with its source (sheet and/or file name) in
+DemandLine.order_id, so the optimizer packs all sources jointly and
+CuttingOptimizer.split_by_order() gives bars, material and cost per
+assembly or file.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import profiling
+import table_io
+from config import INGEST_WORKERS, INPUT_SHEET_PATTERN
+from optimizer import DemandLine
+from validation import ValidationReport, validate_table
+
+TAG_MODES = ('auto', 'sheet', 'file', 'both', 'none')
+
+
+@dataclass
+class SheetInfo:
+    """One ingested sheet (or CSV/Parquet file)."""
+    file: str
+    sheet: str
+    rows: int                   # valid rows
+    pieces: int
+    tag: Optional[str]
+    report: ValidationReport    # header, units and rejected rows
+
+
+def _source_name(source) -> str:
+    """File name of a path or (name, bytes) source."""
+    return source[0] if isinstance(source, tuple) else str(source)
+
+
+def _rows(frame) -> List[table_io.Row]:
+    return list(frame.itertuples(index=False, name=None))
+
+
+def read_source(source, pattern: str = INPUT_SHEET_PATTERN) -> List[Tuple[str, List[table_io.Row],
+                                                                     ValidationReport]]:
+    """
+    Read and validate all matching sheets of one file. Runs in a worker process.
+
+    Args:
+        source: Path, or tuple (file name, file content as bytes)
+        pattern: Sheet name pattern (fnmatch, case-sensitive) for workbooks
+
+    Returns:
+        List of (sheet name, valid rows, validation report) in workbook
+        order; CSV and Parquet files give one entry with an empty sheet name
+
+    Raises:
+        ValueError: If no sheet of a workbook matches the pattern
+    """
+    name = _source_name(source)
+    fmt = table_io.file_format(name)
+    data = io.BytesIO(source[1]) if isinstance(source, tuple) else source
+
+    if fmt != 'excel':
+        report = ValidationReport()
+        return [('', [row for chunk in table_io.iter_chunks(data, fmt, report) for row in chunk], report)]
+
+    if Path(name).suffix.lower() == '.xls':
+        # Old format: openpyxl cannot stream it, pandas reads all sheets at once
+        import pandas as pd
+        frames = pd.read_excel(data, sheet_name=None, header=None)
+        sheets = []
+        for sheet, frame in frames.items():
+            if fnmatchcase(sheet, pattern):
+                rows, report = validate_table(frame)
+                sheets.append((sheet, _rows(rows), report))
+        _check_matched(name, pattern, sheets, list(frames))
+        return sheets
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(data, read_only=True, data_only=True)
+    try:
+        sheets = []
+        for sheet in workbook.worksheets:
+            if fnmatchcase(sheet.title, pattern):
+                report = ValidationReport()
+                rows = [row for chunk in table_io.iter_row_chunks(sheet.iter_rows(values_only=True), report=report)
+                        for row in chunk]
+                sheets.append((sheet.title, rows, report))
+        _check_matched(name, pattern, sheets, workbook.sheetnames)
+        return sheets
+    finally:
+        workbook.close()
+
+
+def _check_matched(name: str, pattern: str, sheets: list, sheet_names: List[str]):
+    """Reject a workbook that contributes no sheet (e.g. only "Tabelle1")."""
+    if not sheets:
+        raise ValueError(f"No sheet matching '{pattern}' in {Path(name).name} "
+                         f"(sheets: {', '.join(sheet_names) or 'none'})")
+
+
+def _tag(mode: str, file: str, sheet: str, several_files: bool, several_sheets: bool) -> Optional[str]:
+    """Source tag of a sheet; 'auto' names the file if there are several and the sheet if its file has several."""
+    stem = Path(file).stem
+    if mode == 'auto':
+        mode = {(True, True): 'both', (True, False): 'file', (False, True): 'sheet'}.get(
+            (several_files, several_sheets), 'none')
+    if mode == 'sheet':
+        return sheet or stem
+    if mode == 'file':
+        return stem
+    if mode == 'both':
+        return f"{stem}/{sheet}" if sheet else stem
+    return None
+
+
+def ingest(sources: List, pattern: str = INPUT_SHEET_PATTERN, tag: str = 'auto',
+           workers: int = INGEST_WORKERS) -> Tuple[List[DemandLine], List[SheetInfo]]:
+    """
+    Read several files (all matching sheets each) into one demand set.
+
+    Args:
+        sources: Paths, or tuples (file name, file content as bytes), of
+                 Excel, CSV or Parquet files
+        pattern: Sheet name pattern for workbooks, e.g. "Stueckliste*" or "*"
+        tag: Source tag in DemandLine.order_id: 'sheet', 'file', 'both'
+             ("file/sheet"), 'none', or 'auto' (file name if there are
+             several files, sheet name if the file has several matching
+             sheets; no tag for a single sheet)
+        workers: Processes for parsing (at most one per file and CPU); 1 parses
+                 in this process
+
+    Returns:
+        Tuple (demand lines summed per material, length and tag in order of
+        first appearance, one SheetInfo per sheet)
+
+    Raises:
+        ValueError: If the tag mode or a file type is unknown, or a workbook
+                    has no sheet matching the pattern
+    """
+    if tag not in TAG_MODES:
+        raise ValueError(f"Unknown tag mode: {tag}")
+    for source in sources:
+        table_io.file_format(_source_name(source))
+
+    with profiling.stage('ingest.read'):
+        workers = max(1, min(workers, len(sources), os.cpu_count() or 1))
+        if workers == 1:
+            parsed = [read_source(source, pattern) for source in sources]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(read_source, sources, [pattern] * len(sources)))
+
+    with profiling.stage('ingest.merge'):
+        names: Dict[str, str] = {}
+        quantities: Dict[Tuple[str, float, Optional[str]], int] = {}
+        infos = []
+        for source, file_sheets in zip(sources, parsed):
+            file = _source_name(source)
+            for sheet, rows, report in file_sheets:
+                sheet_tag = _tag(tag, file, sheet, len(sources) > 1, len(file_sheets) > 1)
+                for length, quantity, material_code, material_name in rows:
+                    names.setdefault(material_code, material_name)
+                    key = (material_code, length, sheet_tag)
+                    quantities[key] = quantities.get(key, 0) + quantity
+                infos.append(SheetInfo(file, sheet, len(rows), sum(row[1] for row in rows), sheet_tag, report))
+        demand = [DemandLine(length, quantity, material_code, names[material_code], sheet_tag)
+                  for (material_code, length, sheet_tag), quantity in quantities.items()]
+    return demand, infos
@@ -0,0 +1,312 @@
+"""
+Job history (Auftragsverlauf) backed by a local SQLite database.
+
+Every optimization run is stored with its demand, parameters, the
+results (binary format of serialization.py, compressed), statistics and
+stage timings, so past jobs can be
+reopened without solving again (only jobs of the current SOLVER_VERSION
+are reused for a new run), two runs can be compared and waste can be
+followed per material over time.
+
+Per-material figures live in their own table, indexed by material and date,
+so listings and trend queries never read the compressed result blobs.
+"""
+import hashlib
+import json
+import sqlite3
+import zlib
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from config import JOB_DB_PATH, SOLVER_VERSION
+from optimizer import DemandLine
+from serialization import from_binary, to_binary
+
+
+@dataclass
+class JobInfo:
+    """Summary of a stored job (without demand and results)."""
+    job_id: int
+    created_at: str
+    demand_hash: str
+    label: str
+    total_bars: int
+    total_waste: float
+    seconds: float
+
+    def __repr__(self):
+        return f"Job(#{self.job_id}, {self.created_at}, {self.total_bars} bars)"
+
+
+@dataclass
+class Job:
+    """A stored job with everything needed to show it again."""
+    info: JobInfo
+    params: Dict
+    demand: List[DemandLine]
+    results: Dict[str, Dict]
+    statistics: Dict[str, Dict]
+    timings: Optional[Dict]
+
+
+def demand_hash(demand: Sequence[DemandLine]) -> str:
+    """Hash of the demand lines, independent of their order."""
+    lines = sorted((line.material_code, line.length, line.quantity, line.order_id or '') for line in demand)
+    return hashlib.sha256(json.dumps(lines).encode('utf-8')).hexdigest()
+
+
+def _params_json(params: Dict) -> str:
+    # Stock lengths may hold StockLength objects; they are stored as text
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class JobStore:
+    """
+    SQLite store for finished optimization jobs.
+
+    Jobs are indexed by date and demand hash, their per-material figures by
+    (material_code, created_at).
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH):
+        """
+        Initialize the store and create the schema if needed.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    demand_hash TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    label TEXT NOT NULL DEFAULT '',
+                    demand BLOB NOT NULL,
+                    results BLOB NOT NULL,
+                    timings TEXT,
+                    total_bars INTEGER NOT NULL,
+                    total_waste REAL NOT NULL,
+                    seconds REAL NOT NULL DEFAULT 0,
+                    solver_version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Databases from before solver_version: their jobs count as version 0
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if 'solver_version' not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN solver_version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_materials (
+                    job_id INTEGER NOT NULL REFERENCES jobs (id),
+                    material_code TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    bars INTEGER NOT NULL,
+                    cuts INTEGER NOT NULL,
+                    total_length REAL NOT NULL,
+                    waste REAL NOT NULL,
+                    lower_bound INTEGER,
+                    PRIMARY KEY (job_id, material_code)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_demand ON jobs (demand_hash, created_at)")
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_job_materials_material
+                ON job_materials (material_code, created_at)
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the store usable from several threads
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def save(self, demand: Sequence[DemandLine], params: Dict, results: Dict[str, Dict],
+             timings: Optional[Dict] = None, label: str = "", created_at: Optional[str] = None) -> int:
+        """
+        Store a finished job.
+
+        Args:
+            demand: Demand lines of the job
+            params: Optimization parameters (bar_length, algorithm, kerf, multiplier, ...)
+            results: Results of optimize_demand/optimize_by_material
+            timings: Optional profiler report of the run
+            label: Optional name, e.g. the uploaded file name
+            created_at: ISO date/time of the job (default: now), e.g. when importing old jobs
+
+        Returns:
+            ID of the new job
+        """
+        now = created_at or datetime.now().isoformat(timespec='seconds')
+        demand_blob = zlib.compress(json.dumps(
+            [[line.length, line.quantity, line.material_code, line.material_name, line.order_id]
+             for line in demand], separators=(',', ':')).encode('utf-8'))
+        materials = []
+        for code, data in results.items():
+            bars = data['bars']
+            materials.append((code, now, len(bars), sum(len(bar.cuts) for bar in bars),
+                              sum(bar.bar_length for bar in bars), sum(bar.waste for bar in bars),
+                              data.get('lower_bound')))
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (created_at, demand_hash, params, label, demand, results, timings, "
+                "total_bars, total_waste, seconds, solver_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (now, demand_hash(demand), _params_json(params), label, demand_blob, zlib.compress(to_binary(results)),
+                 json.dumps(timings) if timings else None,
+                 sum(row[2] for row in materials), sum(row[5] for row in materials),
+                 (timings or {}).get('total_seconds', 0.0), SOLVER_VERSION)
+            )
+            job_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO job_materials (job_id, material_code, created_at, bars, cuts, total_length, "
+                "waste, lower_bound) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, *row) for row in materials]
+            )
+        return job_id
+
+    def load(self, job_id: int) -> Optional[Job]:
+        """
+        Load a job with demand and results (no solving needed).
+
+        Returns:
+            Job or None if there is no job with this ID
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, created_at, demand_hash, label, total_bars, total_waste, seconds, "
+                "params, demand, results, timings FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            materials = conn.execute(
+                "SELECT material_code, bars, cuts, total_length, waste, lower_bound FROM job_materials "
+                "WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        demand = [DemandLine(*line) for line in json.loads(zlib.decompress(row[8]))]
+        statistics = {code: {'bars': bars, 'cuts': cuts, 'total_length': total_length, 'waste': waste,
+                             'lower_bound': lower_bound}
+                      for code, bars, cuts, total_length, waste, lower_bound in materials}
+        return Job(JobInfo(*row[:7]), json.loads(row[7]), demand, from_binary(zlib.decompress(row[9])), statistics,
+                   json.loads(row[10]) if row[10] else None)
+
+    def find(self, demand: Sequence[DemandLine], params: Dict) -> Optional[int]:
+        """
+        ID of the latest job with the same demand and parameters, or None.
+
+        Only jobs solved with the current SOLVER_VERSION are found, so results
+        of an older solver are never passed off as a fresh solve.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE demand_hash = ? AND params = ? AND solver_version = ? "
+                "ORDER BY created_at DESC, id DESC LIMIT 1",
+                (demand_hash(demand), _params_json(params), SOLVER_VERSION)
+            ).fetchone()
+        return row[0] if row else None
+
+    def list_jobs(self, since: Optional[str] = None, until: Optional[str] = None,
+                  material_code: Optional[str] = None, limit: int = 50) -> List[JobInfo]:
+        """
+        Latest jobs first, without demand and results.
+
+        Args:
+            since: Only jobs created at or after this ISO date/time
+            until: Only jobs created before this ISO date/time
+            material_code: Only jobs containing this material
+            limit: Maximum number of jobs
+        """
+        query = "SELECT id, created_at, demand_hash, label, total_bars, total_waste, seconds FROM jobs"
+        conditions, args = [], []
+        if since:
+            conditions.append("created_at >= ?")
+            args.append(since)
+        if until:
+            conditions.append("created_at < ?")
+            args.append(until)
+        if material_code:
+            conditions.append("id IN (SELECT job_id FROM job_materials WHERE material_code = ?)")
+            args.append(material_code)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, (*args, limit)).fetchall()
+        return [JobInfo(*row) for row in rows]
+
+    def diff(self, job_a: int, job_b: int) -> Dict:
+        """
+        Compare two jobs.
+
+        Returns:
+            Dictionary with 'params' (changed parameters as (a, b)), 'demand'
+            (changed demand lines per (material, length, order) as (quantity a,
+            quantity b)) and 'materials' (bars, cuts, waste and lower bound per
+            material as (a, b))
+        """
+        a, b = self.load(job_a), self.load(job_b)
+        if a is None or b is None:
+            raise ValueError(f"Unknown job: {job_a if a is None else job_b}")
+
+        params = {key: (a.params.get(key), b.params.get(key))
+                  for key in sorted(set(a.params) | set(b.params)) if a.params.get(key) != b.params.get(key)}
+
+        def quantities(job):
+            counts: Dict[tuple, int] = {}
+            for line in job.demand:
+                key = (line.material_code, line.length, line.order_id)
+                counts[key] = counts.get(key, 0) + line.quantity
+            return counts
+
+        qa, qb = quantities(a), quantities(b)
+        demand = {key: (qa.get(key, 0), qb.get(key, 0))
+                  for key in sorted(set(qa) | set(qb), key=repr) if qa.get(key, 0) != qb.get(key, 0)}
+
+        empty = {'bars': 0, 'cuts': 0, 'waste': 0.0, 'lower_bound': None}
+        materials = {}
+        for code in sorted(set(a.statistics) | set(b.statistics)):
+            sa, sb = a.statistics.get(code, empty), b.statistics.get(code, empty)
+            materials[code] = {key: (sa[key], sb[key]) for key in ('bars', 'cuts', 'waste', 'lower_bound')}
+        return {'params': params, 'demand': demand, 'materials': materials}
+
+    def trend(self, material_code: Optional[str] = None, period: str = 'month',
+              since: Optional[str] = None) -> List[Dict]:
+        """
+        Waste per material and period, aggregated in the database.
+
+        Args:
+            material_code: Only this material (default: all)
+            period: 'day', 'month' or 'year'
+            since: Only jobs created at or after this ISO date/time
+
+        Returns:
+            Rows with 'period', 'material_code', 'jobs', 'bars', 'waste' and
+            'waste_percent' (waste of the bar length), oldest period first
+        """
+        formats = {'day': '%Y-%m-%d', 'month': '%Y-%m', 'year': '%Y'}
+        if period not in formats:
+            raise ValueError(f"Unknown period: {period}")
+        query = ("SELECT strftime(?, created_at) AS period, material_code, COUNT(*), SUM(bars), SUM(waste), "
+                 "SUM(total_length) FROM job_materials")
+        conditions, args = [], [formats[period]]
+        if material_code:
+            conditions.append("material_code = ?")
+            args.append(material_code)
+        if since:
+            conditions.append("created_at >= ?")
+            args.append(since)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " GROUP BY period, material_code ORDER BY period, material_code"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, args).fetchall()
+        return [{'period': period_key, 'material_code': code, 'jobs': jobs, 'bars': bars, 'waste': waste,
+                 'waste_percent': waste / total_length * 100 if total_length else 0.0}
+                for period_key, code, jobs, bars, waste, total_length in rows]
+
+    def delete(self, job_id: int):
+        """Remove a job and its per-material figures."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM job_materials WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
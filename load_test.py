@@ -0,0 +1,152 @@
+"""
+Load test with simulated parallel sessions.
+
+Every session does what a workshop tablet does in the app: upload a
+Stückliste (workbook bytes), read the demand, optimize it and create the
+Excel file and both PDF plans in memory. Sessions run in worker processes
+(like the app's solver pool) or in threads (like Streamlit's session
+threads). The test checks that every session gets exactly the result of a
+serial run, that no file is written to the working directory and that no
+remnant of the shared inventory is used twice, and reports the throughput
+per number of parallel sessions.
+
+Usage:
+    python load_test.py                         # 1, 2, 4, 8 parallel sessions
+    python load_test.py --parallel 1 --parallel 16 --sessions 32
+    python load_test.py --mode thread
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from benchmark import generate_stueckliste, write_input_file
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer
+from pdf_generator import WorkPlanPDFGenerator
+from remnant_store import RemnantStore
+
+BAR_LENGTH = 6000
+KERF = 3.0
+PIECES = 2000
+MATERIALS = 5
+
+
+def make_upload(session: int) -> bytes:
+    """Workbook bytes of the Stückliste of one session (different per session)."""
+    buffer = io.BytesIO()
+    write_input_file(generate_stueckliste(PIECES, MATERIALS, seed=session), buffer)
+    return buffer.getvalue()
+
+
+def run_session(upload: bytes, remnant_db: Optional[str] = None) -> Dict:
+    """
+    One session: read, optimize, export (everything in memory).
+
+    Returns:
+        Cut plan per material (bar lengths and cuts), export sizes, used remnants and runtime
+    """
+    start = time.perf_counter()
+    demand = ExcelHandler.read_demand_from_excel(io.BytesIO(upload))
+    remnant_store = RemnantStore(remnant_db) if remnant_db else None
+    optimizer = CuttingOptimizer(bar_length=BAR_LENGTH, algorithm='BFD', kerf=KERF, remnant_store=remnant_store)
+    results = optimizer.optimize_demand(demand)
+
+    excel = io.BytesIO()
+    ExcelHandler.write_results_to_excel(results, excel, BAR_LENGTH)
+    generator = WorkPlanPDFGenerator(results, BAR_LENGTH, KERF, 'BFD')
+    pdf_compact = generator.generate_compact_plan()
+    pdf_visual = generator.generate_visual_plan()
+
+    return {
+        'plan': {code: [(bar.bar_length, bar.cuts) for bar in data['bars']] for code, data in results.items()},
+        'remnants_used': [bar.remnant_id for data in results.values() for bar in data['bars']
+                          if bar.remnant_id is not None],
+        'export_bytes': len(excel.getvalue()) + len(pdf_compact) + len(pdf_visual),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def run_parallel(uploads: List[bytes], parallel: int, mode: str, remnant_db: Optional[str] = None) -> Dict:
+    """
+    Run all sessions with `parallel` sessions at a time.
+
+    Returns:
+        Session results and the wall time
+    """
+    executor_class = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+    with executor_class(max_workers=parallel) as executor:
+        # Start the workers before timing (process start-up is not session work)
+        list(executor.map(abs, range(parallel)))
+        start = time.perf_counter()
+        sessions = list(executor.map(run_session, uploads, [remnant_db] * len(uploads)))
+        seconds = time.perf_counter() - start
+    return {'sessions': sessions, 'seconds': seconds}
+
+
+def fill_inventory(path: str, sessions: int) -> RemnantStore:
+    """Inventory with a few remnants per material that every session wants to use."""
+    store = RemnantStore(path)
+    store.add_many([(f"M{material + 1:02d}", length)
+                    for material in range(MATERIALS) for length in (5000, 4200, 3100) * sessions])
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest mit parallelen Sitzungen")
+    parser.add_argument('--parallel', type=int, action='append', help="Parallele Sitzungen (mehrfach möglich)")
+    parser.add_argument('--sessions', type=int, default=16, help="Sitzungen pro Messung (Standard: %(default)s)")
+    parser.add_argument('--mode', choices=['process', 'thread'], default='process',
+                        help="Sitzungen in Prozessen oder Threads (Standard: %(default)s)")
+    args = parser.parse_args()
+    levels = args.parallel or [1, 2, 4, 8]
+
+    print("=" * 80)
+    print(f"LASTTEST: {args.sessions} Sitzungen à {PIECES} Teile, {MATERIALS} Materialien ({args.mode}, "
+          f"{os.cpu_count()} CPUs)")
+    print("=" * 80)
+
+    uploads = [make_upload(session) for session in range(args.sessions)]
+    reference = [run_session(upload)['plan'] for upload in uploads]
+    files_before = set(os.listdir('.'))
+    failures = []
+
+    print(f"  {'parallel':>8s} {'Zeit [s]':>9s} {'Sitz./s':>8s} {'Faktor':>7s} {'Ø Sitzung [ms]':>15s}")
+    base = None
+    for parallel in levels:
+        run = run_parallel(uploads, parallel, args.mode)
+        throughput = args.sessions / run['seconds']
+        base = base or throughput
+        average = sum(s['seconds'] for s in run['sessions']) / len(run['sessions'])
+        print(f"  {parallel:8d} {run['seconds']:9.2f} {throughput:8.2f} {throughput / base:7.2f} {average * 1000:15.0f}")
+        if [s['plan'] for s in run['sessions']] != reference:
+            failures.append(f"{parallel} parallel: Ergebnis weicht vom seriellen Lauf ab")
+
+    # Shared remnant inventory: every remnant may be used by one session only
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'reststuecke.db')
+        fill_inventory(path, args.sessions)
+        run = run_parallel(uploads, max(levels), args.mode, remnant_db=path)
+        used = [remnant_id for s in run['sessions'] for remnant_id in s['remnants_used']]
+        print(f"\n  Reststücklager: {len(used)} Reststücke von {args.sessions} Sitzungen verplant")
+        if len(used) != len(set(used)):
+            failures.append("Reststück doppelt verplant")
+
+    created = set(os.listdir('.')) - files_before
+    if created:
+        failures.append(f"Dateien im Arbeitsverzeichnis angelegt: {sorted(created)}")
+
+    if failures:
+        print("\nFehler:")
+        for message in failures:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nAlle Sitzungen korrekt und getrennt ✓")
+
+
+if __name__ == "__main__":
+    main()
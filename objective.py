@@ -0,0 +1,65 @@
+"""
+Objective for comparing cutting plans.
+
+Besides the number of bars, a plan costs material lost to the saw blade and
+saw time per cut. The evaluator rates a plan by a weighted sum of the three;
+it reads only the cut count and waste of every bar, so comparing alternative
+solutions costs O(bars).
+
+Cut model (kerf k, n pieces, waste w of a bar), implemented by Bar.saw_cuts
+and Bar.kerf_loss in optimizer.py:
+    - one cut between neighbouring pieces: n - 1 cuts, (n - 1) * k kerf loss
+    - one more cut to separate the rest if w > 0; it takes min(k, w)
+    - an end piece that reaches the bar end exactly needs no extra cut
+"""
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List
+
+EPSILON = 1e-9  # Rounding tolerance in mm for fit checks of decimal lengths
+
+
+@dataclass(frozen=True)
+class ObjectiveWeights:
+    """Cost of one bar, one mm of kerf loss and one saw cut."""
+    bars: float = 1.0
+    kerf_loss: float = 0.001
+    cuts: float = 0.01
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'ObjectiveWeights':
+        """Build the weights from a dictionary, ignoring unknown keys."""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: float(value) for key, value in values.items() if key in names})
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """Objective values of a plan and their weighted cost."""
+    bars: int
+    cuts: int
+    kerf_loss: float
+    cost: float
+
+
+def evaluate(bars: List, kerf: float, weights: ObjectiveWeights = ObjectiveWeights()) -> Evaluation:
+    """
+    Rate a plan by bar count, saw cuts and kerf loss.
+
+    Args:
+        bars: Bars of the plan (bars without cuts are ignored)
+        kerf: Saw blade kerf in mm
+        weights: Cost per bar, mm of kerf loss and cut
+
+    Returns:
+        Evaluation with the objective values and the weighted cost
+    """
+    count = cuts = 0
+    kerf_loss = 0.0
+    for bar in bars:
+        if not bar.cuts:
+            continue
+        count += 1
+        cuts += bar.saw_cuts
+        kerf_loss += bar.kerf_loss(kerf)
+    cost = weights.bars * count + weights.kerf_loss * kerf_loss + weights.cuts * cuts
+    return Evaluation(count, cuts, kerf_loss, cost)
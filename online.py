@@ -0,0 +1,178 @@
+"""
+Online packing for cuts that arrive during the day.
+
+The packer keeps the open bars of every material in memory together with a
+capacity index: a sorted list of (free length for one more piece, bar id).
+A new cut goes to the open bar with the least free length that still holds
+it (best fit), found by one binary search; if none fits, a fresh bar is
+opened. So placing a cut costs O(log open bars) comparisons.
+
+A bar is closed (committed to the saw) once its fill reaches the threshold
+or it has been open for longer than the time limit. Closed bars never change
+again and are handed to the optional on_close callback. The packer state can
+be exported at any time in the usual results form, so the Excel and PDF
+writers work on it unchanged.
+"""
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from bounds import lower_bound
+from config import ONLINE_FILL_THRESHOLD, ONLINE_MAX_OPEN_SECONDS
+from objective import EPSILON
+from optimizer import Bar, Cut
+
+
+class _MaterialState:
+    """Open and closed bars of one material."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.index: List[Tuple[float, int]] = []       # (free length for a piece, bar id), sorted
+        self.open: Dict[int, Bar] = {}                  # bar id -> open bar
+        self.opened: Deque[Tuple[float, int]] = deque()  # (opened at, bar id), oldest first
+        self.closed: List[Bar] = []
+        self.cut_lengths: List[float] = []
+
+
+class OnlinePacker:
+    """Best fit packing of single cuts or small batches, with open bars kept in memory."""
+
+    def __init__(self, bar_length: float, kerf: float = 0.0,
+                 fill_threshold: float = ONLINE_FILL_THRESHOLD,
+                 max_open_seconds: Optional[float] = ONLINE_MAX_OPEN_SECONDS,
+                 on_close: Optional[Callable[[str, Bar], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the packer.
+
+        Args:
+            bar_length: Length of the fresh bars in mm
+            kerf: Saw blade kerf in mm
+            fill_threshold: Share of the bar length (incl. kerf) at which a bar is closed
+            max_open_seconds: Bars open for longer are closed (None: no time limit)
+            on_close: Called with (material code, bar) for every closed bar
+            clock: Time source in seconds
+        """
+        self.bar_length = bar_length
+        self.kerf = kerf
+        self.fill_threshold = fill_threshold
+        self.max_open_seconds = max_open_seconds
+        self.on_close = on_close
+        self.clock = clock
+        self.materials: Dict[str, _MaterialState] = {}
+        self._next_id = 0
+
+    def _capacity(self, bar: Bar) -> float:
+        """Longest piece the bar can still take (kerf included)."""
+        return bar.bar_length - bar.total_used - (self.kerf if bar.cuts else 0.0)
+
+    def add(self, cut: Cut) -> Bar:
+        """
+        Place one cut.
+
+        Returns:
+            The bar holding the cut (it may already be closed)
+        """
+        self.close_expired()
+        state = self.materials.get(cut.material_code)
+        if state is None:
+            state = self.materials[cut.material_code] = _MaterialState(cut.material_name)
+        state.cut_lengths.append(cut.length)
+
+        # Best fit: the open bar with the least capacity that still holds the cut
+        position = bisect_left(state.index, (cut.length - EPSILON, -1))
+        if position < len(state.index):
+            _, bar_id = state.index.pop(position)
+            bar = state.open[bar_id]
+            bar.add_cut(cut.length, self.kerf)
+        else:
+            bar_id = self._next_id
+            self._next_id += 1
+            bar = Bar(bar_number=0, cuts=[cut.length], total_used=cut.length, bar_length=self.bar_length)
+            state.open[bar_id] = bar
+            state.opened.append((self.clock(), bar_id))
+        bar.orders.append(cut.order_id)
+
+        if bar.total_used >= self.fill_threshold * bar.bar_length - EPSILON or self._capacity(bar) < -EPSILON:
+            self._close(cut.material_code, state, bar_id)
+        else:
+            insort(state.index, (self._capacity(bar), bar_id))
+        return bar
+
+    def add_many(self, cuts: List[Cut]) -> List[Bar]:
+        """Place a small batch, longest cuts first. Returns the bar of every cut (input order)."""
+        order = sorted(range(len(cuts)), key=lambda i: -cuts[i].length)
+        bars: List[Optional[Bar]] = [None] * len(cuts)
+        for i in order:
+            bars[i] = self.add(cuts[i])
+        return bars
+
+    def close_expired(self) -> List[Tuple[str, Bar]]:
+        """Close all bars that are open for longer than max_open_seconds."""
+        closed = []
+        if self.max_open_seconds is None:
+            return closed
+        deadline = self.clock() - self.max_open_seconds
+        for material_code, state in self.materials.items():
+            while state.opened and state.opened[0][0] <= deadline:
+                bar = self._close_oldest(material_code, state)
+                if bar is not None:
+                    closed.append((material_code, bar))
+        return closed
+
+    def _close_oldest(self, material_code: str, state: _MaterialState) -> Optional[Bar]:
+        """Close the oldest open bar; entries of bars closed meanwhile are only dropped."""
+        _, bar_id = state.opened[0]
+        bar = state.open.get(bar_id)
+        if bar is None:
+            state.opened.popleft()
+            return None
+        state.index.pop(bisect_left(state.index, (self._capacity(bar), bar_id)))
+        self._close(material_code, state, bar_id)
+        return bar
+
+    def _close(self, material_code: str, state: _MaterialState, bar_id: int):
+        """Commit an open bar (already removed from the capacity index)."""
+        bar = state.open.pop(bar_id)
+        if state.opened and state.opened[0][1] == bar_id:
+            state.opened.popleft()
+        bar.bar_number = len(state.closed) + 1
+        state.closed.append(bar)
+        if self.on_close is not None:
+            self.on_close(material_code, bar)
+
+    def open_bars(self, material_code: str) -> List[Bar]:
+        """Open bars of a material, oldest first."""
+        state = self.materials.get(material_code)
+        if state is None:
+            return []
+        return [state.open[bar_id] for _, bar_id in state.opened if bar_id in state.open]
+
+    def results(self) -> Dict[str, Dict]:
+        """
+        Current plan in the results form of optimize_by_material.
+
+        Closed bars come first in closing order, followed by the open bars.
+        Nothing is closed.
+        """
+        results = {}
+        for material_code, state in self.materials.items():
+            bars = list(state.closed)
+            for number, bar in enumerate(self.open_bars(material_code), start=len(bars) + 1):
+                bar.bar_number = number
+                bars.append(bar)
+            results[material_code] = {
+                'name': state.name,
+                'bars': bars,
+                'lower_bound': lower_bound(state.cut_lengths, self.bar_length, self.kerf),
+            }
+        return results
+
+    def finish(self) -> Dict[str, Dict]:
+        """Close all open bars (oldest first) and return the final plan (see results)."""
+        for material_code, state in self.materials.items():
+            while state.opened:
+                self._close_oldest(material_code, state)
+        return self.results()
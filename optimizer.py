@@ -1,8 +1,29 @@
 """
 Core optimization engine using First Fit Decreasing (FFD) algorithm.
 """
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass, field
+from bisect import bisect_left
+from collections import Counter
+from itertools import groupby
+import copy
+import heapq
+
+from config import (REMNANT_MIN_LENGTH, PATTERN_MAX_COUNT, PATTERN_MAX_LENGTHS, NUMPY_MIN_CUTS,
+                    HEURISTIC_SCORING, SAW_SCHEDULE, OBJECTIVE_WEIGHTS, MULTI_OBJECTIVE_ALGORITHMS)
+from patterns import enumerate_patterns, best_pattern
+from bounds import lower_bound, gap_statistics
+import fitscan
+import profiling
+from saw_schedule import schedule_bars
+from scoring import Scorer, resolve_scorer
+from objective import EPSILON, ObjectiveWeights, evaluate
+from orders import order_queues, assign_orders, split_by_order
+
+
+def _runs(sorted_cuts: List[float]) -> List[Tuple[float, int]]:
+    """Collapse a sorted cut list into (length, count) runs of equal lengths."""
+    return [(length, sum(1 for _ in run)) for length, run in groupby(sorted_cuts)]
 
 
 @dataclass
@@ -11,11 +32,55 @@ class Cut:
     length: float
     material_code: str
     material_name: str
+    order_id: Optional[str] = None  # Order the piece belongs to (multi-order batching)
     
     def __repr__(self):
         return f"Cut({self.length}mm, {self.material_code})"
 
 
+@dataclass(frozen=True)
+class DemandLine:
+    """Aggregated demand: `quantity` cuts of one length and material (and order)."""
+    length: float
+    quantity: int
+    material_code: str
+    material_name: str
+    order_id: Optional[str] = None
+
+
+def aggregate_demand(cuts: List[Cut]) -> List[DemandLine]:
+    """Group cuts into demand lines per (material, length, order), in order of first appearance."""
+    counts = Counter((cut.material_code, cut.length, cut.order_id) for cut in cuts)
+    names: Dict[str, str] = {}
+    for cut in cuts:
+        names.setdefault(cut.material_code, cut.material_name)
+    return [DemandLine(length, quantity, code, names[code], order_id)
+            for (code, length, order_id), quantity in counts.items()]
+
+
+def expand_demand(demand: List[DemandLine]) -> List[Cut]:
+    """One Cut per piece of the demand lines."""
+    return [Cut(line.length, line.material_code, line.material_name, line.order_id)
+            for line in demand for _ in range(line.quantity)]
+
+
+def optimize_demand_profiled(demand: List[DemandLine], multiplier: int = 1, **options) -> Tuple[Dict, Dict]:
+    """
+    Optimize demand lines with a fresh profiler, for use in worker processes.
+    
+    Args:
+        demand: Demand lines
+        multiplier: Multiply all quantities by this factor
+        **options: Keyword arguments for CuttingOptimizer
+        
+    Returns:
+        Tuple (results of optimize_demand, profiler report)
+    """
+    with profiling.profile() as profiler:
+        results = CuttingOptimizer(**options).optimize_demand(demand, multiplier=multiplier)
+    return results, profiler.report()
+
+
 @dataclass
 class Bar:
     """Represents a bar/rod with cuts assigned to it."""
@@ -23,6 +88,8 @@ class Bar:
     cuts: List[float]
     total_used: float
     bar_length: float
+    remnant_id: Optional[int] = None  # Set if this bar is a remnant from the inventory
+    orders: List[Optional[str]] = field(default_factory=list)  # Order ID per cut (multi-order batching)
     
     @property
     def waste(self) -> float:
@@ -34,12 +101,39 @@ class Bar:
         """Calculate efficiency percentage."""
         return (self.total_used / self.bar_length) * 100 if self.bar_length > 0 else 0
     
+    @property
+    def saw_cuts(self) -> int:
+        """
+        Saw cuts needed for this bar.
+        
+        One cut between neighbouring pieces, plus one to separate the last
+        piece from the rest; an end piece that reaches the bar end exactly
+        needs no extra cut.
+        """
+        if not self.cuts:
+            return 0
+        return len(self.cuts) - 1 + (1 if self.waste > EPSILON else 0)
+    
+    def kerf_loss(self, kerf: float) -> float:
+        """Material lost to the saw blade in mm (the last cut only takes what is left)."""
+        if not self.cuts:
+            return 0.0
+        loss = (len(self.cuts) - 1) * kerf
+        if self.waste > EPSILON:
+            loss += min(kerf, self.waste)
+        return loss
+    
     def can_fit(self, cut_length: float, kerf: float = 0.0) -> bool:
-        """Check if a cut can fit in this bar (including kerf if not first cut)."""
+        """
+        Check if a cut can fit in this bar (including kerf if not first cut).
+        
+        Kerf is only charged between pieces, so a piece that ends exactly at
+        the bar end fits; EPSILON absorbs the rounding of decimal lengths.
+        """
         additional_length = cut_length
         if len(self.cuts) > 0:  # Add kerf if not the first cut
             additional_length += kerf
-        return self.total_used + additional_length <= self.bar_length
+        return self.total_used + additional_length <= self.bar_length + EPSILON
     
     def add_cut(self, cut_length: float, kerf: float = 0.0) -> bool:
         """Add a cut to this bar if it fits (including kerf)."""
@@ -48,11 +142,91 @@ class Bar:
             self.total_used += cut_length
             if len(self.cuts) > 1:  # Add kerf to total if not first cut
                 self.total_used += kerf
+            # An exact end piece must not leave a rounding error as waste
+            if self.bar_length - self.total_used <= EPSILON:
+                self.total_used = self.bar_length
             return True
         return False
     
     def __repr__(self):
-        return f"Bar {self.bar_number}: {len(self.cuts)} cuts, {self.total_used:.1f}mm used, {self.waste:.1f}mm waste"
+        remnant = f" (remnant #{self.remnant_id})" if self.remnant_id is not None else ""
+        return f"Bar {self.bar_number}{remnant}: {len(self.cuts)} cuts, {self.total_used:.1f}mm used, {self.waste:.1f}mm waste"
+
+
+@dataclass(frozen=True)
+class StockLength:
+    """Represents a purchasable stock length of a material."""
+    length: float
+    cost: Optional[float] = None  # Price per bar; None means cost proportional to length
+    
+    @property
+    def unit_cost(self) -> float:
+        """Price per bar (length in m if no price is given)."""
+        return self.cost if self.cost is not None else self.length / 1000
+
+
+class StockCatalog:
+    """
+    Precomputed index over the stock lengths of one material.
+    
+    Lengths are sorted once and a suffix index stores the cheapest stock
+    length among all lengths >= a given one, so choosing the stock for a bar
+    is a single binary search.
+    """
+    
+    def __init__(self, stock_lengths: List[StockLength], objective: str = 'material'):
+        """
+        Build the index.
+        
+        Args:
+            stock_lengths: Available stock lengths
+            objective: 'material' (minimise total length) or 'cost' (minimise price)
+        """
+        self.objective = objective
+        
+        # Keep the cheapest entry per length
+        by_length: Dict[float, StockLength] = {}
+        for stock in stock_lengths:
+            current = by_length.get(stock.length)
+            if current is None or stock.unit_cost < current.unit_cost:
+                by_length[stock.length] = stock
+        self.lengths: List[StockLength] = [by_length[length] for length in sorted(by_length)]
+        self._keys = [stock.length for stock in self.lengths]
+        
+        # cheapest[i] = best stock among lengths[i:], shorter one wins ties
+        self._cheapest: List[StockLength] = [None] * len(self.lengths)
+        best = None
+        for i in range(len(self.lengths) - 1, -1, -1):
+            if best is None or self.price(self.lengths[i]) <= self.price(best):
+                best = self.lengths[i]
+            self._cheapest[i] = best
+    
+    def __bool__(self):
+        return bool(self.lengths)
+    
+    def price(self, stock: StockLength) -> float:
+        """Price of one stock bar according to the objective."""
+        return stock.length if self.objective == 'material' else stock.unit_cost
+    
+    def cheapest_fitting(self, used_length: float) -> Optional[StockLength]:
+        """Cheapest stock length that can hold `used_length`, or None."""
+        index = bisect_left(self._keys, used_length)
+        if index == len(self._keys):
+            return None
+        return self._cheapest[index]
+    
+    def total_price(self, bars: List['Bar']) -> float:
+        """Price of all fresh bars (remnants are already paid for)."""
+        total = 0.0
+        for bar in bars:
+            if bar.remnant_id is not None:
+                continue
+            index = bisect_left(self._keys, bar.bar_length)
+            if index < len(self._keys) and self._keys[index] == bar.bar_length:
+                total += self.price(self.lengths[index])
+            else:
+                total += bar.bar_length if self.objective == 'material' else bar.bar_length / 1000
+        return total
 
 
 class CuttingOptimizer:
@@ -60,25 +234,74 @@ class CuttingOptimizer:
     Optimizes cutting lists using various bin packing algorithms.
     """
     
-    def __init__(self, bar_length: float = 3000, algorithm: str = 'BFD', kerf: float = 0.0):
+    def __init__(self, bar_length: float = 3000, algorithm: str = 'BFD', kerf: float = 0.0,
+                 remnant_store=None, min_remnant_length: float = REMNANT_MIN_LENGTH,
+                 stock_lengths: Optional[Dict[str, List]] = None, stock_objective: str = 'material',
+                 backend: str = 'auto', heuristic_scoring: Optional[Dict[str, object]] = None,
+                 saw_schedule: bool = SAW_SCHEDULE,
+                 objective_weights: Optional[Dict[str, float]] = None):
         """
         Initialize the optimizer.
         
         Args:
             bar_length: Standard length of bars/rods in mm
-            algorithm: Algorithm to use ('FFD', 'BFD', or 'Heuristic')
+            algorithm: Algorithm to use ('FFD', 'BFD', 'Heuristic', 'Pattern' or 'Multi')
             kerf: Saw blade thickness/kerf in mm (cutting loss per cut)
+            remnant_store: Optional RemnantStore; its remnants are filled before fresh bars
+                and new remnants of at least min_remnant_length are written back
+            min_remnant_length: Minimum length in mm of a remnant worth storing
+            stock_lengths: Optional stock lengths per material code (multi-length mode).
+                Values are lists of StockLength or (length, price) tuples; the key
+                'default' applies to materials without their own entry.
+            stock_objective: 'material' or 'cost', what the multi-length mode minimises
+            backend: Fit scan for BFD and Heuristic: 'python', 'numpy' or 'auto'
+                (NumPy from NUMPY_MIN_CUTS cuts on, if installed)
+            heuristic_scoring: Optional Heuristic scorer per material code (scorer name,
+                ScoreParams or dict, see scoring.resolve_scorer); the key 'default'
+                applies to materials without their own entry. Defaults to
+                HEURISTIC_SCORING from config.py.
+            saw_schedule: Re-sequence bars and cuts of optimize_by_material/optimize_demand
+                for few length stop changes (see saw_schedule.py)
+            objective_weights: Weights of bars, kerf loss and saw cuts for the 'Multi'
+                algorithm (see objective.ObjectiveWeights). Defaults to
+                OBJECTIVE_WEIGHTS from config.py.
         """
         self.bar_length = bar_length
         self.algorithm = algorithm
         self.kerf = kerf
+        self.remnant_store = remnant_store
+        self.min_remnant_length = min_remnant_length
+        self.backend = backend
+        self.saw_schedule = saw_schedule
+        self.objective_weights = ObjectiveWeights.from_dict(objective_weights or OBJECTIVE_WEIGHTS)
+        
+        # Precompute the stock index per material once
+        self.stock_catalogs: Dict[str, StockCatalog] = {}
+        for material_code, entries in (stock_lengths or {}).items():
+            stock = [entry if isinstance(entry, StockLength) else StockLength(*entry) for entry in entries]
+            self.stock_catalogs[material_code] = StockCatalog(stock, stock_objective)
+        
+        # Resolve the Heuristic scorers once, not per bar
+        self.heuristic_scorers: Dict[str, Scorer] = {
+            material_code: resolve_scorer(spec)
+            for material_code, spec in (heuristic_scoring or HEURISTIC_SCORING).items()
+        }
+        self.heuristic_scorers.setdefault('default', resolve_scorer())
+    
+    def scorer_for(self, material_code: Optional[str] = None) -> Scorer:
+        """Heuristic scorer for a material code (falls back to 'default')."""
+        return self.heuristic_scorers.get(material_code, self.heuristic_scorers['default'])
     
-    def optimize(self, cuts: List[float]) -> List[Bar]:
+    def optimize(self, cuts: List[float], stock: Optional[List[Bar]] = None,
+                 material_code: Optional[str] = None) -> List[Bar]:
         """
         Optimize a list of cuts using the selected algorithm.
         
         Args:
             cuts: List of cut lengths to optimize
+            stock: Optional empty bars (e.g. remnants) that are filled before new
+                bars of bar_length are opened. Stock bars left empty are dropped.
+            material_code: Optional material code, selects the Heuristic scorer
             
         Returns:
             List of Bar objects with optimal cut assignments
@@ -87,15 +310,103 @@ class CuttingOptimizer:
             return []
         
         if self.algorithm == 'FFD':
-            return self._optimize_ffd(cuts)
+            bars = self._optimize_ffd(cuts, stock)
         elif self.algorithm == 'BFD':
-            return self._optimize_bfd(cuts)
+            bars = self._optimize_bfd(cuts, stock)
+        elif self.algorithm == 'Pattern':
+            bars = self._optimize_pattern(cuts, stock)
+        elif self.algorithm == 'Multi':
+            bars = self._optimize_multi_objective(cuts, stock, material_code)
         else:  # Heuristic
-            return self._optimize_heuristic(cuts)
+            bars = self._optimize_heuristic(cuts, stock, self.scorer_for(material_code))
+        
+        if stock:
+            bars = [bar for bar in bars if bar.cuts]
+            for number, bar in enumerate(bars, start=1):
+                bar.bar_number = number
+        
+        return bars
+    
+    def _optimize_multi_objective(self, cuts: List[float], stock: Optional[List[Bar]] = None,
+                                  material_code: Optional[str] = None) -> List[Bar]:
+        """
+        Multi-objective: Solve with every algorithm of MULTI_OBJECTIVE_ALGORITHMS
+        and keep the solution with the lowest weighted cost of bars, kerf loss
+        and saw cuts (see objective.py). Ties go to the earlier algorithm.
+        
+        Under an active profiler every candidate runs in its own profiler and
+        only the counters and stages of the kept solution are merged, so
+        `cuts_placed` etc. describe one plan, not the sum of all candidates.
+        """
+        parent = profiling.active()
+        best_cost, best_bars, best_report = None, [], None
+        for algorithm in MULTI_OBJECTIVE_ALGORITHMS:
+            solver = copy.copy(self)
+            solver.algorithm = algorithm
+            report = None
+            if parent is None:
+                bars = solver.optimize(cuts, stock, material_code)
+            else:
+                with profiling.profile() as candidate:
+                    bars = solver.optimize(cuts, stock, material_code)
+                report = candidate.report()
+            cost = evaluate(bars, self.kerf, self.objective_weights).cost
+            if best_cost is None or cost < best_cost:
+                best_cost, best_bars, best_report = cost, bars, report
+        if best_report is not None:
+            parent.merge(best_report)
+        return best_bars
+    
+    def _initial_bars(self, stock: Optional[List[Bar]]) -> List[Bar]:
+        """Start with the given stock bars, or with one empty bar of bar_length."""
+        if stock:
+            return [Bar(
+                bar_number=number,
+                cuts=[],
+                total_used=0.0,
+                bar_length=bar.bar_length,
+                remnant_id=bar.remnant_id
+            ) for number, bar in enumerate(stock, start=1)]
+        
+        return [Bar(
+            bar_number=1,
+            cuts=[],
+            total_used=0.0,
+            bar_length=self.bar_length
+        )]
+    
+    def _new_bar(self, bars: List[Bar], cut_length: float) -> Bar:
+        """Open a fresh bar holding one cut and append it to `bars`."""
+        new_bar = Bar(
+            bar_number=len(bars) + 1,
+            cuts=[cut_length],
+            total_used=cut_length,
+            bar_length=self.bar_length
+        )
+        bars.append(new_bar)
+        return new_bar
+    
+    def _fill_bar(self, bar: Bar, cut_length: float, count: int) -> int:
+        """Add up to `count` copies of a cut to one bar. Returns the number still open."""
+        while count and bar.add_cut(cut_length, self.kerf):
+            count -= 1
+        return count
+    
+    @staticmethod
+    def _count(cuts_placed: int, bars_scanned: int, fit_checks: int):
+        """Report the counters of one solver run to the active profiler."""
+        if profiling.active() is not None:
+            profiling.count('cuts_placed', cuts_placed)
+            profiling.count('bars_scanned', bars_scanned)
+            profiling.count('fit_checks', fit_checks)
     
-    def _optimize_ffd(self, cuts: List[float]) -> List[Bar]:
+    def _optimize_ffd(self, cuts: List[float], stock: Optional[List[Bar]] = None) -> List[Bar]:
         """
         First Fit Decreasing: Place each cut in the first bar that fits.
+        
+        Equal lengths are placed as one run: bars that rejected a piece of the
+        run are never scanned again for the same length, and each bar takes as
+        many copies as fit in one step.
         """
         if not cuts:
             return []
@@ -103,144 +414,310 @@ class CuttingOptimizer:
         # Sort cuts in descending order
         sorted_cuts = sorted(cuts, reverse=True)
         
-        # Initialize first bar
-        bars: List[Bar] = [Bar(
-            bar_number=1,
-            cuts=[],
-            total_used=0.0,
-            bar_length=self.bar_length
-        )]
+        # Initialize bars (stock first, if any)
+        bars: List[Bar] = self._initial_bars(stock)
         
-        # Apply First Fit Decreasing
-        for cut_length in sorted_cuts:
-            placed = False
-            
-            # Try to fit in existing bars (first fit)
-            for bar in bars:
-                if bar.add_cut(cut_length, self.kerf):
-                    placed = True
-                    break
-            
-            # Create new bar if cut doesn't fit anywhere
-            if not placed:
-                new_bar = Bar(
-                    bar_number=len(bars) + 1,
-                    cuts=[cut_length],
-                    total_used=cut_length,
-                    bar_length=self.bar_length
-                )
-                bars.append(new_bar)
+        initial_bars = len(bars)
+        scanned = rejected = 0
         
+        # Apply First Fit Decreasing, one run of equal lengths at a time
+        for cut_length, count in _runs(sorted_cuts):
+            # Rejection frontier: bars before it cannot take this length
+            frontier = 0
+            while count:
+                # Try to fit in existing bars (first fit)
+                start = frontier
+                while frontier < len(bars) and not bars[frontier].can_fit(cut_length, self.kerf):
+                    frontier += 1
+                scanned += frontier - start
+                
+                if frontier < len(bars):
+                    scanned += 1
+                    count = self._fill_bar(bars[frontier], cut_length, count)
+                else:
+                    # Create new bar if cut doesn't fit anywhere
+                    count = self._fill_bar(self._new_bar(bars, cut_length), cut_length, count - 1)
+                rejected += count > 0
+                frontier += 1
+        
+        # Fit checks: the scan, one per cut added to an open bar, one per stopped fill
+        new_bars = len(bars) - initial_bars
+        self._count(len(cuts), scanned, scanned + len(cuts) - new_bars + rejected)
         return bars
     
-    def _optimize_bfd(self, cuts: List[float]) -> List[Bar]:
+    def _optimize_bfd(self, cuts: List[float], stock: Optional[List[Bar]] = None) -> List[Bar]:
         """
         Best Fit Decreasing: Place each cut in the bar with smallest remaining space.
+        
+        For a run of equal lengths the fitting bars are ranked once. The best
+        bar stays best while it is filled (its remaining space only shrinks),
+        so it takes as many copies as fit before the next bar is used.
         """
         if not cuts:
             return []
+        if self._vectorized(cuts):
+            return self._optimize_bfd_numpy(cuts, stock)
         
         # Step 1: Sort cuts in descending order (BFD)
         sorted_cuts = sorted(cuts, reverse=True)
         
-        # Step 2: Initialize first bar
-        bars: List[Bar] = [Bar(
-            bar_number=1,
-            cuts=[],
-            total_used=0.0,
-            bar_length=self.bar_length
-        )]
+        # Step 2: Initialize bars (stock first, if any)
+        bars: List[Bar] = self._initial_bars(stock)
         
-        # Step 3: Apply Best Fit Decreasing
-        for cut_length in sorted_cuts:
-            # Find the bar with the smallest remaining space that can fit the cut
-            best_bar = None
-            best_remaining = float('inf')
-            
-            for bar in bars:
+        initial_bars = len(bars)
+        scanned = rejected = 0
+        
+        # Step 3: Apply Best Fit Decreasing, one run of equal lengths at a time
+        for cut_length, count in _runs(sorted_cuts):
+            # Rank bars that can fit the cut by remaining space after adding cut and kerf
+            scanned += len(bars)
+            candidates = []
+            for index, bar in enumerate(bars):
                 if bar.can_fit(cut_length, self.kerf):
-                    # Calculate remaining space after adding cut and kerf
                     additional_length = cut_length + (self.kerf if len(bar.cuts) > 0 else 0)
-                    remaining_after = bar.waste - additional_length
-                    if remaining_after < best_remaining:
-                        best_remaining = remaining_after
-                        best_bar = bar
+                    candidates.append((bar.waste - additional_length, index))
+            heapq.heapify(candidates)
             
-            # If found a suitable bar, add the cut
-            if best_bar is not None:
-                best_bar.add_cut(cut_length, self.kerf)
-            else:
-                # Create new bar if cut doesn't fit anywhere
-                new_bar = Bar(
-                    bar_number=len(bars) + 1,
-                    cuts=[cut_length],
-                    total_used=cut_length,
-                    bar_length=self.bar_length
-                )
-                bars.append(new_bar)
+            while count:
+                if candidates:
+                    _, index = heapq.heappop(candidates)
+                    count = self._fill_bar(bars[index], cut_length, count)
+                else:
+                    # Create new bar if cut doesn't fit anywhere
+                    count = self._fill_bar(self._new_bar(bars, cut_length), cut_length, count - 1)
+                rejected += count > 0
         
+        new_bars = len(bars) - initial_bars
+        self._count(len(cuts), scanned, scanned + len(cuts) - new_bars + rejected)
         return bars
     
-    def _optimize_heuristic(self, cuts: List[float]) -> List[Bar]:
+    def _optimize_heuristic(self, cuts: List[float], stock: Optional[List[Bar]] = None,
+                            scorer: Optional[Scorer] = None) -> List[Bar]:
         """
         Heuristic approach: Combine BFD with intelligent grouping.
         Groups similar-sized cuts for better packing efficiency.
+        
+        Each fitting bar is rated by the scorer (see scoring.py); by default it
+        prefers less waste like BFD, rewards a remaining length that can still
+        take other cuts and penalizes nearly full bars.
+        
+        For a run of equal lengths the fitting bars are kept in a heap by
+        score; only the bar that just received a cut is re-scored.
         """
         if not cuts:
             return []
+        score = (scorer or self.scorer_for()).score
+        if self._vectorized(cuts):
+            return self._optimize_heuristic_numpy(cuts, stock, scorer or self.scorer_for())
         
         # Sort cuts in descending order
         sorted_cuts = sorted(cuts, reverse=True)
         
-        # Initialize first bar
-        bars: List[Bar] = [Bar(
-            bar_number=1,
-            cuts=[],
-            total_used=0.0,
-            bar_length=self.bar_length
-        )]
+        # Initialize bars (stock first, if any)
+        bars: List[Bar] = self._initial_bars(stock)
+        
+        initial_bars = len(bars)
+        runs = _runs(sorted_cuts)
+        scanned = 0
         
         # Heuristic: Try to group cuts intelligently
-        for cut_length in sorted_cuts:
-            best_bar = None
-            best_score = float('-inf')
-            
-            for bar in bars:
+        for cut_length, count in runs:
+            # Highest score first, ties go to the first bar
+            scanned += len(bars)
+            candidates = []
+            for index, bar in enumerate(bars):
                 if bar.can_fit(cut_length, self.kerf):
                     # Calculate remaining space after adding cut and kerf
                     additional_length = cut_length + (self.kerf if len(bar.cuts) > 0 else 0)
-                    remaining_after = bar.waste - additional_length
-                    
-                    # Heuristic scoring:
-                    # 1. Prefer bars with less waste (like BFD)
-                    # 2. But also consider if remaining space could fit other pending cuts
-                    # 3. Penalize nearly-full bars to leave room for optimization
-                    
-                    waste_score = -remaining_after  # Prefer smaller waste
-                    
-                    # Bonus if remaining space is useful for future cuts
-                    if remaining_after > 100:  # At least 100mm useful
-                        waste_score += 50
-                    
-                    # Penalty for nearly full bars (less than 5% remaining)
-                    if remaining_after < self.bar_length * 0.05:
-                        waste_score -= 100
-                    
-                    if waste_score > best_score:
-                        best_score = waste_score
-                        best_bar = bar
+                    candidates.append((-score(bar.waste - additional_length, bar.bar_length), index))
+            heapq.heapify(candidates)
             
-            # Place cut in best bar or create new one
-            if best_bar is not None:
-                best_bar.add_cut(cut_length, self.kerf)
-            else:
-                new_bar = Bar(
-                    bar_number=len(bars) + 1,
-                    cuts=[cut_length],
-                    total_used=cut_length,
-                    bar_length=self.bar_length
-                )
-                bars.append(new_bar)
+            while count:
+                # Place cut in best bar or create new one
+                if candidates:
+                    _, index = heapq.heappop(candidates)
+                    bar = bars[index]
+                    bar.add_cut(cut_length, self.kerf)
+                else:
+                    bar = self._new_bar(bars, cut_length)
+                    index = len(bars) - 1
+                count -= 1
+                
+                # Only the bar that received the cut has a new score
+                if count and bar.can_fit(cut_length, self.kerf):
+                    additional_length = cut_length + self.kerf
+                    heapq.heappush(candidates, (-score(bar.waste - additional_length, bar.bar_length), index))
+        
+        # Fit checks: the scan, one per cut added to an open bar, one re-check per cut but the last of a run
+        new_bars = len(bars) - initial_bars
+        self._count(len(cuts), scanned, scanned + 2 * len(cuts) - new_bars - len(runs))
+        return bars
+    
+    def _vectorized(self, cuts: List[float]) -> bool:
+        """Decide whether BFD/Heuristic use the NumPy fit scan for this cut list."""
+        if self.backend == 'numpy':
+            return fitscan.available()
+        if self.backend == 'auto':
+            return len(cuts) >= NUMPY_MIN_CUTS and fitscan.available()
+        return False
+    
+    def _optimize_bfd_numpy(self, cuts: List[float], stock: Optional[List[Bar]] = None) -> List[Bar]:
+        """
+        Best Fit Decreasing with the vectorized fit scan. Same result as _optimize_bfd.
+        """
+        sorted_cuts = sorted(cuts, reverse=True)
+        bars: List[Bar] = self._initial_bars(stock)
+        scan = fitscan.FitScan(bars, len(bars) + len(cuts), self.kerf)
+        initial_bars = len(bars)
+        scanned = rejected = 0
+        
+        for cut_length, count in _runs(sorted_cuts):
+            # All fitting bars ranked by remaining space in one scan
+            scanned += scan.count
+            for index in scan.best_fit_order(cut_length):
+                count = self._fill_bar(bars[index], cut_length, count)
+                scan.update(index, bars[index])
+                rejected += count > 0
+                if not count:
+                    break
+            
+            while count:
+                # Create new bar if cut doesn't fit anywhere
+                count = self._fill_bar(self._new_bar(bars, cut_length), cut_length, count - 1)
+                scan.update(len(bars) - 1, bars[-1])
+                rejected += count > 0
+        
+        # The vectorized scan is counted as bars scanned, fit checks are the scalar ones
+        new_bars = len(bars) - initial_bars
+        self._count(len(cuts), scanned, len(cuts) - new_bars + rejected)
+        return bars
+    
+    def _optimize_heuristic_numpy(self, cuts: List[float], stock: Optional[List[Bar]],
+                                  scorer: Scorer) -> List[Bar]:
+        """
+        Heuristic with the vectorized fit scan. Same result as _optimize_heuristic.
+        """
+        sorted_cuts = sorted(cuts, reverse=True)
+        bars: List[Bar] = self._initial_bars(stock)
+        scan = fitscan.FitScan(bars, len(bars) + len(cuts), self.kerf)
+        initial_bars = len(bars)
+        scanned = 0
+        
+        for cut_length, count in _runs(sorted_cuts):
+            # Scores of all bars at once, -inf where the cut does not fit
+            scanned += scan.count
+            scores = scan.heuristic_scores(cut_length, scorer.scores)
+            
+            while count:
+                # argmax returns the first bar with the highest score
+                index = int(scores[:scan.count].argmax())
+                if scores[index] > float('-inf'):
+                    bar = bars[index]
+                    bar.add_cut(cut_length, self.kerf)
+                else:
+                    bar = self._new_bar(bars, cut_length)
+                    index = len(bars) - 1
+                scan.update(index, bar)
+                count -= 1
+                
+                # Only the bar that received the cut has a new score
+                if bar.can_fit(cut_length, self.kerf):
+                    additional_length = cut_length + self.kerf
+                    scores[index] = scorer.score(bar.waste - additional_length, bar.bar_length)
+                else:
+                    scores[index] = float('-inf')
+        
+        new_bars = len(bars) - initial_bars
+        self._count(len(cuts), scanned, 2 * len(cuts) - new_bars)
+        return bars
+    
+    def _optimize_pattern(self, cuts: List[float], stock: Optional[List[Bar]] = None) -> List[Bar]:
+        """
+        Pattern-based: Repeatedly cut the pattern with the least waste that
+        contains the longest open length.
+        
+        If the pattern solution is not proven optimal by the lower bound, BFD
+        is tried as well and the solution with fewer bars is kept.
+        """
+        if not cuts:
+            return []
+        
+        bars = self._pattern_pass(cuts, stock)
+        if not stock and len(bars) <= lower_bound(cuts, self.bar_length, self.kerf):
+            # Proven optimal, no need to try anything else
+            return bars
+        
+        alternative = self._optimize_bfd(cuts, stock)
+        alternative = [bar for bar in alternative if bar.cuts]
+        if (len(alternative), sum(bar.waste for bar in alternative)) < (len(bars), sum(bar.waste for bar in bars)):
+            return alternative
+        return bars
+    
+    def _pattern_pass(self, cuts: List[float], stock: Optional[List[Bar]] = None) -> List[Bar]:
+        """
+        One pass of the pattern heuristic.
+        
+        Patterns come from the cached pattern table of the distinct lengths and
+        each chosen pattern is repeated as often as the open demand allows.
+        """
+        demand = Counter(cuts)
+        if len(demand) > PATTERN_MAX_LENGTHS:
+            # Too many distinct lengths for a pattern table
+            return self._optimize_bfd(cuts, stock)
+        lengths = sorted(demand, reverse=True)
+        remaining = [demand[length] for length in lengths]
+        bars: List[Bar] = []
+        
+        def cut_bar(bar_length: float, counts: Tuple[int, ...], remnant_id: Optional[int] = None) -> int:
+            bar = Bar(
+                bar_number=len(bars) + 1,
+                cuts=[],
+                total_used=0.0,
+                bar_length=bar_length,
+                remnant_id=remnant_id
+            )
+            for i, count in enumerate(counts):
+                for _ in range(count):
+                    if bar.add_cut(lengths[i], self.kerf):
+                        remaining[i] -= 1
+            if bar.cuts:
+                bars.append(bar)
+            return len(bar.cuts)
+        
+        # Stock bars (e.g. remnants) first, each with its own best pattern
+        for stock_bar in stock or []:
+            if not any(remaining):
+                break
+            table = enumerate_patterns(lengths, stock_bar.bar_length, self.kerf)
+            pattern = best_pattern(table, remaining, lengths, self.kerf, stock_bar.bar_length)
+            if pattern is not None:
+                cut_bar(stock_bar.bar_length, pattern.counts, stock_bar.remnant_id)
+        
+        # Fresh bars from the pattern table. A truncated table (too many distinct
+        # lengths) is not worth selecting from, the rest is packed with BFD below.
+        table = enumerate_patterns(lengths, self.bar_length, self.kerf)
+        while any(remaining) and len(table) < PATTERN_MAX_COUNT:
+            longest = next(i for i, count in enumerate(remaining) if count)
+            pattern = best_pattern(table, remaining, lengths, self.kerf, self.bar_length, required=longest)
+            if pattern is None:
+                break
+            
+            repeat = min(remaining[i] // count for i, count in enumerate(pattern.counts) if count)
+            placed = 0
+            for _ in range(repeat):
+                placed += cut_bar(self.bar_length, pattern.counts)
+            if placed == 0:
+                break
+        
+        # Pieces no pattern could place (e.g. longer than the bar) are packed with BFD
+        leftover = [length for i, length in enumerate(lengths) for _ in range(remaining[i])]
+        profiling.count('cuts_placed', len(cuts) - len(leftover))
+        profiling.count('pattern_bars', len(bars))
+        if leftover:
+            for bar in self._optimize_bfd(leftover):
+                if bar.cuts:
+                    bar.bar_number = len(bars) + 1
+                    bars.append(bar)
         
         return bars
     
@@ -258,56 +735,241 @@ class CuttingOptimizer:
         # Group cuts by material
         material_groups: Dict[str, List[float]] = {}
         material_names: Dict[str, str] = {}
+        material_orders: Dict[str, List[Tuple[float, Optional[str], int]]] = {}
+        
+        with profiling.stage('optimizer.group'):
+            for cut in cuts:
+                if cut.material_code not in material_groups:
+                    material_groups[cut.material_code] = []
+                    material_names[cut.material_code] = cut.material_name
+                    material_orders[cut.material_code] = []
+                # Apply multiplier to each cut
+                for _ in range(multiplier):
+                    material_groups[cut.material_code].append(cut.length)
+                material_orders[cut.material_code].append((cut.length, cut.order_id, multiplier))
+        
+        if not any(cut.order_id is not None for cut in cuts):
+            material_orders = None
+        return self._optimize_groups(material_groups, material_names, material_orders)
+    
+    def optimize_demand(self, demand: List[DemandLine], multiplier: int = 1) -> Dict[str, Dict]:
+        """
+        Optimize aggregated demand lines grouped by material.
         
-        for cut in cuts:
-            if cut.material_code not in material_groups:
-                material_groups[cut.material_code] = []
-                material_names[cut.material_code] = cut.material_name
-            # Apply multiplier to each cut
-            for _ in range(multiplier):
-                material_groups[cut.material_code].append(cut.length)
+        Same result as optimize_by_material on the expanded cuts, without
+        creating a Cut object per piece.
         
-        # Optimize each material group
+        Args:
+            demand: Demand lines (e.g. from ExcelHandler.read_demand_from_excel)
+            multiplier: Multiply all quantities by this factor (default: 1)
+            
+        Returns:
+            Dictionary mapping material codes to optimized bar lists
+        """
+        material_groups: Dict[str, List[float]] = {}
+        material_names: Dict[str, str] = {}
+        material_orders: Dict[str, List[Tuple[float, Optional[str], int]]] = {}
+        
+        with profiling.stage('optimizer.group'):
+            for line in demand:
+                if line.material_code not in material_groups:
+                    material_groups[line.material_code] = []
+                    material_names[line.material_code] = line.material_name
+                    material_orders[line.material_code] = []
+                material_groups[line.material_code].extend([line.length] * (line.quantity * multiplier))
+                material_orders[line.material_code].append((line.length, line.order_id, line.quantity * multiplier))
+        
+        if not any(line.order_id is not None for line in demand):
+            material_orders = None
+        return self._optimize_groups(material_groups, material_names, material_orders)
+    
+    def _optimize_groups(self, material_groups: Dict[str, List[float]],
+                         material_names: Dict[str, str],
+                         material_orders: Optional[Dict[str, List[Tuple[float, Optional[str], int]]]] = None
+                         ) -> Dict[str, Dict]:
+        """
+        Optimize the cut lengths of every material (results keyed by material code).
+        
+        With material_orders ((length, order_id, count) per material) the pieces
+        of all orders are packed jointly and every piece is tagged with its
+        order in bar.orders (see orders.py).
+        """
         results = {}
         for material_code, cut_lengths in material_groups.items():
-            bars = self.optimize(cut_lengths)
+            catalog = self.stock_catalogs.get(material_code, self.stock_catalogs.get('default'))
+            while True:
+                with profiling.stage('optimizer.remnants'):
+                    stock = self._remnant_stock(material_code, cut_lengths)
+                with profiling.stage(f'optimizer.pack.{self.algorithm}'):
+                    if catalog:
+                        bars = self._optimize_multi_stock(cut_lengths, catalog, stock, material_code)
+                    else:
+                        bars = self.optimize(cut_lengths, stock, material_code)
+                if self.remnant_store is None:
+                    break
+                with profiling.stage('optimizer.remnants'):
+                    if self._update_remnant_store(material_code, bars):
+                        break
+                # Another session used one of the planned remnants meanwhile: plan again
+            if self.saw_schedule:
+                with profiling.stage('optimizer.schedule'):
+                    bars = schedule_bars(bars)
+            if material_orders:
+                with profiling.stage('optimizer.orders'):
+                    assign_orders(bars, order_queues(material_orders[material_code]))
+            # Lower bound for the bar count, based on the longest available bar
+            longest_bar = max([self.bar_length]
+                              + [entry.length for entry in (catalog.lengths if catalog else [])]
+                              + [bar.bar_length for bar in stock])
+            with profiling.stage('optimizer.lower_bound'):
+                bound = lower_bound(cut_lengths, longest_bar, self.kerf)
+            
             # Add material info to results
             results[material_code] = {
                 'name': material_names[material_code],
-                'bars': bars
+                'bars': bars,
+                'lower_bound': bound
             }
         
         return results
     
+    def online(self, **options):
+        """
+        Start online packing: cuts are added one by one or in small batches
+        and bars are closed by fill threshold or time limit.
+        
+        Uses bar_length and kerf of this optimizer; stock lengths and the
+        remnant inventory are not used online.
+        
+        Args:
+            **options: fill_threshold, max_open_seconds, on_close, clock (see online.OnlinePacker)
+            
+        Returns:
+            OnlinePacker
+        """
+        from online import OnlinePacker
+        return OnlinePacker(self.bar_length, self.kerf, **options)
+    
+    def split_by_order(self, results: Dict[str, Dict]) -> Dict[Optional[str], Dict[str, Dict]]:
+        """
+        Split a jointly packed plan into work plans and material cost per order.
+        
+        Args:
+            results: Results of optimize_by_material/optimize_demand for cuts with order IDs
+            
+        Returns:
+            Results per order ID (see orders.split_by_order)
+        """
+        with profiling.stage('optimizer.split_orders'):
+            return split_by_order(results, self.kerf, self.stock_catalogs)
+    
+    def _optimize_multi_stock(self, cut_lengths: List[float], catalog: StockCatalog,
+                              stock: Optional[List[Bar]] = None,
+                              material_code: Optional[str] = None) -> List[Bar]:
+        """
+        Pack cuts onto bars of several stock lengths (variable-sized bin packing).
+        
+        The cuts are packed once per candidate stock length. Afterwards every
+        fresh bar is cut from the cheapest stock length that holds its cuts,
+        and the candidate with the lowest total price wins.
+        """
+        longest_cut = max(cut_lengths)
+        candidates = [s for s in catalog.lengths if s.length >= longest_cut] or catalog.lengths[-1:]
+        
+        best_bars, best_key = None, None
+        for candidate in candidates:
+            variant = copy.copy(self)
+            variant.bar_length = candidate.length
+            bars = variant.optimize(cut_lengths, stock, material_code)
+            
+            for bar in bars:
+                if bar.remnant_id is None:
+                    fitting = catalog.cheapest_fitting(bar.total_used)
+                    if fitting is not None:
+                        bar.bar_length = fitting.length
+            
+            key = (catalog.total_price(bars), len(bars))
+            if best_key is None or key < best_key:
+                best_bars, best_key = bars, key
+        
+        return best_bars
+    
+    def _remnant_stock(self, material_code: str, cut_lengths: List[float]) -> List[Bar]:
+        """
+        Load the stored remnants of a material as stock bars, shortest first.
+        
+        Remnants shorter than the shortest cut can never be used and are skipped.
+        """
+        if self.remnant_store is None:
+            return []
+        
+        remnants = self.remnant_store.available(material_code, min_length=min(cut_lengths))
+        return [Bar(
+            bar_number=number,
+            cuts=[],
+            total_used=0.0,
+            bar_length=remnant.length,
+            remnant_id=remnant.remnant_id
+        ) for number, remnant in enumerate(remnants, start=1)]
+    
+    def _update_remnant_store(self, material_code: str, bars: List[Bar]) -> bool:
+        """
+        Claim the consumed remnants and store the new usable remnants.
+        
+        Returns:
+            False (and nothing is changed) if another session used one of the
+            planned remnants in the meantime
+        """
+        consumed = [bar.remnant_id for bar in bars if bar.remnant_id is not None]
+        if consumed and not self.remnant_store.claim(consumed):
+            return False
+        
+        # The cut separating the last piece from the remnant costs one kerf
+        new_remnants = []
+        for bar in bars:
+            usable_length = bar.waste - self.kerf
+            if bar.cuts and usable_length >= self.min_remnant_length:
+                new_remnants.append((material_code, usable_length))
+        if new_remnants:
+            self.remnant_store.add_many(new_remnants, source=f"{material_code} Zuschnitt")
+        return True
+    
     @staticmethod
-    def calculate_statistics(bars: List[Bar]) -> Dict[str, float]:
+    def calculate_statistics(bars: List[Bar], lower_bound: Optional[int] = None) -> Dict[str, float]:
         """
         Calculate optimization statistics.
         
         Args:
             bars: List of optimized bars
+            lower_bound: Optional lower bound for the bar count (see optimize_by_material);
+                adds 'lower_bound', 'gap_bars', 'gap_percent' and 'proven_optimal'
             
         Returns:
             Dictionary with statistics
         """
         if not bars:
-            return {
+            stats = {
                 'total_bars': 0,
                 'total_cuts': 0,
                 'total_length_used': 0,
                 'total_waste': 0,
                 'average_efficiency': 0
             }
+        else:
+            total_cuts = sum(len(bar.cuts) for bar in bars)
+            total_length = sum(bar.total_used for bar in bars)
+            total_waste = sum(bar.waste for bar in bars)
+            avg_efficiency = sum(bar.efficiency for bar in bars) / len(bars)
+            
+            stats = {
+                'total_bars': len(bars),
+                'total_cuts': total_cuts,
+                'total_length_used': total_length,
+                'total_waste': total_waste,
+                'average_efficiency': avg_efficiency
+            }
         
-        total_cuts = sum(len(bar.cuts) for bar in bars)
-        total_length = sum(bar.total_used for bar in bars)
-        total_waste = sum(bar.waste for bar in bars)
-        avg_efficiency = sum(bar.efficiency for bar in bars) / len(bars)
-        
-        return {
-            'total_bars': len(bars),
-            'total_cuts': total_cuts,
-            'total_length_used': total_length,
-            'total_waste': total_waste,
-            'average_efficiency': avg_efficiency
-        }
+        if lower_bound is not None:
+            stats.update(gap_statistics(len(bars), lower_bound))
+        
+        return stats
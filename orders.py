@@ -0,0 +1,151 @@
+"""
+Multi-order batching: pieces of many orders are packed jointly per material
+and the result is split back into one work plan per order.
+
+Pieces of equal length and material are interchangeable, so the solvers
+work on plain lengths as usual. Afterwards every piece of the joint plan is
+assigned to an order: the bars are walked in saw order and each piece takes
+an order already on the bar if that order needs its length, else the next
+open order of its length, so the pieces of one order end up on few,
+neighbouring bars. Both steps are O(pieces).
+
+The material of a bar shared by several orders is charged in proportion to
+the length of their pieces, so the material and cost of all orders add up
+to the joint plan.
+"""
+from collections import deque
+from dataclasses import replace
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class OrderQueue:
+    """Open pieces of one length: count per order, orders in order of first appearance."""
+
+    def __init__(self):
+        self.counts: Dict[Optional[str], int] = {}
+        self.queue: Deque[Optional[str]] = deque()
+
+    def add(self, order_id: Optional[str], count: int):
+        """Add open pieces of an order."""
+        if order_id not in self.counts:
+            self.queue.append(order_id)
+            self.counts[order_id] = 0
+        self.counts[order_id] += count
+
+    def take(self, preferred: List[Optional[str]]) -> Optional[str]:
+        """Take one piece, of a preferred order if it has one open, else of the first open order."""
+        for order_id in preferred:
+            if self.counts.get(order_id):
+                break
+        else:
+            # Finished orders stay in the queue until they reach the front
+            while not self.counts[self.queue[0]]:
+                self.queue.popleft()
+            order_id = self.queue[0]
+        self.counts[order_id] -= 1
+        return order_id
+
+
+def order_queues(pieces: List[Tuple[float, Optional[str], int]]) -> Dict[float, OrderQueue]:
+    """
+    Open pieces per length of one material.
+
+    Args:
+        pieces: (length, order_id, count) entries of one material
+    """
+    queues: Dict[float, OrderQueue] = {}
+    for length, order_id, count in pieces:
+        queues.setdefault(length, OrderQueue()).add(order_id, count)
+    return queues
+
+
+def assign_orders(bars: List, queues: Dict[float, OrderQueue]):
+    """
+    Tag every piece of the bars (in saw order) with its order ID (sets bar.orders).
+
+    A piece goes to an order that is already on the bar if that order still
+    needs this length, so few bars are shared between orders.
+    """
+    for bar in bars:
+        orders: List[Optional[str]] = []
+        for length in bar.cuts:
+            orders.append(queues[length].take(orders))
+        bar.orders = orders
+
+
+def bar_cost(bar, catalog=None) -> float:
+    """
+    Material cost of one bar: price of its stock length if the catalog has
+    one, otherwise the length in m. Remnants are already paid for.
+    """
+    if bar.remnant_id is not None:
+        return 0.0
+    for stock in (catalog.lengths if catalog else []):
+        if stock.length == bar.bar_length:
+            return stock.unit_cost
+    return bar.bar_length / 1000
+
+
+def split_by_order(results: Dict[str, Dict], kerf: float = 0.0,
+                   stock_catalogs: Optional[Dict] = None) -> Dict[Optional[str], Dict[str, Dict]]:
+    """
+    Split a joint plan into work plans per order.
+
+    Args:
+        results: Results of optimize_by_material/optimize_demand with order-tagged cuts
+        kerf: Saw blade kerf in mm
+        stock_catalogs: StockCatalog per material code ('default' for all others)
+
+    Returns:
+        Dictionary order_id -> results in the usual form (material code ->
+        'name', 'bars'), plus per material 'material_length' (mm of bar
+        charged to the order), 'cost' and 'shared_bars'. The bars hold only
+        the pieces of the order and keep their number in the joint saw plan.
+    """
+    catalogs = stock_catalogs or {}
+    plans: Dict[Optional[str], Dict[str, Dict]] = {}
+    for material_code, data in results.items():
+        catalog = catalogs.get(material_code, catalogs.get('default'))
+        for bar in data['bars']:
+            if not bar.cuts:
+                continue
+            # Pieces per order in saw order
+            pieces: Dict[Optional[str], List[float]] = {}
+            for length, order_id in zip(bar.cuts, bar.orders or [None] * len(bar.cuts)):
+                pieces.setdefault(order_id, []).append(length)
+            used = sum(bar.cuts)
+            cost = bar_cost(bar, catalog)
+            for order_id, cuts in pieces.items():
+                share = sum(cuts) / used
+                entry = plans.setdefault(order_id, {}).setdefault(material_code, {
+                    'name': data['name'],
+                    'bars': [],
+                    'material_length': 0.0,
+                    'cost': 0.0,
+                    'shared_bars': 0,
+                })
+                entry['bars'].append(replace(
+                    bar,
+                    cuts=list(cuts),
+                    orders=[order_id] * len(cuts),
+                    total_used=sum(cuts) + kerf * (len(cuts) - 1),
+                ))
+                entry['material_length'] += share * bar.bar_length
+                entry['cost'] += share * cost
+                entry['shared_bars'] += len(pieces) > 1
+    return plans
+
+
+def order_summary(plans: Dict[Optional[str], Dict[str, Dict]]) -> List[Dict]:
+    """One row per order: pieces, bars touched, shared bars, material in m and cost."""
+    rows = []
+    for order_id, materials in plans.items():
+        rows.append({
+            'order_id': order_id,
+            'pieces': sum(len(bar.cuts) for data in materials.values() for bar in data['bars']),
+            'bars': sum(len(data['bars']) for data in materials.values()),
+            'shared_bars': sum(data['shared_bars'] for data in materials.values()),
+            'material_m': sum(data['material_length'] for data in materials.values()) / 1000,
+            'cost': sum(data['cost'] for data in materials.values()),
+        })
+    return rows
@@ -0,0 +1,166 @@
+"""
+Cutting pattern table for one material.
+
+A pattern says how many pieces of each distinct length are cut from one bar.
+For k distinct lengths the set of feasible patterns is finite, so it is
+enumerated once per (lengths, bar length, kerf) and cached. The table does
+not depend on the demand: best_pattern() fits a pattern to the open demand
+when it is chosen, so one table serves every pass, stock bar and job with
+the same lengths.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import PATTERN_MAX_COUNT, PATTERN_CACHE_SIZE
+
+
+EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Pattern:
+    """Represents one way to cut a bar: piece counts per distinct length."""
+    counts: Tuple[int, ...]
+    used_length: float  # Cut lengths plus kerf between the pieces
+    pieces: int
+
+    def waste(self, bar_length: float) -> float:
+        """Remaining length of a bar cut with this pattern."""
+        return bar_length - self.used_length
+
+
+def used_length(counts: Sequence[int], lengths: Sequence[float], kerf: float) -> float:
+    """Length consumed by a pattern, with one kerf between neighbouring pieces."""
+    pieces = sum(counts)
+    if pieces == 0:
+        return 0.0
+    return sum(n * length for n, length in zip(counts, lengths)) + (pieces - 1) * kerf
+
+
+def enumerate_patterns(lengths: Sequence[float], bar_length: float, kerf: float = 0.0) -> Tuple[Pattern, ...]:
+    """
+    Enumerate all non-dominated cutting patterns.
+
+    A pattern is dominated if another feasible pattern contains at least as
+    many pieces of every length. This is exactly the case when one more
+    piece still fits, so only maximal patterns are kept.
+
+    Args:
+        lengths: Distinct cut lengths, sorted in descending order
+        bar_length: Length of the bar in mm
+        kerf: Saw blade kerf in mm
+
+    Returns:
+        Tuple of patterns, counts aligned with `lengths`. The result is cached.
+    """
+    return _enumerate_cached(tuple(float(length) for length in lengths), float(bar_length), float(kerf))
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _enumerate_cached(lengths: Tuple[float, ...], bar_length: float, kerf: float) -> Tuple[Pattern, ...]:
+    # With n pieces there are n-1 kerfs: sum(n_i * (l_i + kerf)) <= bar_length + kerf
+    sizes = [length + kerf for length in lengths]
+    capacity = bar_length + kerf
+    max_counts = [int((capacity + EPSILON) // size) for size in sizes]
+    k = len(lengths)
+    patterns: List[Pattern] = []
+    counts = [0] * k
+
+    def is_maximal(remaining: float) -> bool:
+        for j in range(k):
+            if counts[j] < max_counts[j] and sizes[j] <= remaining + EPSILON:
+                return False
+        return True
+
+    def search(i: int, remaining: float):
+        if len(patterns) >= PATTERN_MAX_COUNT:
+            return
+        if i == k:
+            pieces = sum(counts)
+            if pieces > 0 and is_maximal(remaining):
+                patterns.append(Pattern(tuple(counts), used_length(counts, lengths, kerf), pieces))
+            return
+
+        most = min(max_counts[i], int((remaining + EPSILON) // sizes[i]))
+        for n in range(most, -1, -1):
+            counts[i] = n
+            search(i + 1, remaining - n * sizes[i])
+        counts[i] = 0
+
+    search(0, capacity)
+    return tuple(patterns)
+
+
+def fit_to_demand(pattern: Pattern, remaining: Sequence[int], lengths: Sequence[float], kerf: float,
+                  bar_length: float) -> Optional[Pattern]:
+    """
+    Apply the open demand to a pattern of the table.
+
+    Counts above the open demand are clamped; the length freed that way is
+    filled again with open pieces, longest first, so the result is maximal
+    for the open demand.
+
+    Returns:
+        The pattern itself if it fits the demand, the fitted pattern, or None
+        if it contains no open piece
+    """
+    counts = [min(n, open_n) for n, open_n in zip(pattern.counts, remaining)]
+    if counts == list(pattern.counts):
+        return pattern
+    if not any(counts):
+        return None
+    free = bar_length + kerf - sum(n * (length + kerf) for n, length in zip(counts, lengths))
+    for i, length in enumerate(lengths):
+        extra = min(remaining[i] - counts[i], int((free + EPSILON) // (length + kerf)))
+        if extra > 0:
+            counts[i] += extra
+            free -= extra * (length + kerf)
+    return Pattern(tuple(counts), used_length(counts, lengths, kerf), sum(counts))
+
+
+def best_pattern(patterns: Sequence[Pattern], remaining: Sequence[int], lengths: Sequence[float],
+                 kerf: float, bar_length: float, required: Optional[int] = None) -> Optional[Pattern]:
+    """
+    Pick the pattern with the least waste that can be cut from the open demand.
+
+    Every pattern of the (demand-free) table is fitted to the open demand
+    first (see fit_to_demand); patterns without an open piece are skipped.
+
+    Args:
+        patterns: Pattern table of enumerate_patterns
+        remaining: Open demand per length
+        lengths: Distinct cut lengths aligned with the pattern counts
+        kerf: Saw blade kerf in mm
+        bar_length: Bar length of the table
+        required: Optional index of a length the pattern must contain
+
+    Returns:
+        Best (possibly fitted) pattern or None if no piece can be placed
+    """
+    best, best_key = None, None
+    for pattern in patterns:
+        if required is not None and not (pattern.counts[required] and remaining[required]):
+            continue
+        candidate = fit_to_demand(pattern, remaining, lengths, kerf, bar_length)
+        if candidate is None:
+            continue
+        # Least waste first, then more long pieces
+        key = (candidate.used_length, candidate.counts)
+        if best_key is None or key > best_key:
+            best, best_key = candidate, key
+    return best
+
+
+def group_bars_by_pattern(bars: List) -> List[Tuple[Tuple[float, ...], List]]:
+    """
+    Group bars with identical cuts and bar length.
+
+    Returns:
+        List of (sorted cut lengths, bars) in order of first appearance
+    """
+    groups: Dict[Tuple, List] = {}
+    for bar in bars:
+        key = (bar.bar_length, tuple(sorted(bar.cuts, reverse=True)))
+        groups.setdefault(key, []).append(bar)
+    return [(key[1], group) for key, group in groups.items()]
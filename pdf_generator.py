@@ -13,12 +13,39 @@ from typing import List, Dict
 import io
 
 from optimizer import Bar
+from bounds import gap_statistics
+from saw_schedule import saw_statistics, format_duration
+import profiling
+from config import REMNANT_MIN_LENGTH
+
+
+def build_styles():
+    """
+    Paragraph styles of both work plans (ReportLab sample sheet plus own styles).
+    
+    Building the sheet is the same for every plan, so callers rendering many
+    plans (the web app) create it once and pass it to the generator.
+    """
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#1f4788'),
+        spaceAfter=3*mm
+    ))
+    styles.add(ParagraphStyle('Notes', parent=styles['Normal'], fontSize=8))
+    styles.add(ParagraphStyle('BarText', parent=styles['Normal'], fontSize=8, fontName='Courier'))
+    styles.add(ParagraphStyle('Check', parent=styles['Normal'], fontSize=10))
+    styles.add(ParagraphStyle('Legend', parent=styles['Normal'], fontSize=8))
+    return styles
 
 
 class WorkPlanPDFGenerator:
     """Generates work plan PDFs for cutting optimization results."""
     
-    def __init__(self, results: Dict[str, Dict], bar_length: float, kerf: float, algorithm: str):
+    def __init__(self, results: Dict[str, Dict], bar_length: float, kerf: float, algorithm: str,
+                 styles=None):
         """
         Initialize PDF generator.
         
@@ -27,12 +54,34 @@ class WorkPlanPDFGenerator:
             bar_length: Standard bar length
             kerf: Saw blade thickness
             algorithm: Algorithm used (FFD, BFD, Heuristic)
+            styles: Shared style sheet from build_styles() (built here if None)
         """
         self.results = results
         self.bar_length = bar_length
         self.kerf = kerf
         self.algorithm = algorithm
+        self.styles = styles if styles is not None else build_styles()
         
+    def _stock_summary(self, bars: List[Bar]) -> str:
+        """Stock length text for the header, e.g. '3x 6000, 1x 12000 mm' in multi-length mode."""
+        stock_counts: Dict[float, int] = {}
+        for bar in bars:
+            if bar.remnant_id is None:
+                stock_counts[bar.bar_length] = stock_counts.get(bar.bar_length, 0) + 1
+        
+        if not stock_counts or list(stock_counts) == [self.bar_length]:
+            return f"{self.bar_length:.0f} mm"
+        return ", ".join(f"{count}x {length:.0f}" for length, count in sorted(stock_counts.items())) + " mm"
+    
+    @staticmethod
+    def _gap_text(bar_count: int, bound: int) -> str:
+        """Gap to the lower bound, e.g. 'optimal' or '2 Stangen (5.7%)'."""
+        gap = gap_statistics(bar_count, bound)
+        if gap['proven_optimal']:
+            return "optimal"
+        return f"{gap['gap_bars']} Stangen ({gap['gap_percent']:.1f}%)"
+    
+    @profiling.timed('pdf.compact')
     def generate_compact_plan(self, output_path: str = None) -> bytes:
         """
         Generate compact work plan (1 page per material).
@@ -53,7 +102,7 @@ class WorkPlanPDFGenerator:
                                    rightMargin=15*mm, leftMargin=15*mm,
                                    topMargin=15*mm, bottomMargin=15*mm)
         
-        styles = getSampleStyleSheet()
+        styles = self.styles
         story = []
         
         for material_code, data in self.results.items():
@@ -64,13 +113,7 @@ class WorkPlanPDFGenerator:
                 continue
             
             # Header
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                textColor=colors.HexColor('#1f4788'),
-                spaceAfter=3*mm
-            )
+            title_style = styles['CustomTitle']
             
             story.append(Paragraph("ARBEITSPLAN ZUSCHNITT", title_style))
             story.append(Spacer(1, 3*mm))
@@ -78,9 +121,15 @@ class WorkPlanPDFGenerator:
             # Info box
             info_data = [
                 ['Material:', f"{material_code} - {material_name}", 'Datum:', datetime.now().strftime('%d.%m.%Y')],
-                ['Stangenlänge:', f"{self.bar_length:.0f} mm", 'Sägeblattstärke:', f"{self.kerf:.1f} mm"],
+                ['Stangenlänge:', self._stock_summary(bars), 'Sägeblattstärke:', f"{self.kerf:.1f} mm"],
                 ['Anzahl Stangen:', str(len(bars)), 'Algorithmus:', self.algorithm],
             ]
+            if data.get('lower_bound') is not None:
+                info_data.append(['Untere Schranke:', str(data['lower_bound']),
+                                  'Abstand:', self._gap_text(len(bars), data['lower_bound'])])
+            saw = saw_statistics(bars)
+            info_data.append(['Anschlagwechsel:', str(saw['stop_changes']),
+                              'Sägezeit (ca.):', format_duration(saw['seconds'])])
             
             info_table = Table(info_data, colWidths=[35*mm, 55*mm, 35*mm, 45*mm])
             info_table.setStyle(TableStyle([
@@ -105,8 +154,12 @@ class WorkPlanPDFGenerator:
             
             for bar in bars:
                 cuts_str = ' / '.join(f"{c:.0f}" for c in bar.cuts)
+                if bar.remnant_id is not None:
+                    cuts_str += f"  (Rest #{bar.remnant_id}, {bar.bar_length:.0f} mm)"
+                elif bar.bar_length != self.bar_length:
+                    cuts_str += f"  ({bar.bar_length:.0f} mm)"
                 table_data.append([
-                    str(bar.bar_number),
+                    f"{bar.bar_number} R" if bar.remnant_id is not None else str(bar.bar_number),
                     cuts_str,
                     f"{bar.total_used:.0f} mm",
                     f"{bar.waste:.0f} mm",
@@ -159,12 +212,13 @@ class WorkPlanPDFGenerator:
             story.append(Spacer(1, 5*mm))
             
             # Notes section
-            notes_style = ParagraphStyle('Notes', parent=styles['Normal'], fontSize=8)
+            notes_style = styles['Notes']
             notes = [
                 "ANMERKUNGEN:",
                 "• Schnitte von links nach rechts ausführen",
                 f"• Sägeblattstärke von {self.kerf:.1f} mm ist bereits berücksichtigt",
-                "• Reststücke > 500 mm markieren und lagern",
+                f"• Reststücke > {REMNANT_MIN_LENGTH:.0f} mm markieren und lagern",
+                "• R = Reststück aus dem Lager verwenden",
                 "• Qualitätskontrolle: Länge ±1 mm"
             ]
             
@@ -186,7 +240,8 @@ class WorkPlanPDFGenerator:
             story.append(PageBreak())
         
         # Build PDF
-        pdf.build(story)
+        with profiling.stage('pdf.render'):
+            pdf.build(story)
         
         if output_path:
             return None
@@ -194,6 +249,7 @@ class WorkPlanPDFGenerator:
             buffer.seek(0)
             return buffer.getvalue()
     
+    @profiling.timed('pdf.visual')
     def generate_visual_plan(self, output_path: str = None) -> bytes:
         """
         Generate visual work plan with bar charts.
@@ -214,7 +270,7 @@ class WorkPlanPDFGenerator:
                                    rightMargin=15*mm, leftMargin=15*mm,
                                    topMargin=15*mm, bottomMargin=15*mm)
         
-        styles = getSampleStyleSheet()
+        styles = self.styles
         story = []
         
         for material_code, data in self.results.items():
@@ -225,13 +281,7 @@ class WorkPlanPDFGenerator:
                 continue
             
             # Header
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                textColor=colors.HexColor('#1f4788'),
-                spaceAfter=3*mm
-            )
+            title_style = styles['CustomTitle']
             
             story.append(Paragraph(f"🔨 ZUSCHNITTPLAN VISUELL", title_style))
             story.append(Paragraph(f"Material: {material_code} - {material_name}", styles['Heading2']))
@@ -244,20 +294,20 @@ class WorkPlanPDFGenerator:
                 total_width = 150  # mm for visualization
                 
                 for cut in bar.cuts:
-                    cut_width = (cut / self.bar_length) * total_width
+                    cut_width = (cut / bar.bar_length) * total_width
                     cuts_visual.append(f"[{cut:.0f}]")
                 
-                waste_width = (bar.waste / self.bar_length) * total_width
+                waste_width = (bar.waste / bar.bar_length) * total_width
                 
-                bar_text = f"Stab {bar.bar_number}:  {' | '.join(cuts_visual)} ▓▓▓ Rest: {bar.waste:.0f}mm"
+                bar_label = f"Stab {bar.bar_number}"
+                if bar.remnant_id is not None:
+                    bar_label += f" (Reststück #{bar.remnant_id}, {bar.bar_length:.0f}mm)"
+                bar_text = f"{bar_label}:  {' | '.join(cuts_visual)} ▓▓▓ Rest: {bar.waste:.0f}mm"
                 
-                bar_style = ParagraphStyle('BarText', parent=styles['Normal'], 
-                                          fontSize=8, fontName='Courier')
-                story.append(Paragraph(bar_text, bar_style))
+                story.append(Paragraph(bar_text, styles['BarText']))
                 
                 # Checkbox
-                check_style = ParagraphStyle('Check', parent=styles['Normal'], fontSize=10)
-                story.append(Paragraph("☐ Fertig", check_style))
+                story.append(Paragraph("☐ Fertig", styles['Check']))
                 story.append(Spacer(1, 2*mm))
             
             if len(bars) > 10:
@@ -267,7 +317,7 @@ class WorkPlanPDFGenerator:
             story.append(Spacer(1, 5*mm))
             
             # Legend
-            legend_style = ParagraphStyle('Legend', parent=styles['Normal'], fontSize=8)
+            legend_style = styles['Legend']
             story.append(Paragraph("Legende:  [####] = Schnitt  | = Sägeschnitt  ▓▓▓ = Verschnitt", legend_style))
             story.append(Spacer(1, 5*mm))
             
@@ -327,6 +377,9 @@ class WorkPlanPDFGenerator:
                 ['Verschnitt gesamt:', f"{total_waste:.0f} mm"],
                 ['Ø Effizienz:', f"{avg_efficiency:.1f}%"]
             ]
+            if data.get('lower_bound') is not None:
+                stats_data.append(['Untere Schranke:', str(data['lower_bound'])])
+                stats_data.append(['Abstand:', self._gap_text(len(bars), data['lower_bound'])])
             
             stats_table = Table(stats_data, colWidths=[40*mm, 30*mm])
             stats_table.setStyle(TableStyle([
@@ -346,7 +399,8 @@ class WorkPlanPDFGenerator:
             story.append(PageBreak())
         
         # Build PDF
-        pdf.build(story)
+        with profiling.stage('pdf.render'):
+            pdf.build(story)
         
         if output_path:
             return None
@@ -0,0 +1,129 @@
+"""
+Instrumentation: stage timers and counters for one job.
+
+Code marks pipeline stages with `with stage('excel.read'):` and reports
+counters with `count('fit_checks', n)`. Both do nothing unless a profiler is
+active in the current context, so the hooks can stay in hot code:
+
+    with profile() as profiler:
+        cuts = ExcelHandler.read_cuts_from_excel(path)
+        results = optimizer.optimize_by_material(cuts)
+    print(profiler.report())
+
+The active profiler is held in a ContextVar, so concurrent jobs in other
+threads (Streamlit sessions, the service) do not mix their numbers.
+"""
+import functools
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+
+class Profiler:
+    """Collects wall time per stage and event counters."""
+
+    def __init__(self):
+        self.stages: Dict[str, list] = {}  # name -> [calls, seconds], in order of first use
+        self.counters: Dict[str, int] = {}
+        self.total = 0.0  # Time of the outermost stages (nested stages are not added twice)
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block; repeated stages with the same name are summed."""
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            elapsed = time.perf_counter() - start
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            if self._depth == 0:
+                self.total += elapsed
+
+    def count(self, name: str, n: int = 1):
+        """Add `n` to a counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, report: Dict):
+        """Add the numbers of a report (e.g. from a worker process) to this profiler."""
+        for entry in report['stages']:
+            stage = self.stages.setdefault(entry['name'], [0, 0.0])
+            stage[0] += entry['calls']
+            stage[1] += entry['seconds']
+        for name, value in report['counters'].items():
+            self.count(name, value)
+        if self._depth == 0:
+            self.total += report['total_seconds']
+
+    def report(self) -> Dict:
+        """
+        Collected numbers as a JSON-serializable dictionary.
+
+        Returns:
+            {'total_seconds', 'stages': [{'name', 'calls', 'seconds'}, ...], 'counters': {name: value}}
+        """
+        return {
+            'total_seconds': round(self.total, 6),
+            'stages': [{'name': name, 'calls': calls, 'seconds': round(seconds, 6)}
+                       for name, (calls, seconds) in self.stages.items()],
+            'counters': dict(self.counters),
+        }
+
+    def to_json(self, path: str):
+        """Write the report to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.report(), handle, indent=2)
+
+
+_active: ContextVar[Optional[Profiler]] = ContextVar('profiler', default=None)
+
+
+@contextmanager
+def profile(profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """Activate a profiler for the enclosed block."""
+    profiler = profiler or Profiler()
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block on the active profiler (no-op without one)."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a function as stage `name`."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1):
+    """Add to a counter of the active profiler (no-op without one)."""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def active() -> Optional[Profiler]:
+    """The profiler of the current context, if any."""
+    return _active.get()
@@ -0,0 +1,231 @@
+"""
+Solution-quality regression runner.
+
+Solves the instances of the corpus (corpus/*.json) with every algorithm in
+parallel and reports bar count, gap to the reference (optimal or best-known)
+bar count, waste and runtime. With --check the bar counts are compared to
+corpus/baseline.json and the run fails if any algorithm got worse, so
+performance work never silently trades away material efficiency.
+
+Corpus families:
+    uniform   Falkenauer-style, items uniform in [20, 100], bar 150
+    triplets  Falkenauer-style, three items fill each bar of 1000 exactly,
+              so the optimum is n/3 bars
+    real      anonymized Stücklisten with 6 m bars and 3 mm kerf
+
+Usage:
+    python quality_check.py                   # report
+    python quality_check.py --check           # fail on regressions
+    python quality_check.py --update-baseline # accept the current bar counts
+    python quality_check.py --generate        # rebuild the synthetic corpus files
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from bounds import lower_bound
+from optimizer import CuttingOptimizer
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+BASELINE_PATH = os.path.join(CORPUS_DIR, 'baseline.json')
+ALGORITHMS = ['FFD', 'BFD', 'Heuristic', 'Pattern', 'Multi']
+SEED = 1996  # Falkenauer's paper year, keeps the generated corpus stable
+
+
+def expand(cuts: List[List[float]]) -> List[float]:
+    """[[length, quantity], ...] -> flat list of cut lengths."""
+    return [float(length) for length, quantity in cuts for _ in range(int(quantity))]
+
+
+def compress(lengths: List[float]) -> List[List[float]]:
+    """Flat list of cut lengths -> [[length, quantity], ...], longest first."""
+    counts: Dict[float, int] = {}
+    for length in lengths:
+        counts[length] = counts.get(length, 0) + 1
+    return [[length, counts[length]] for length in sorted(counts, reverse=True)]
+
+
+def load_corpus(directory: str = CORPUS_DIR) -> List[Dict]:
+    """Load all instances from the corpus files (baseline.json excluded)."""
+    instances = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        if os.path.basename(path) == os.path.basename(BASELINE_PATH):
+            continue
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        for instance in data['instances']:
+            instances.append({'family': data['family'], **instance})
+    return instances
+
+
+def solve(task: Tuple[Dict, str]) -> Dict:
+    """Solve one instance with one algorithm (runs in a worker process)."""
+    instance, algorithm = task
+    cuts = expand(instance['cuts'])
+    optimizer = CuttingOptimizer(bar_length=instance['bar_length'], algorithm=algorithm, kerf=instance['kerf'])
+    start = time.perf_counter()
+    bars = optimizer.optimize(cuts)
+    seconds = time.perf_counter() - start
+    return {
+        'instance': instance['name'],
+        'family': instance['family'],
+        'algorithm': algorithm,
+        'bars': len(bars),
+        'reference': instance['reference_bars'],
+        'waste': sum(bar.waste for bar in bars),
+        'material': sum(bar.bar_length for bar in bars),
+        'seconds': seconds,
+    }
+
+
+def run(instances: List[Dict], algorithms: List[str], workers: int = None) -> List[Dict]:
+    """Solve every instance with every algorithm in a process pool."""
+    tasks = [(instance, algorithm) for instance in instances for algorithm in algorithms]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(solve, tasks, chunksize=max(1, len(tasks) // 64)))
+
+
+def report(results: List[Dict], algorithms: List[str]):
+    """Print bars, gap, waste and runtime per family and algorithm."""
+    families = sorted({r['family'] for r in results})
+    print(f"  {'Familie':10s} {'Algorithmus':10s} {'Stangen':>8s} {'Referenz':>8s} {'Abstand':>8s} "
+          f"{'Abst.%':>7s} {'optimal':>8s} {'Verschn.%':>9s} {'Zeit [s]':>9s}")
+    for family in families + ['gesamt']:
+        for algorithm in algorithms:
+            rows = [r for r in results if r['algorithm'] == algorithm and family in ('gesamt', r['family'])]
+            bars = sum(r['bars'] for r in rows)
+            reference = sum(r['reference'] for r in rows)
+            hits = sum(1 for r in rows if r['bars'] <= r['reference'])
+            waste = sum(r['waste'] for r in rows) / sum(r['material'] for r in rows) * 100
+            seconds = sum(r['seconds'] for r in rows)
+            print(f"  {family:10s} {algorithm:10s} {bars:8d} {reference:8d} {bars - reference:8d} "
+                  f"{(bars - reference) / reference * 100:6.2f}% {hits:4d}/{len(rows):<3d} {waste:8.2f}% {seconds:9.3f}")
+
+
+def check(results: List[Dict], baseline: Dict[str, Dict[str, int]]) -> List[str]:
+    """
+    Compare bar counts with the baseline.
+
+    Returns:
+        Messages for every instance and algorithm that needs more bars than before
+    """
+    regressions = []
+    for r in results:
+        expected = baseline.get(r['algorithm'], {}).get(r['instance'])
+        if expected is not None and r['bars'] > expected:
+            regressions.append(f"{r['algorithm']} {r['instance']}: {r['bars']} Stangen statt {expected}")
+    return regressions
+
+
+def generate_uniform(rng: random.Random, name: str, count: int) -> Dict:
+    """Falkenauer-style uniform instance: items in [20, 100], bar 150."""
+    return {'name': name, 'bar_length': 150, 'kerf': 0.0,
+            'cuts': compress([float(rng.randint(20, 100)) for _ in range(count)])}
+
+
+def generate_triplets(rng: random.Random, name: str, count: int) -> Dict:
+    """
+    Falkenauer-style triplet instance: every bar of 1000 is filled exactly by
+    one item from [380, 490] and two items from [250, 500].
+    """
+    lengths = []
+    for _ in range(count // 3):
+        first = rng.randint(380, 490)
+        space = 1000 - first
+        second = rng.randint(250, space // 2)
+        lengths += [float(first), float(second), float(space - second)]
+    instance = {'name': name, 'bar_length': 1000, 'kerf': 0.0, 'cuts': compress(lengths)}
+    instance['reference_bars'] = count // 3
+    instance['optimal'] = True
+    return instance
+
+
+def best_known(instance: Dict) -> Dict:
+    """Set the reference to the best of all algorithms, proven optimal if it meets the lower bound."""
+    cuts = expand(instance['cuts'])
+    bound = lower_bound(cuts, instance['bar_length'], instance['kerf'])
+    instance['lower_bound'] = bound
+    if 'reference_bars' not in instance:
+        best = min(len(CuttingOptimizer(instance['bar_length'], algorithm, instance['kerf']).optimize(cuts))
+                   for algorithm in ALGORITHMS)
+        instance['reference_bars'] = best
+        instance['optimal'] = best == bound
+    return instance
+
+
+def generate(directory: str = CORPUS_DIR):
+    """Rebuild the synthetic corpus files (uniform, triplets) deterministically."""
+    rng = random.Random(SEED)
+    families = {
+        'uniform': [generate_uniform(rng, f"u{count}_{index:02d}", count)
+                    for count in (120, 250, 500, 1000) for index in range(5)],
+        'triplets': [generate_triplets(rng, f"t{count}_{index:02d}", count)
+                     for count in (60, 120, 249, 501) for index in range(5)],
+    }
+    for family, instances in families.items():
+        path = os.path.join(directory, f"{family}.json")
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump({'family': family, 'instances': [best_known(i) for i in instances]}, handle)
+            handle.write('\n')
+        print(f"Geschrieben: {path} ({len(instances)} Instanzen)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qualitäts-Regressionstest auf dem Instanzkorpus")
+    parser.add_argument('--algorithm', action='append', choices=ALGORITHMS, help="Nur diese Algorithmen")
+    parser.add_argument('--family', action='append', help="Nur diese Familien (uniform, triplets, real)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker-Prozesse")
+    parser.add_argument('--check', action='store_true', help="Fehler, wenn ein Algorithmus mehr Stangen braucht als in baseline.json")
+    parser.add_argument('--update-baseline', action='store_true', help="Aktuelle Stangenzahlen als Baseline speichern")
+    parser.add_argument('--generate', action='store_true', help="Synthetische Korpusdateien neu erzeugen")
+    parser.add_argument('--output', help="Einzelergebnisse als JSON speichern")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate()
+        return
+
+    algorithms = args.algorithm or ALGORITHMS
+    instances = [i for i in load_corpus() if not args.family or i['family'] in args.family]
+    print("=" * 100)
+    print(f"QUALITÄTS-REGRESSION: {len(instances)} Instanzen, {', '.join(algorithms)}")
+    print("=" * 100)
+
+    results = run(instances, algorithms, args.workers)
+    report(results, algorithms)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, encoding='utf-8') as handle:
+                baseline = json.load(handle)
+        for r in results:
+            baseline.setdefault(r['algorithm'], {})[r['instance']] = r['bars']
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+        print(f"\nBaseline gespeichert: {BASELINE_PATH}")
+
+    if args.check:
+        with open(BASELINE_PATH, encoding='utf-8') as handle:
+            regressions = check(results, json.load(handle))
+        if regressions:
+            print(f"\n{len(regressions)} Verschlechterung(en):")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print("\nKeine Verschlechterung gegenüber der Baseline ✓")
+
+
+if __name__ == "__main__":
+    main()
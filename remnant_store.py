@@ -0,0 +1,176 @@
+"""
+Remnant inventory (Reststücklager) backed by a local SQLite database.
+
+Usable offcuts from previous runs are stored per material and length so the
+optimizer can fill them before cutting fresh bars.
+"""
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from config import REMNANT_DB_PATH
+
+
+@dataclass
+class Remnant:
+    """Represents a stored remnant piece."""
+    remnant_id: int
+    material_code: str
+    length: float
+    created_at: str
+    source: str = ""
+
+    def __repr__(self):
+        return f"Remnant(#{self.remnant_id}, {self.length}mm, {self.material_code})"
+
+
+class RemnantStore:
+    """
+    SQLite store for remnants.
+
+    Available remnants are indexed by (material_code, length), so looking up
+    the shortest remnant that still fits a cut is a single index seek.
+    """
+
+    def __init__(self, db_path: str = REMNANT_DB_PATH):
+        """
+        Initialize the store and create the schema if needed.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS remnants (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    material_code TEXT NOT NULL,
+                    length REAL NOT NULL,
+                    created_at TEXT NOT NULL,
+                    used_at TEXT,
+                    source TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_remnants_available
+                ON remnants (material_code, length) WHERE used_at IS NULL
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the store usable from several threads
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def add(self, material_code: str, length: float, source: str = "") -> int:
+        """
+        Add a remnant to the inventory.
+
+        Args:
+            material_code: Material code of the remnant
+            length: Usable length in mm
+            source: Optional note where the remnant came from
+
+        Returns:
+            ID of the new remnant
+        """
+        return self.add_many([(material_code, length)], source)[0]
+
+    def add_many(self, remnants: Iterable[tuple], source: str = "") -> List[int]:
+        """
+        Add several (material_code, length) remnants in one transaction.
+
+        Returns:
+            IDs of the new remnants
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        ids = []
+        with closing(self._connect()) as conn, conn:
+            for material_code, length in remnants:
+                cursor = conn.execute(
+                    "INSERT INTO remnants (material_code, length, created_at, source) VALUES (?, ?, ?, ?)",
+                    (material_code, float(length), now, source)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def available(self, material_code: str, min_length: float = 0.0) -> List[Remnant]:
+        """
+        List unused remnants of a material, shortest first.
+
+        Args:
+            material_code: Material code
+            min_length: Only return remnants at least this long
+
+        Returns:
+            List of Remnant objects sorted by length ascending
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, material_code, length, created_at, source FROM remnants "
+                "WHERE material_code = ? AND used_at IS NULL AND length >= ? "
+                "ORDER BY length, id",
+                (material_code, min_length)
+            ).fetchall()
+        return [Remnant(*row) for row in rows]
+
+    def best_fit(self, material_code: str, min_length: float) -> Optional[Remnant]:
+        """
+        Find the shortest unused remnant that is at least `min_length` long.
+
+        Returns:
+            Remnant or None if no remnant is long enough
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, material_code, length, created_at, source FROM remnants "
+                "WHERE material_code = ? AND used_at IS NULL AND length >= ? "
+                "ORDER BY length, id LIMIT 1",
+                (material_code, min_length)
+            ).fetchone()
+        return Remnant(*row) if row else None
+
+    def mark_used(self, remnant_ids: Iterable[int]):
+        """Mark remnants as consumed so they are no longer offered."""
+        now = datetime.now().isoformat(timespec='seconds')
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE remnants SET used_at = ? WHERE id = ? AND used_at IS NULL",
+                [(now, remnant_id) for remnant_id in remnant_ids]
+            )
+
+    def claim(self, remnant_ids: Iterable[int]) -> bool:
+        """
+        Mark remnants as consumed if all of them are still unused (all or nothing).
+
+        Concurrent sessions may plan with the same remnant; only the first
+        claim succeeds, the others get False and have to plan again.
+
+        Returns:
+            True if all remnants were claimed
+        """
+        remnant_ids = list(remnant_ids)
+        now = datetime.now().isoformat(timespec='seconds')
+        with closing(self._connect()) as conn, conn:
+            claimed = conn.executemany(
+                "UPDATE remnants SET used_at = ? WHERE id = ? AND used_at IS NULL",
+                [(now, remnant_id) for remnant_id in remnant_ids]
+            ).rowcount
+            if claimed != len(remnant_ids):
+                conn.rollback()
+                return False
+        return True
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Count and total length of unused remnants per material.
+
+        Returns:
+            Dictionary mapping material codes to {'count', 'total_length'}
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT material_code, COUNT(*), SUM(length) FROM remnants "
+                "WHERE used_at IS NULL GROUP BY material_code ORDER BY material_code"
+            ).fetchall()
+        return {code: {'count': count, 'total_length': total} for code, count, total in rows}
@@ -0,0 +1,131 @@
+"""
+Saw schedule: order of the bars and of the cuts within each bar at the saw.
+
+The operator sets the length stop for every new cut length, and these
+setups dominate the saw time. After packing, the bars of a material are
+re-sequenced so that the stop is changed as rarely as possible; the packing
+itself (which cuts share a bar, bar count, waste) is not changed.
+
+Heuristic:
+    - equal lengths in a bar are cut one after another
+    - identical bars (same pattern) are cut in a row, alternating direction,
+      so each bar starts with the length the previous one ended with
+    - patterns are chained nearest-neighbour: the next pattern is one that
+      contains the current stop length; among those, the one whose exit
+      length appears in most of the remaining patterns wins
+"""
+from typing import Dict, List, Set
+
+from config import SAW_TIME_PER_BAR, SAW_TIME_PER_CUT, SAW_TIME_PER_STOP
+from patterns import group_bars_by_pattern
+
+
+def stop_changes(bars: List) -> int:
+    """Number of length stop settings when the bars are cut in order (the first setting counts)."""
+    changes = 0
+    stop = None
+    for bar in bars:
+        for cut in bar.cuts:
+            if cut != stop:
+                changes += 1
+                stop = cut
+    return changes
+
+
+def saw_statistics(bars: List) -> Dict[str, float]:
+    """
+    Estimated saw time of the bars in their current order.
+
+    Returns:
+        Dictionary with 'bars', 'cuts', 'stop_changes' and 'seconds'
+    """
+    cuts = sum(len(bar.cuts) for bar in bars)
+    changes = stop_changes(bars)
+    return {
+        'bars': len(bars),
+        'cuts': cuts,
+        'stop_changes': changes,
+        'seconds': len(bars) * SAW_TIME_PER_BAR + cuts * SAW_TIME_PER_CUT + changes * SAW_TIME_PER_STOP,
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """Saw time for the work plans, e.g. '1 h 05 min' or '12 min'."""
+    minutes = int(round(seconds / 60))
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60:02d} min"
+
+
+def _cut_order(lengths: List[float], start: float, end: float) -> List[float]:
+    """Distinct lengths of a pattern from `start` to `end`, the others longest first in between."""
+    middle = [length for length in lengths if length != start and length != end]
+    order = [start] + middle
+    if end != start:
+        order.append(end)
+    return order
+
+
+def schedule_bars(bars: List) -> List:
+    """
+    Re-sequence the bars of one material for few stop changes.
+
+    The cuts of every bar are reordered in place and the bars are renumbered
+    in saw order.
+
+    Args:
+        bars: Packed bars of one material
+
+    Returns:
+        The same bars in saw order
+    """
+    groups = group_bars_by_pattern([bar for bar in bars if bar.cuts])
+    lengths = [sorted(set(cuts), reverse=True) for cuts, _ in groups]
+    counts = [{length: cuts.count(length) for length in distinct} for (cuts, _), distinct in zip(groups, lengths)]
+
+    # Remaining patterns per cut length
+    index: Dict[float, Set[int]] = {}
+    for block, distinct in enumerate(lengths):
+        for length in distinct:
+            index.setdefault(length, set()).add(block)
+
+    def exit_lengths(block: int, start: float) -> List[float]:
+        # Alternating identical bars end where they started after an even number of bars
+        if len(lengths[block]) == 1 or len(groups[block][1]) % 2 == 0:
+            return [start]
+        return [length for length in lengths[block] if length != start]
+
+    def continuation(block: int, length: float) -> int:
+        # Other remaining patterns that could start with this length
+        return len(index.get(length, ())) - (1 if block in index.get(length, ()) else 0)
+
+    remaining = list(range(len(groups)))
+    scheduled = []
+    stop = None
+    while remaining:
+        candidates = sorted(index.get(stop, ()))
+        if candidates:
+            block = max(candidates, key=lambda b: (max(continuation(b, e) for e in exit_lengths(b, stop)), -b))
+            start = stop
+        else:
+            # The stop has to be set anyway: start with the length least needed elsewhere
+            block = remaining[0]
+            start = min(lengths[block], key=lambda length: (continuation(block, length), -length))
+        end = max(exit_lengths(block, start), key=lambda length: (continuation(block, length), length))
+
+        remaining.remove(block)
+        for length in lengths[block]:
+            index[length].discard(block)
+
+        forward = [length for length in _cut_order(lengths[block], start, end)
+                   for _ in range(counts[block][length])]
+        backward = forward[::-1]
+        for number, bar in enumerate(groups[block][1]):
+            bar.cuts = list(forward if number % 2 == 0 else backward)
+            scheduled.append(bar)
+        stop = scheduled[-1].cuts[-1]
+
+    scheduled += [bar for bar in bars if not bar.cuts]
+    for number, bar in enumerate(scheduled, start=1):
+        bar.bar_number = number
+    return scheduled
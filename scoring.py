@@ -0,0 +1,119 @@
+"""
+Scoring rules for the Heuristic algorithm.
+
+A scorer rates placing a cut in a bar from the remaining length after the
+cut and the bar length; the bar with the highest score gets the cut.
+Scorers are plugins: a factory registered under a name turns a parameter
+set into a Scorer whose functions have the parameters bound, so nothing is
+looked up per bar.
+"""
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Union
+
+from config import HEURISTIC_SCORING
+
+
+@dataclass(frozen=True)
+class ScoreParams:
+    """Parameter set of a scorer."""
+    useful_remnant: float = 100.0       # Remaining length in mm that still counts as useful
+    useful_bonus: float = 50.0          # Bonus if the remaining length is useful
+    nearly_full_ratio: float = 0.05     # Share of the bar length below which a bar is nearly full
+    nearly_full_penalty: float = 100.0  # Penalty for leaving a nearly full bar
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'ScoreParams':
+        """Build a parameter set from a dictionary, ignoring unknown keys."""
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: float(value) for key, value in values.items() if key in names})
+
+
+@dataclass(frozen=True)
+class Scorer:
+    """A scorer with its parameters resolved."""
+    name: str
+    params: ScoreParams
+    score: Callable[[float, float], float]  # (remaining_after, bar_length) -> score
+    scores: Callable                        # Same for NumPy arrays (vectorized fit scan)
+
+
+# Registered scorer factories: name -> factory(params) -> Scorer
+SCORERS: Dict[str, Callable[[ScoreParams], Scorer]] = {}
+
+
+def register_scorer(name: str):
+    """Decorator registering a scorer factory under a name."""
+    def decorator(factory: Callable[[ScoreParams], Scorer]):
+        SCORERS[name] = factory
+        return factory
+    return decorator
+
+
+@register_scorer('standard')
+def standard_scorer(params: ScoreParams) -> Scorer:
+    """
+    Prefer less waste (like BFD), reward a useful remaining length and
+    penalize nearly full bars to leave room for later cuts.
+    """
+    useful = params.useful_remnant
+    bonus = params.useful_bonus
+    ratio = params.nearly_full_ratio
+    penalty = params.nearly_full_penalty
+
+    if bonus == 0 and penalty == 0:
+        return best_fit_scorer(params)
+
+    def score(remaining_after: float, bar_length: float) -> float:
+        waste_score = -remaining_after  # Prefer smaller waste
+        if remaining_after > useful:
+            waste_score += bonus
+        if remaining_after < bar_length * ratio:
+            waste_score -= penalty
+        return waste_score
+
+    def scores(remaining_after, bar_length):
+        return -remaining_after + bonus * (remaining_after > useful) - penalty * (remaining_after < bar_length * ratio)
+
+    return Scorer('standard', params, score, scores)
+
+
+@register_scorer('best_fit')
+def best_fit_scorer(params: ScoreParams) -> Scorer:
+    """Plain best fit: the least remaining length wins."""
+    def score(remaining_after: float, bar_length: float) -> float:
+        return -remaining_after
+
+    def scores(remaining_after, bar_length):
+        return -remaining_after
+
+    return Scorer('best_fit', params, score, scores)
+
+
+def resolve_scorer(spec: Union[None, str, Dict[str, Any], ScoreParams, Scorer] = None) -> Scorer:
+    """
+    Turn a scorer specification into a Scorer.
+
+    Args:
+        spec: Scorer, ScoreParams (standard scorer), scorer name, or a dictionary
+            with an optional 'scorer' name plus ScoreParams fields. None means
+            the 'default' entry of HEURISTIC_SCORING.
+
+    Returns:
+        Resolved Scorer
+
+    Raises:
+        ValueError: If the scorer name is not registered
+    """
+    if isinstance(spec, Scorer):
+        return spec
+    if spec is None:
+        spec = HEURISTIC_SCORING.get('default', {})
+    if isinstance(spec, ScoreParams):
+        return SCORERS['standard'](spec)
+    if isinstance(spec, str):
+        spec = {'scorer': spec}
+
+    name = spec.get('scorer', 'standard')
+    if name not in SCORERS:
+        raise ValueError(f"Unknown scorer: {name} (available: {', '.join(sorted(SCORERS))})")
+    return SCORERS[name](ScoreParams.from_dict(spec))
@@ -0,0 +1,213 @@
+"""
+Compact, versioned serialization of optimization results.
+
+Results (material code -> {'name', 'bars', 'lower_bound'}) are stored
+column by column. Bars with the same length and cut sequence share one
+pattern, so a series of identical bars costs one pattern ID per bar instead
+of a list of cuts. Two forms with the same columns:
+
+- columnar JSON (to_columnar/from_columnar), readable and diffable
+- binary (to_binary/from_binary): a small JSON header followed by
+  8-byte aligned little-endian arrays; binary_columns() maps them as
+  memoryviews without copying
+
+Columns per material:
+    pattern_offsets  int32    start of every pattern in pattern_cuts (+ end)
+    pattern_cuts     float64  cut lengths of all patterns, in saw order
+    pattern_length   float64  bar length per pattern
+    pattern_used     float64  used length per pattern (kerf included)
+    bar_pattern      int32    pattern ID per bar
+    bar_number       int32    number per bar (saw order)
+    remnant_id       int32    remnant ID per bar, -1 for fresh bars
+    cut_order        int32    index into 'orders' per cut, -1 without order
+                              (only if any cut has an order)
+"""
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from optimizer import Bar
+
+FORMAT_VERSION = 1
+MAGIC = b'ZSOB'
+HEADER = struct.Struct('<4sHI')  # magic, format version, length of the JSON header
+
+# Column name -> array type code ('i' int32, 'd' float64)
+COLUMNS = {
+    'pattern_offsets': 'i',
+    'pattern_cuts': 'd',
+    'pattern_length': 'd',
+    'pattern_used': 'd',
+    'bar_pattern': 'i',
+    'bar_number': 'i',
+    'remnant_id': 'i',
+    'cut_order': 'i',
+}
+
+
+def _padding(size: int) -> int:
+    # Every array starts 8-byte aligned
+    return -size % 8
+
+
+def _material_columns(bars: List[Bar], orders: Dict[Optional[str], int]) -> Dict[str, list]:
+    """Columns of one material; new order IDs are added to `orders`."""
+    patterns: Dict[tuple, int] = {}
+    columns = {name: [] for name in COLUMNS}
+    columns['pattern_offsets'].append(0)
+    tagged = any(bar.orders for bar in bars)
+    for bar in bars:
+        key = (bar.bar_length, bar.total_used, tuple(bar.cuts))
+        pattern = patterns.get(key)
+        if pattern is None:
+            pattern = patterns[key] = len(patterns)
+            columns['pattern_cuts'].extend(bar.cuts)
+            columns['pattern_offsets'].append(len(columns['pattern_cuts']))
+            columns['pattern_length'].append(float(bar.bar_length))
+            columns['pattern_used'].append(float(bar.total_used))
+        columns['bar_pattern'].append(pattern)
+        columns['bar_number'].append(bar.bar_number)
+        columns['remnant_id'].append(-1 if bar.remnant_id is None else bar.remnant_id)
+        if tagged:
+            for order_id in bar.orders or [None] * len(bar.cuts):
+                if order_id is None:
+                    columns['cut_order'].append(-1)
+                else:
+                    columns['cut_order'].append(orders.setdefault(order_id, len(orders)))
+    if not tagged:
+        del columns['cut_order']
+    return columns
+
+
+def to_columnar(results: Dict[str, Dict]) -> Dict:
+    """
+    Results as columnar, JSON-serializable data.
+
+    Returns:
+        Dictionary with 'version', 'orders' (order IDs referenced by
+        cut_order) and 'materials' (one entry per material with code, name,
+        lower bound and the columns)
+    """
+    orders: Dict[Optional[str], int] = {}
+    materials = []
+    for code, data in results.items():
+        columns = _material_columns(data['bars'], orders)
+        materials.append({'code': code, 'name': data['name'], 'lower_bound': data.get('lower_bound'),
+                          'bars': len(data['bars']), 'columns': columns})
+    return {'version': FORMAT_VERSION, 'orders': list(orders), 'materials': materials}
+
+
+def from_columnar(data: Dict) -> Dict[str, Dict]:
+    """
+    Rebuild results (with Bar objects) from columnar data.
+
+    Raises:
+        ValueError: If the data has an unsupported format version
+    """
+    if data.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported result format version: {data.get('version')}")
+    orders = data['orders']
+    results = {}
+    for material in data['materials']:
+        columns = material['columns']
+        offsets, pattern_cuts = columns['pattern_offsets'], columns['pattern_cuts']
+        patterns = [list(pattern_cuts[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+        cut_order = columns.get('cut_order')
+        bars = []
+        position = 0
+        lengths, used = columns['pattern_length'], columns['pattern_used']
+        for pattern, number, remnant_id in zip(columns['bar_pattern'], columns['bar_number'],
+                                               columns['remnant_id']):
+            cuts = list(patterns[pattern])
+            bar_orders = []
+            if cut_order is not None:
+                bar_orders = [orders[index] if index >= 0 else None
+                              for index in cut_order[position:position + len(cuts)]]
+                position += len(cuts)
+            bars.append(Bar(number, cuts, used[pattern], lengths[pattern],
+                            None if remnant_id < 0 else remnant_id, bar_orders))
+        results[material['code']] = {'name': material['name'], 'bars': bars,
+                                     'lower_bound': material['lower_bound']}
+    return results
+
+
+def to_json(results: Dict[str, Dict]) -> str:
+    """Results as columnar JSON text."""
+    return json.dumps(to_columnar(results), separators=(',', ':'))
+
+
+def from_json(text: str) -> Dict[str, Dict]:
+    """Inverse of to_json."""
+    return from_columnar(json.loads(text))
+
+
+def to_binary(results: Dict[str, Dict]) -> bytes:
+    """
+    Results as a binary buffer: header, JSON metadata, aligned column arrays.
+
+    The metadata holds everything but the columns plus, per material, the
+    length of every column; the arrays follow in material and COLUMNS order.
+    """
+    data = to_columnar(results)
+    chunks = []
+    for material in data['materials']:
+        columns = material.pop('columns')
+        material['lengths'] = {name: len(values) for name, values in columns.items()}
+        for name, values in columns.items():
+            values = array(COLUMNS[name], values)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            chunk = values.tobytes()
+            chunks.append(chunk + b'\0' * _padding(len(chunk)))
+    meta = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    meta += b' ' * _padding(HEADER.size + len(meta))
+    return HEADER.pack(MAGIC, FORMAT_VERSION, len(meta)) + meta + b''.join(chunks)
+
+
+def binary_columns(buffer) -> Dict:
+    """
+    Read the metadata of a binary buffer and map its columns without copying.
+
+    Args:
+        buffer: bytes, bytearray, memoryview or mmap from to_binary
+
+    Returns:
+        Metadata as in to_columnar, every material's 'columns' being
+        memoryviews into the buffer (copies on big-endian machines)
+
+    Raises:
+        ValueError: If the buffer is no result buffer or has an unsupported version
+    """
+    view = memoryview(buffer)
+    if len(view) < HEADER.size:
+        raise ValueError("Not a result buffer")
+    magic, version, meta_length = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not a result buffer")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported result format version: {version}")
+    position = HEADER.size + meta_length
+    data = json.loads(bytes(view[HEADER.size:position]))
+    for material in data['materials']:
+        columns = {}
+        for name, length in material.pop('lengths').items():
+            size = length * array(COLUMNS[name]).itemsize
+            column = view[position:position + size].cast(COLUMNS[name])
+            if sys.byteorder != 'little':
+                swapped = array(COLUMNS[name], column)
+                swapped.byteswap()
+                column = memoryview(swapped)
+            columns[name] = column
+            position += size + _padding(size)
+        material['columns'] = columns
+    return data
+
+
+def from_binary(buffer) -> Dict[str, Dict]:
+    """Rebuild results (with Bar objects) from a binary buffer."""
+    data = binary_columns(buffer)
+    for material in data['materials']:
+        material['columns'] = {name: column.tolist() for name, column in material['columns'].items()}
+    return from_columnar(data)
@@ -0,0 +1,470 @@
+"""
+Local HTTP/JSON service around the cutting optimizer.
+
+Lets other systems (e.g. the ERP) call `CuttingOptimizer.optimize_by_material`
+without going through the Streamlit UI. Requests are solved in a worker
+process pool; identical requests are coalesced and finished results are kept
+in an LRU cache.
+
+Usage:
+    python service.py --host 127.0.0.1 --port 8502 --workers 2
+
+Endpoints:
+    GET  /health    -> {"status": "ok", ...}
+    POST /optimize  -> optimization result as JSON
+
+Request body for /optimize:
+    {
+        "bar_length": 6000,
+        "kerf": 3.0,
+        "algorithm": "BFD",
+        "multiplier": 1,
+        "cuts": [{"length": 2500, "quantity": 3, "material": "ST37", "name": "Stahl S235JR", "order": "A-1001"}],
+        "outputs": ["excel", "excel_structured", "pdf_compact", "pdf_visual"],
+        "result_format": "bars"
+    }
+
+"excel_structured" is the Excel file with numeric tables (materials,
+patterns, cuts) of ExcelHandler.write_structured_results.
+"order" is optional. Cuts of several orders are packed jointly; the response
+then lists the order of every piece and bars, material and cost per order.
+"result_format" is optional: "bars" (default) lists every bar under
+"materials", "columnar" returns the compact columnar form of serialization.py
+under "result" instead (identical bars share one pattern).
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import math
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from optimizer import CuttingOptimizer, DemandLine
+from orders import order_summary
+from config import (
+    DEFAULT_BAR_LENGTH, DEFAULT_KERF,
+    SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_CACHE_SIZE,
+    SERVICE_BATCH_WINDOW, SERVICE_MAX_BATCH, SERVICE_MAX_BODY, SERVICE_MAX_PIECES
+)
+
+
+ALGORITHMS = ('BFD', 'FFD', 'Heuristic', 'Pattern', 'Multi')
+OUTPUT_FORMATS = ('excel', 'excel_structured', 'pdf_compact', 'pdf_visual')
+RESULT_FORMATS = ('bars', 'columnar')
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+def _whole_number(value) -> int:
+    # int() would silently truncate 2.7 to 2 and change the order
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(f"Not a whole number: {value!r}")
+    return int(number)
+
+
+def parse_job(payload: Dict) -> Dict:
+    """
+    Validate a request payload and normalize it into a job.
+
+    The job is a plain, JSON-serializable dict so it can be hashed for the
+    cache and sent to a worker process.
+
+    Args:
+        payload: Decoded JSON request body
+
+    Returns:
+        Normalized job dictionary
+
+    Raises:
+        ValueError: If the payload is malformed (including non-finite
+            lengths and fractional quantities) or has more than
+            SERVICE_MAX_PIECES pieces
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    try:
+        bar_length = float(payload.get('bar_length', DEFAULT_BAR_LENGTH))
+        kerf = float(payload.get('kerf', DEFAULT_KERF))
+        multiplier = _whole_number(payload.get('multiplier', 1))
+    except (TypeError, ValueError):
+        raise ValueError("bar_length, kerf and multiplier must be numbers (multiplier a whole number)")
+    if not (math.isfinite(bar_length) and math.isfinite(kerf)):
+        raise ValueError("bar_length and kerf must be finite numbers")
+
+    algorithm = payload.get('algorithm', 'BFD')
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+    if bar_length <= 0 or kerf < 0 or multiplier < 1:
+        raise ValueError("bar_length must be > 0, kerf >= 0 and multiplier >= 1")
+
+    outputs = payload.get('outputs', [])
+    if not isinstance(outputs, list) or any(o not in OUTPUT_FORMATS for o in outputs):
+        raise ValueError(f"outputs must be a list of {', '.join(OUTPUT_FORMATS)}")
+
+    result_format = payload.get('result_format', 'bars')
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"result_format must be one of {', '.join(RESULT_FORMATS)}")
+
+    raw_cuts = payload.get('cuts')
+    if not isinstance(raw_cuts, list) or not raw_cuts:
+        raise ValueError("cuts must be a non-empty list")
+
+    cuts = []
+    for index, entry in enumerate(raw_cuts):
+        try:
+            length = float(entry['length'])
+            quantity = _whole_number(entry.get('quantity', 1))
+            material_code = str(entry['material']).strip()
+            material_name = str(entry.get('name', material_code)).strip()
+            order_id = str(entry['order']).strip() if entry.get('order') is not None else None
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise ValueError(f"Invalid cut at index {index}: {entry!r}")
+        if not material_code or not (math.isfinite(length) and length > 0) or quantity <= 0:
+            raise ValueError(f"Invalid cut at index {index}: {entry!r}")
+        cuts.append([length, quantity, material_code, material_name, order_id])
+
+    # A few bytes of JSON must not expand into millions of Cut objects in a worker
+    pieces = sum(cut[1] for cut in cuts) * multiplier
+    if pieces > SERVICE_MAX_PIECES:
+        raise ValueError(f"Job has {pieces} pieces, at most {SERVICE_MAX_PIECES} are allowed")
+
+    return {
+        'bar_length': bar_length,
+        'kerf': kerf,
+        'algorithm': algorithm,
+        'multiplier': multiplier,
+        'cuts': cuts,
+        'outputs': sorted(set(outputs)),
+        'result_format': result_format,
+    }
+
+
+def job_key(job: Dict) -> str:
+    """Stable hash of a normalized job, used for caching and coalescing."""
+    canonical = json.dumps(job, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def results_to_dict(results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Convert `optimize_by_material` results into JSON-serializable data."""
+    materials = {}
+    for material_code, data in results.items():
+        bars = data['bars']
+        materials[material_code] = {
+            'name': data['name'],
+            'statistics': CuttingOptimizer.calculate_statistics(bars, data.get('lower_bound')),
+            'bars': [
+                {
+                    'bar_number': bar.bar_number,
+                    'bar_length': bar.bar_length,
+                    'cuts': bar.cuts,
+                    'total_used': bar.total_used,
+                    'waste': bar.waste,
+                    'efficiency': bar.efficiency,
+                    **({'orders': bar.orders} if bar.orders else {}),
+                }
+                for bar in bars
+            ],
+        }
+    return materials
+
+
+def solve_job(job: Dict) -> Dict:
+    """
+    Run one normalized job. Executed inside a worker process.
+
+    Args:
+        job: Job created by `parse_job`
+
+    Returns:
+        JSON-serializable response body
+    """
+    demand = [DemandLine(length, quantity, material_code, material_name, order_id)
+              for length, quantity, material_code, material_name, order_id in job['cuts']]
+
+    optimizer = CuttingOptimizer(bar_length=job['bar_length'], algorithm=job['algorithm'], kerf=job['kerf'])
+    results = optimizer.optimize_demand(demand, multiplier=job['multiplier'])
+
+    all_bars = [bar for data in results.values() for bar in data['bars']]
+    total_bound = sum(data['lower_bound'] for data in results.values())
+    response = {
+        'bar_length': job['bar_length'],
+        'kerf': job['kerf'],
+        'algorithm': job['algorithm'],
+        'multiplier': job['multiplier'],
+        'statistics': CuttingOptimizer.calculate_statistics(all_bars, total_bound),
+    }
+    if job.get('result_format') == 'columnar':
+        from serialization import to_columnar
+        response['result'] = to_columnar(results)
+    else:
+        response['materials'] = results_to_dict(results)
+    if any(line.order_id is not None for line in demand):
+        response['orders'] = order_summary(optimizer.split_by_order(results))
+
+    # Export libraries are only imported when an export is requested
+    files = {}
+    if 'excel' in job['outputs']:
+        from excel_handler import ExcelHandler
+        buffer = io.BytesIO()
+        ExcelHandler.write_results_to_excel(results, buffer, job['bar_length'])
+        files['excel'] = buffer.getvalue()
+    if 'excel_structured' in job['outputs']:
+        from excel_handler import ExcelHandler
+        buffer = io.BytesIO()
+        ExcelHandler.write_structured_results(results, buffer)
+        files['excel_structured'] = buffer.getvalue()
+    if 'pdf_compact' in job['outputs'] or 'pdf_visual' in job['outputs']:
+        from pdf_generator import WorkPlanPDFGenerator
+        pdf_gen = WorkPlanPDFGenerator(results, job['bar_length'], job['kerf'], job['algorithm'])
+        if 'pdf_compact' in job['outputs']:
+            files['pdf_compact'] = pdf_gen.generate_compact_plan()
+        if 'pdf_visual' in job['outputs']:
+            files['pdf_visual'] = pdf_gen.generate_visual_plan()
+
+    if files:
+        response['files'] = {name: base64.b64encode(data).decode('ascii') for name, data in files.items()}
+
+    return response
+
+
+def solve_batch(jobs: List[Dict]) -> List[Tuple[bool, Dict]]:
+    """
+    Run several jobs in one worker call to save inter-process overhead.
+
+    Returns:
+        List of (success, body) tuples in the order of `jobs`
+    """
+    outcomes = []
+    for job in jobs:
+        try:
+            outcomes.append((True, solve_job(job)))
+        except Exception as e:
+            outcomes.append((False, {'error': str(e)}))
+    return outcomes
+
+
+class OptimizationService:
+    """
+    Async optimization service with request batching, coalescing and caching.
+
+    Identical jobs that are already being solved share one computation.
+    New jobs are collected for `batch_window` seconds (or until `max_batch`
+    jobs are waiting) and then sent to the worker pool together.
+    """
+
+    def __init__(self, workers: int = SERVICE_WORKERS, cache_size: int = SERVICE_CACHE_SIZE,
+                 batch_window: float = SERVICE_BATCH_WINDOW, max_batch: int = SERVICE_MAX_BATCH,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize the service.
+
+        Args:
+            workers: Number of worker processes (ignored if executor is given)
+            cache_size: Number of finished results kept in the LRU cache
+            batch_window: Seconds to wait for further jobs before dispatching a batch
+            max_batch: Maximum number of jobs per batch
+            executor: Optional executor to use instead of a new process pool
+        """
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self._owns_executor = executor is None
+        self._cache: "OrderedDict[str, Tuple[bool, Dict]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'solved': 0, 'batches': 0}
+
+    async def submit(self, job: Dict) -> Tuple[bool, Dict]:
+        """
+        Solve a normalized job, using the cache and in-flight requests.
+
+        Returns:
+            (success, body) tuple
+        """
+        self.stats['requests'] += 1
+        key = job_key(job)
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return self._cache[key]
+
+        if key in self._in_flight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._in_flight[key])
+
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.ensure_future(self._run_batcher())
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        await self._queue.put((key, job))
+        return await asyncio.shield(future)
+
+    async def _run_batcher(self):
+        """Collect queued jobs into batches and dispatch them to the pool."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Do not wait for the batch here so further batches can run in parallel
+            asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[str, Dict]]):
+        """Run one batch in the worker pool and resolve the waiting futures."""
+        loop = asyncio.get_running_loop()
+        self.stats['batches'] += 1
+        try:
+            outcomes = await loop.run_in_executor(self._executor, solve_batch, [job for _, job in batch])
+        except Exception as e:
+            outcomes = [(False, {'error': f"Worker failed: {e}"})] * len(batch)
+
+        for (key, _), outcome in zip(batch, outcomes):
+            self.stats['solved'] += 1
+            if outcome[0]:
+                self._cache[key] = outcome
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            future = self._in_flight.pop(key)
+            if not future.done():
+                future.set_result(outcome)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle a single HTTP/1.1 request (one request per connection)."""
+        try:
+            status, body = await self._handle_request(reader)
+        except Exception as e:
+            status, body = 500, {'error': str(e)}
+
+        data = json.dumps(body).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n"
+        )
+        try:
+            writer.write(head.encode('ascii') + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader) -> Tuple[int, Dict]:
+        """Parse the HTTP request and route it."""
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            return 400, {'error': "Malformed request line"}
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': "Use GET"}
+            return 200, {'status': 'ok', 'cache_entries': len(self._cache), **self.stats}
+
+        if path != '/optimize':
+            return 404, {'error': f"Unknown path: {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}
+
+        try:
+            length = int(headers.get('content-length', '0'))
+        except ValueError:
+            return 400, {'error': "Invalid Content-Length"}
+        if length > SERVICE_MAX_BODY:
+            return 413, {'error': f"Body larger than {SERVICE_MAX_BODY} bytes"}
+
+        try:
+            payload = json.loads(await reader.readexactly(length))
+            job = parse_job(payload)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            return 400, {'error': str(e)}
+
+        # The job is valid here: a failed solve is a server fault, not bad input
+        success, body = await self.submit(job)
+        return (200 if success else 500), body
+
+    async def start(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> asyncio.AbstractServer:
+        """Start listening. Use port 0 to let the OS pick a free port."""
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server
+
+    @property
+    def port(self) -> Optional[int]:
+        """Port the server is listening on."""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop the server, the batcher and (if owned) the worker pool."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+
+async def serve(host: str, port: int, workers: int):
+    """Run the service until interrupted."""
+    service = OptimizationService(workers=workers)
+    server = await service.start(host, port)
+    print(f"Zuschnittoptimierung-Service läuft auf http://{host}:{service.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler HTTP/JSON-Service für die Zuschnittoptimierung")
+    parser.add_argument('--host', default=SERVICE_HOST, help="Adresse (Standard: %(default)s)")
+    parser.add_argument('--port', type=int, default=SERVICE_PORT, help="Port (Standard: %(default)s)")
+    parser.add_argument('--workers', type=int, default=SERVICE_WORKERS, help="Worker-Prozesse (Standard: %(default)s)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        print("\nService beendet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+CSV and Parquet input/output next to the Excel files of excel_handler.py.
+
+Both formats find their columns by header name like the Excel reader (or
+use the EXCEL_COLUMNS positions) and are validated chunk by chunk with
+validation.py, so an ERP export can be read as it is:
+
+- CSV is streamed in chunks of CSV_CHUNK_ROWS rows with the csv module;
+  ';' or tab separated files may use a decimal comma
+- Parquet is read batch by batch with pyarrow, which is only needed (and
+  imported) when a Parquet file is read or written
+
+read_demand()/read_cuts() pick the reader by file extension (.xlsx/.xls,
+.csv, .parquet), so every format feeds CuttingOptimizer.optimize_demand or
+optimize_by_material directly. Results are written as one row per cut.
+"""
+import csv
+import io
+import itertools
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import profiling
+from config import CSV_CHUNK_ROWS, EXCEL_COLUMNS, HEADER_SCAN_ROWS
+from optimizer import Cut, DemandLine
+from validation import ColumnMapping, ValidationReport, detect_columns, select_columns, validate_columns
+
+# Headers of the input columns, in EXCEL_COLUMNS order
+DEMAND_HEADERS = {'length': 'Länge (mm)', 'quantity': 'Anzahl', 'material': 'Material', 'name': 'Materialname'}
+
+# Headers of the result rows (one row per cut)
+RESULT_HEADERS = ['Material', 'Materialname', 'Stange', 'Stangenlänge', 'Rest-ID', 'Position', 'Länge', 'Auftrag']
+
+FORMATS = {'.xlsx': 'excel', '.xls': 'excel', '.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+# (length, quantity, material code, material name)
+Row = Tuple[float, int, str, str]
+
+
+def file_format(name) -> str:
+    """
+    Input format of a file name or path ('excel', 'csv' or 'parquet').
+
+    Raises:
+        ValueError: If the extension is not supported
+    """
+    suffix = Path(str(name)).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported file type: {suffix or name}")
+    return FORMATS[suffix]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet files need pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def _ordered_headers() -> List[str]:
+    """DEMAND_HEADERS sorted by their EXCEL_COLUMNS position."""
+    return [DEMAND_HEADERS[key] for key in sorted(DEMAND_HEADERS, key=EXCEL_COLUMNS.get)]
+
+
+def _text_stream(source):
+    """Text stream for a path or a binary file object."""
+    if isinstance(source, (str, Path)):
+        return open(source, newline='', encoding='utf-8-sig')
+    return io.TextIOWrapper(source, newline='', encoding='utf-8-sig')
+
+
+@contextmanager
+def _open_text(destination):
+    """Open a path for writing, or use a given text file object as it is."""
+    if isinstance(destination, (str, Path)):
+        with open(destination, 'w', newline='', encoding='utf-8') as stream:
+            yield stream
+    else:
+        yield destination
+
+
+def _validated(rows: Sequence[Sequence], mapping: ColumnMapping, first_row: int,
+               report: ValidationReport) -> List[Row]:
+    """Valid rows of a block of raw rows (see validation.validate_columns)."""
+    frame = validate_columns(select_columns(rows, mapping), mapping, first_row, report)
+    return list(frame.itertuples(index=False, name=None))
+
+
+def iter_row_chunks(rows: Iterable[Sequence], chunk_rows: int = CSV_CHUNK_ROWS,
+                    report: Optional[ValidationReport] = None) -> Iterator[List[Row]]:
+    """
+    Validate raw rows (CSV records, worksheet rows) chunk by chunk.
+
+    The header row and columns are found in the first HEADER_SCAN_ROWS rows,
+    so only one chunk of rows is held in memory at a time.
+
+    Args:
+        rows: Iterable of row sequences, first row = row 1
+        chunk_rows: Rows per chunk
+        report: Optional report that receives the mapping and rejected rows
+
+    Yields:
+        Lists of (length in mm, quantity, material code, material name)
+    """
+    report = report if report is not None else ValidationReport()
+    rows = iter(rows)
+    head = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+    mapping = report.mapping = detect_columns(head)
+    number = mapping.first_data_row + 1
+    chunk = head[mapping.first_data_row:]
+    for fields in rows:
+        chunk.append(fields)
+        if len(chunk) >= chunk_rows:
+            yield _validated(chunk, mapping, number, report)
+            number += len(chunk)
+            chunk = []
+    if chunk:
+        yield _validated(chunk, mapping, number, report)
+
+
+def iter_csv_chunks(source, chunk_rows: int = CSV_CHUNK_ROWS,
+                    report: Optional[ValidationReport] = None) -> Iterator[List[Row]]:
+    """
+    Stream the valid rows of a CSV file in chunks.
+
+    The separator (',', ';' or tab) is detected from the first line, the
+    header row and columns from the first rows (see validation.py). Numbers
+    may use a decimal comma (e.g. 1250,5) if they are quoted or the
+    separator is ';' or tab. Invalid rows are dropped and listed in `report`
+    with their record number (first row = 1).
+
+    Args:
+        source: Path or binary file object
+        chunk_rows: Rows per chunk
+        report: Optional report that receives the rejected rows
+
+    Yields:
+        Lists of (length in mm, quantity, material code, material name)
+    """
+    report = report if report is not None else ValidationReport()
+    stream = _text_stream(source)
+    try:
+        first_line = stream.readline()
+        delimiter = max(';\t,', key=first_line.count)
+        reader = csv.reader(itertools.chain([first_line], stream), delimiter=delimiter)
+        yield from iter_row_chunks(reader, chunk_rows, report)
+    finally:
+        if isinstance(source, (str, Path)):
+            stream.close()
+        else:
+            stream.detach()  # leave the caller's file object open
+
+
+def iter_parquet_chunks(source, report: Optional[ValidationReport] = None) -> Iterator[List[Row]]:
+    """
+    Stream the valid rows of a Parquet file batch by batch (needs pyarrow).
+
+    The columns are found by their names as CSV/Excel headers (otherwise
+    by their EXCEL_COLUMNS position). Rows are numbered from 2, the column
+    names counting as row 1.
+
+    Args:
+        source: Path or binary file object
+        report: Optional report that receives the rejected rows
+
+    Yields:
+        Lists of (length in mm, quantity, material code, material name)
+    """
+    pyarrow = _import_pyarrow()
+    report = report if report is not None else ValidationReport()
+    parquet = pyarrow.parquet.ParquetFile(source)
+    names = parquet.schema_arrow.names
+    mapping = report.mapping = detect_columns([names])
+    if any(mapping.columns[key] >= len(names) for key in ('length', 'quantity', 'material')):
+        return
+    keys = [key for key, position in mapping.columns.items() if position < len(names)]
+    number = 2
+    for batch in parquet.iter_batches(columns=[names[mapping.columns[key]] for key in keys]):
+        columns = {key: batch.column(i).to_pylist() for i, key in enumerate(keys)}
+        frame = validate_columns(columns, mapping, number, report)
+        number += batch.num_rows
+        yield list(frame.itertuples(index=False, name=None))
+
+
+def iter_chunks(source, fmt: str, report: Optional[ValidationReport] = None) -> Iterator[List[Row]]:
+    """Valid rows of a CSV or Parquet file in chunks."""
+    if fmt == 'csv':
+        return iter_csv_chunks(source, report=report)
+    if fmt == 'parquet':
+        return iter_parquet_chunks(source, report)
+    raise ValueError(f"Unsupported file type: {fmt}")
+
+
+def _aggregate(chunks: Iterable[List[Row]]) -> List[DemandLine]:
+    """Sum rows per (material, length), in order of first appearance (as read_demand_from_excel)."""
+    names: Dict[str, str] = {}
+    quantities: Dict[Tuple[str, float], int] = {}
+    for chunk in chunks:
+        for length, quantity, material_code, material_name in chunk:
+            names.setdefault(material_code, material_name)
+            key = (material_code, length)
+            quantities[key] = quantities.get(key, 0) + quantity
+    return [DemandLine(length, quantity, material_code, names[material_code])
+            for (material_code, length), quantity in quantities.items()]
+
+
+def read_demand(source, fmt: Optional[str] = None, report: Optional[ValidationReport] = None) -> List[DemandLine]:
+    """
+    Read aggregated demand lines from an Excel, CSV or Parquet file.
+
+    Args:
+        source: Path or binary file object
+        fmt: 'excel', 'csv' or 'parquet' (default: from the file extension)
+        report: Optional report that receives the rejected rows
+
+    Returns:
+        Demand lines as ExcelHandler.read_demand_from_excel
+    """
+    fmt = fmt or file_format(source)
+    if fmt == 'excel':
+        from excel_handler import ExcelHandler
+        return ExcelHandler.read_demand_from_excel(source, report)
+    with profiling.stage(f'{fmt}.read'):
+        return _aggregate(iter_chunks(source, fmt, report))
+
+
+def read_cuts(source, fmt: Optional[str] = None, report: Optional[ValidationReport] = None) -> List[Cut]:
+    """
+    Read single cuts (in row order) from an Excel, CSV or Parquet file.
+
+    Args:
+        source: Path or binary file object
+        fmt: 'excel', 'csv' or 'parquet' (default: from the file extension)
+        report: Optional report that receives the rejected rows
+
+    Returns:
+        List of Cut objects as ExcelHandler.read_cuts_from_excel
+    """
+    fmt = fmt or file_format(source)
+    if fmt == 'excel':
+        from excel_handler import ExcelHandler
+        return ExcelHandler.read_cuts_from_excel(source, report)
+    with profiling.stage(f'{fmt}.read'):
+        return [Cut(length, material_code, material_name)
+                for chunk in iter_chunks(source, fmt, report)
+                for length, quantity, material_code, material_name in chunk
+                for _ in range(quantity)]
+
+
+def _demand_rows(demand: Iterable[DemandLine]) -> Iterator[list]:
+    """Input rows with the values at their EXCEL_COLUMNS positions."""
+    for line in demand:
+        row = [None] * len(EXCEL_COLUMNS)
+        for key, value in (('length', line.length), ('quantity', line.quantity),
+                           ('material', line.material_code), ('name', line.material_name)):
+            row[EXCEL_COLUMNS[key]] = value
+        yield row
+
+
+def write_demand_csv(demand: Iterable[DemandLine], destination, delimiter: str = ','):
+    """
+    Write demand lines as an input CSV file (header row, EXCEL_COLUMNS order).
+
+    Args:
+        demand: Demand lines
+        destination: Path or text file object
+        delimiter: Separator; with ';' or tab, numbers get a decimal comma
+    """
+    def number(value):
+        text = repr(value) if isinstance(value, float) else str(value)
+        return text.replace('.', ',') if delimiter != ',' else text
+
+    with _open_text(destination) as stream:
+        writer = csv.writer(stream, delimiter=delimiter)
+        writer.writerow(_ordered_headers())
+        for row in _demand_rows(demand):
+            writer.writerow([number(value) if isinstance(value, (int, float)) else value for value in row])
+
+
+def write_demand_parquet(demand: Iterable[DemandLine], destination):
+    """Write demand lines as an input Parquet file (needs pyarrow)."""
+    pyarrow = _import_pyarrow()
+    rows = list(_demand_rows(demand))
+    columns = {header: [row[i] for row in rows] for i, header in enumerate(_ordered_headers())}
+    pyarrow.parquet.write_table(pyarrow.table(columns), destination)
+
+
+def result_rows(results: Dict[str, Dict]) -> Iterator[tuple]:
+    """
+    One row per cut in saw order, with the columns of RESULT_HEADERS.
+
+    Remnant bars carry their remnant ID, other bars None; cuts without an
+    order carry None as order.
+    """
+    for material_code, data in results.items():
+        for bar in data['bars']:
+            orders = bar.orders or [None] * len(bar.cuts)
+            for position, (length, order_id) in enumerate(zip(bar.cuts, orders), start=1):
+                yield (material_code, data['name'], bar.bar_number, bar.bar_length, bar.remnant_id,
+                       position, length, order_id)
+
+
+def write_results_csv(results: Dict[str, Dict], destination, delimiter: str = ','):
+    """
+    Write results as CSV, one row per cut (see result_rows).
+
+    Args:
+        results: Results of optimize_by_material/optimize_demand
+        destination: Path or text file object
+        delimiter: Separator
+    """
+    with profiling.stage('csv.write'), _open_text(destination) as stream:
+        writer = csv.writer(stream, delimiter=delimiter)
+        writer.writerow(RESULT_HEADERS)
+        writer.writerows(result_rows(results))
+
+
+def write_results_parquet(results: Dict[str, Dict], destination):
+    """Write results as Parquet, one row per cut (see result_rows; needs pyarrow)."""
+    pyarrow = _import_pyarrow()
+    with profiling.stage('parquet.write'):
+        columns = list(zip(*result_rows(results))) or [()] * len(RESULT_HEADERS)
+        types = [pyarrow.string(), pyarrow.string(), pyarrow.int32(), pyarrow.float64(), pyarrow.int32(),
+                 pyarrow.int32(), pyarrow.float64(), pyarrow.string()]
+        table = pyarrow.table({header: pyarrow.array(values, type=type_)
+                               for header, values, type_ in zip(RESULT_HEADERS, columns, types)})
+        pyarrow.parquet.write_table(table, destination)
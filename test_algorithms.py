@@ -23,7 +23,7 @@ print(f"Cuts: {test_cuts}")
 print(f"Total cuts length: {sum(test_cuts)}mm")
 print("=" * 80)
 
-for algorithm in ['FFD', 'BFD', 'Heuristic']:
+for algorithm in ['FFD', 'BFD', 'Heuristic', 'Pattern']:
     print(f"\n{algorithm} Algorithm:")
     print("-" * 80)
     
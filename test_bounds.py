@@ -0,0 +1,40 @@
+"""
+Test lower bounds and optimality gap reporting.
+"""
+from bounds import continuous_bound, martello_toth_bound, gap_statistics
+from optimizer import CuttingOptimizer, Cut
+
+print("=" * 80)
+print("LOWER BOUND TEST")
+print("=" * 80)
+
+# Five pieces of 1600 mm: only one fits per 3000 mm bar, but the
+# continuous bound only sees 8000 mm of material
+cuts = [1600] * 5
+print(f"Cuts: {cuts}, Stangenlänge 3000mm")
+print(f"  Kontinuierliche Schranke: {continuous_bound(cuts, 3000)}")
+print(f"  Martello-Toth L2:         {martello_toth_bound(cuts, 3000)}")
+assert continuous_bound(cuts, 3000) == 3
+assert martello_toth_bound(cuts, 3000) == 5
+
+# Kerf: 1497 + 1500 + 3 mm kerf fit exactly into 3000 mm
+cuts = [1500, 1497]
+assert continuous_bound(cuts, 3000, kerf=3.0) == 1
+assert martello_toth_bound(cuts, 3000, kerf=3.0) == 1
+
+print(f"\nGap 37 Stangen vs. Schranke 35: {gap_statistics(37, 35)}")
+
+test_cuts = [2700, 2600, 1800, 1700, 1650, 1200, 1150, 1100, 1050,
+             850, 820, 780, 750, 500, 480, 450, 420, 400]
+cut_objects = [Cut(length, "ST37", "Stahl S235JR") for length in test_cuts]
+
+for algorithm in ['FFD', 'BFD', 'Heuristic', 'Pattern']:
+    optimizer = CuttingOptimizer(bar_length=3000, algorithm=algorithm, kerf=3.0)
+    results = optimizer.optimize_by_material(cut_objects)
+    data = results['ST37']
+    stats = CuttingOptimizer.calculate_statistics(data['bars'], data['lower_bound'])
+    print(f"{algorithm:10s} Stangen: {stats['total_bars']}  Schranke: {stats['lower_bound']}  "
+          f"Abstand: {stats['gap_bars']} ({stats['gap_percent']:.1f}%)")
+    assert stats['total_bars'] >= stats['lower_bound']
+
+print("=" * 80)
@@ -0,0 +1,62 @@
+"""
+Test aggregated demand: Excel reader, multi-stock and optimize_demand vs. optimize_by_material.
+"""
+import io
+import random
+
+import pandas as pd
+
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer, Cut, DemandLine, aggregate_demand, expand_demand
+from config import INPUT_SHEET_NAME
+
+print("=" * 80)
+print("DEMAND TEST")
+print("=" * 80)
+
+# Input with repeated lines, invalid rows and a material name that changes
+rows = [
+    [2500, 3, 'ST37', 'Stahl S235JR'],
+    [1200, 4, 'ALU', 'Aluminium 6060'],
+    [2500, 2, 'ST37', 'Stahl (anders)'],
+    ['abc', 2, 'ST37', 'Stahl S235JR'],
+    [900, 0, 'ALU', 'Aluminium 6060'],
+    [1800, 1.7, ' ST37 ', 'Stahl S235JR'],
+    [1200, 1, 'ALU', 'Aluminium 6060'],
+]
+buffer = io.BytesIO()
+with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+    pd.DataFrame(rows, columns=['Länge (mm)', 'Anzahl', 'Material', 'Materialname']).to_excel(
+        writer, sheet_name=INPUT_SHEET_NAME, index=False)
+
+demand = ExcelHandler.read_demand_from_excel(io.BytesIO(buffer.getvalue()))
+cuts = ExcelHandler.read_cuts_from_excel(io.BytesIO(buffer.getvalue()))
+for line in demand:
+    print(f"  {line}")
+assert demand == [
+    DemandLine(2500.0, 5, 'ST37', 'Stahl S235JR'),
+    DemandLine(1200.0, 5, 'ALU', 'Aluminium 6060'),
+    DemandLine(1800.0, 1, 'ST37', 'Stahl S235JR'),
+]
+assert len(cuts) == sum(line.quantity for line in demand) == 11
+assert aggregate_demand(cuts) == demand
+
+# Same results as the expanded cuts, for every algorithm and with a multiplier
+rng = random.Random(7)
+cuts = [Cut(float(rng.choice([2500, 1800, 1200, 905, 640, 333])), code, f"Name {code}")
+        for code in rng.choices(['ST37', 'ALU', 'INOX'], k=400)]
+demand = aggregate_demand(cuts)
+assert sorted(c.length for c in expand_demand(demand)) == sorted(c.length for c in cuts)
+for algorithm in ['FFD', 'BFD', 'Heuristic', 'Pattern']:
+    for stock_lengths in [None, {'default': [(6000, None), (6500, None), (12000, None)]}]:
+        optimizer = CuttingOptimizer(bar_length=6000, algorithm=algorithm, kerf=3.0, stock_lengths=stock_lengths)
+        expected = optimizer.optimize_by_material(cuts, multiplier=2)
+        actual = optimizer.optimize_demand(demand, multiplier=2)
+        assert list(actual) == list(expected)
+        for code in expected:
+            assert [(b.cuts, b.bar_length) for b in actual[code]['bars']] == \
+                   [(b.cuts, b.bar_length) for b in expected[code]['bars']], (algorithm, code)
+            assert actual[code]['lower_bound'] == expected[code]['lower_bound']
+    print(f"{algorithm:10s} optimize_demand == optimize_by_material ✓")
+
+print("\n" + "=" * 80)
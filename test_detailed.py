@@ -20,7 +20,7 @@ print(f"Bar Length: {bar_length}mm")
 print(f"Cuts: {test_cuts}")
 print("=" * 80)
 
-for algorithm in ['FFD', 'BFD', 'Heuristic']:
+for algorithm in ['FFD', 'BFD', 'Heuristic', 'Pattern']:
     print(f"\n### {algorithm} ###")
     
     optimizer = CuttingOptimizer(bar_length=bar_length, algorithm=algorithm)
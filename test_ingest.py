@@ -0,0 +1,112 @@
+"""
+Test multi-sheet/multi-file ingestion: sheet patterns, source tags, parallel parsing.
+"""
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+import pandas as pd
+
+import ingest
+import table_io
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer, DemandLine
+
+print("=" * 80)
+print("INGEST TEST")
+print("=" * 80)
+
+temp_dir = tempfile.mkdtemp()
+COLUMNS = ['Länge (mm)', 'Anzahl', 'Material', 'Materialname']
+
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, rows in sheets.items():
+            pd.DataFrame(rows, columns=COLUMNS).to_excel(writer, sheet_name=name, index=False)
+
+
+project = os.path.join(temp_dir, 'projekt.xlsx')
+write_workbook(project, {
+    'Stueckliste Rahmen': [(2500, 2, 'ST37', 'Stahl'), (1800, 3, 'ST37', 'Stahl'), ('x', 1, 'ST37', 'Stahl')],
+    'Notizen': [(9999, 9, 'XX', 'nicht lesen')],
+    'Stueckliste Tür': [(2500, 1, 'ST37', 'Stahl'), (1200, 4, 'AL', 'Alu')],
+})
+
+# One workbook: matching sheets only, tagged by sheet
+demand, sheets = ingest.ingest([project])
+assert [(s.sheet, s.rows, s.pieces, s.tag) for s in sheets] == [
+    ('Stueckliste Rahmen', 2, 5, 'Stueckliste Rahmen'), ('Stueckliste Tür', 2, 5, 'Stueckliste Tür')]
+assert DemandLine(2500.0, 2, 'ST37', 'Stahl', 'Stueckliste Rahmen') in demand
+assert sum(line.quantity for line in demand) == 10
+assert {line.material_code for line in demand} == {'ST37', 'AL'}
+print(f"Blätter: {[s.sheet for s in sheets]}")
+
+# Tag modes
+assert {line.order_id for line in ingest.ingest([project], tag='none')[0]} == {None}
+assert {line.order_id for line in ingest.ingest([project], tag='file')[0]} == {'projekt'}
+assert {line.order_id for line in ingest.ingest([project], tag='both')[0]} == {
+    'projekt/Stueckliste Rahmen', 'projekt/Stueckliste Tür'}
+assert [s.sheet for s in ingest.ingest([project], pattern='*Tür')[1]] == ['Stueckliste Tür']
+
+# A single Stueckliste sheet gives the same demand as the Excel reader
+example = os.path.join(temp_dir, 'beispiel.xlsx')
+ExcelHandler.create_example_input(example)
+assert ingest.ingest([example])[0] == ExcelHandler.read_demand_from_excel(example)
+
+# Several files (Excel, CSV, bytes) merged into one demand set, tagged by file (and sheet)
+csv_path = os.path.join(temp_dir, 'erp.csv')
+table_io.write_demand_csv([DemandLine(2500.0, 6, 'ST37', 'Stahl')], csv_path, delimiter=';')
+with open(example, 'rb') as f:
+    sources = [project, csv_path, ('upload.xlsx', f.read())]
+demand, sheets = ingest.ingest(sources, workers=1)
+assert [s.tag for s in sheets] == ['projekt/Stueckliste Rahmen', 'projekt/Stueckliste Tür', 'erp', 'upload']
+assert ingest.ingest(sources, workers=3) == (demand, sheets)
+
+# Packed jointly, split back per source
+optimizer = CuttingOptimizer(bar_length=6000, kerf=3.0)
+results = optimizer.optimize_demand(demand)
+plans = optimizer.split_by_order(results)
+pieces = {tag: sum(len(bar.cuts) for data in plan.values() for bar in data['bars']) for tag, plan in plans.items()}
+assert pieces == {s.tag: s.pieces for s in sheets}
+
+# Bad input is rejected before any file is parsed
+for bad in ([project], ['stueckliste.txt']):
+    try:
+        ingest.ingest(bad, tag='baugruppe' if bad == [project] else 'auto')
+        raise AssertionError("accepted")
+    except ValueError as e:
+        print(f"  abgelehnt: {e}")
+
+# A workbook without a matching sheet is an error, not an empty demand
+other = os.path.join(temp_dir, 'tabelle.xlsx')
+write_workbook(other, {'Tabelle1': [(2500, 2, 'ST37', 'Stahl')]})
+for workers in (1, 2):
+    try:
+        ingest.ingest([project, other], workers=workers)
+        raise AssertionError("accepted")
+    except ValueError as e:
+        assert 'tabelle.xlsx' in str(e) and 'Tabelle1' in str(e)
+        message = str(e)
+print(f"  abgelehnt: {message}")
+
+# Parallel parsing of several large workbooks
+rng = random.Random(8)
+paths = []
+for index in range(4):
+    path = os.path.join(temp_dir, f'gross{index}.xlsx')
+    rows = [(rng.randrange(200, 5900), rng.randrange(1, 4), f"M{rng.randrange(10)}", "Profil") for _ in range(10000)]
+    write_workbook(path, {'Stueckliste A': rows[:5000], 'Stueckliste B': rows[5000:]})
+    paths.append(path)
+timings = {}
+for workers in (1, 4):
+    start = time.perf_counter()
+    result = ingest.ingest(paths, workers=workers)
+    timings[workers] = time.perf_counter() - start
+    assert Counter(s.rows for s in result[1]) == Counter({5000: 8})
+print(f"4 Dateien x 10.000 Zeilen: seriell {timings[1]:.2f} s, 4 Prozesse {timings[4]:.2f} s "
+      f"({os.cpu_count()} CPUs)")
+
+print("\n" + "=" * 80)
@@ -0,0 +1,103 @@
+"""
+Test the job history: save, reopen without solving, find, diff, trend.
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+
+import job_store
+from excel_handler import ExcelHandler
+from job_store import JobStore, demand_hash
+from optimizer import CuttingOptimizer, DemandLine
+
+print("=" * 80)
+print("JOB STORE TEST")
+print("=" * 80)
+
+demand = [DemandLine(2500, 3, "ST37", "Stahl S235JR"), DemandLine(1800, 5, "ST37", "Stahl S235JR"),
+          DemandLine(1200.5, 4, "ALU", "Aluminium 6060", "A-7")]
+params = {'bar_length': 6000, 'algorithm': 'BFD', 'kerf': 3.0, 'multiplier': 1}
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    store = JobStore(os.path.join(temp_dir, 'verlauf.db'))
+    results = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_demand(demand)
+    job_id = store.save(demand, params, results, timings={'total_seconds': 0.25}, label="stueckliste.xlsx",
+                        created_at="2026-01-15T08:00:00")
+
+    # Reopen: same demand, parameters and plan, exportable again
+    job = store.load(job_id)
+    assert job.demand == demand and job.params == params and job.timings == {'total_seconds': 0.25}
+    assert job.info.label == "stueckliste.xlsx" and job.info.seconds == 0.25
+    assert {code: [(bar.bar_number, bar.bar_length, bar.total_used, bar.cuts, bar.orders) for bar in data['bars']]
+            for code, data in job.results.items()} == \
+           {code: [(bar.bar_number, bar.bar_length, bar.total_used, bar.cuts, bar.orders) for bar in data['bars']]
+            for code, data in results.items()}
+    assert job.results['ST37']['lower_bound'] == results['ST37']['lower_bound']
+    assert job.statistics['ALU']['cuts'] == 4
+    ExcelHandler.write_results_to_excel(job.results, os.path.join(temp_dir, 'wieder.xlsx'), 6000)
+    assert store.load(job_id + 100) is None
+
+    # Find by demand (order of the lines does not matter) and parameters
+    assert demand_hash(demand) == demand_hash(list(reversed(demand)))
+    assert store.find(list(reversed(demand)), params) == job_id
+    assert store.find(demand, {**params, 'kerf': 4.0}) is None
+
+    # Jobs of another solver version are not reused
+    job_store.SOLVER_VERSION += 1
+    try:
+        assert store.find(demand, params) is None
+    finally:
+        job_store.SOLVER_VERSION -= 1
+
+    # A database from before solver_version: its jobs count as version 0 and are never reused
+    old_path = os.path.join(temp_dir, 'alt.db')
+    with closing(sqlite3.connect(old_path)) as conn, conn:
+        conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT NOT NULL, "
+                     "demand_hash TEXT NOT NULL, params TEXT NOT NULL, label TEXT NOT NULL DEFAULT '', "
+                     "demand BLOB NOT NULL, results BLOB NOT NULL, timings TEXT, total_bars INTEGER NOT NULL, "
+                     "total_waste REAL NOT NULL, seconds REAL NOT NULL DEFAULT 0)")
+        conn.execute("INSERT INTO jobs (created_at, demand_hash, params, demand, results, total_bars, total_waste) "
+                     "VALUES ('2025-12-01T10:00:00', ?, ?, x'', x'', 3, 100.0)",
+                     (demand_hash(demand), job_store._params_json(params)))
+    old_store = JobStore(old_path)
+    assert old_store.find(demand, params) is None and len(old_store.list_jobs()) == 1
+    old_job = old_store.save(demand, params, results)
+    assert old_store.find(demand, params) == old_job
+
+    # A changed second run in another month, and the diff
+    demand_b = demand[:1] + [DemandLine(1800, 7, "ST37", "Stahl S235JR")] + demand[2:]
+    params_b = {**params, 'algorithm': 'Pattern'}
+    results_b = CuttingOptimizer(bar_length=6000, algorithm='Pattern', kerf=3.0).optimize_demand(demand_b)
+    job_b = store.save(demand_b, params_b, results_b, created_at="2026-02-03T09:30:00")
+    diff = store.diff(job_id, job_b)
+    print(f"Diff: {diff}")
+    assert diff['params'] == {'algorithm': ('BFD', 'Pattern')}
+    assert diff['demand'] == {('ST37', 1800, None): (5, 7)}
+    assert diff['materials']['ST37']['bars'] == (len(results['ST37']['bars']), len(results_b['ST37']['bars']))
+
+    # Listing and trend without reading results
+    assert [info.job_id for info in store.list_jobs()] == [job_b, job_id]
+    assert [info.job_id for info in store.list_jobs(since="2026-02-01")] == [job_b]
+    assert [info.job_id for info in store.list_jobs(material_code="ALU", until="2026-02-01")] == [job_id]
+    trend = store.trend(material_code="ST37")
+    print(f"Trend ST37: {trend}")
+    assert [row['period'] for row in trend] == ['2026-01', '2026-02']
+    assert trend[0]['waste'] == sum(bar.waste for bar in results['ST37']['bars'])
+
+    # Many jobs: trend queries stay fast (aggregated in SQLite)
+    rows = [(demand, params, results)] * 500
+    for n, (d, p, r) in enumerate(rows):
+        store.save(d, p, r, created_at=f"2025-{n % 12 + 1:02d}-10T10:00:00")
+    start = time.perf_counter()
+    trend = store.trend(period='month')
+    seconds = time.perf_counter() - start
+    print(f"Trend über {len(store.list_jobs(limit=10000))} Aufträge: {seconds * 1000:.1f} ms, {len(trend)} Zeilen")
+    assert sum(row['jobs'] for row in trend if row['material_code'] == 'ALU') == 502
+
+    store.delete(job_b)
+    assert store.load(job_b) is None
+    assert all(row['period'] != '2026-02' for row in store.trend())
+
+print("\n" + "=" * 80)
@@ -0,0 +1,44 @@
+"""
+Test the multi-length mode (several stock lengths per material).
+"""
+from optimizer import CuttingOptimizer, Cut, StockCatalog, StockLength
+
+cuts = ([Cut(2900, "ST37", "Stahl S235JR")] * 4 +
+        [Cut(1500, "ST37", "Stahl S235JR")] * 3 +
+        [Cut(5000, "ALU", "Aluminium 6060")])
+
+stock_lengths = {
+    'default': [(6000, None), (6500, None), (12000, None)],
+    'ALU': [StockLength(5500, 40.0), StockLength(6000, 30.0)],
+}
+
+print("=" * 80)
+print("MULTI STOCK LENGTH TEST")
+print("=" * 80)
+
+catalog = StockCatalog([StockLength(6000, 30.0), StockLength(6500, 35.0), StockLength(12000, 50.0)], 'cost')
+print(f"Günstigste Länge für 5000 mm: {catalog.cheapest_fitting(5000)}")
+print(f"Günstigste Länge für 6200 mm: {catalog.cheapest_fitting(6200)}")
+print(f"Günstigste Länge für 13000 mm: {catalog.cheapest_fitting(13000)}")
+assert catalog.cheapest_fitting(5000).length == 6000
+assert catalog.cheapest_fitting(6200).length == 6500
+assert catalog.cheapest_fitting(13000) is None
+
+for objective in ['material', 'cost']:
+    print(f"\n### Ziel: {objective} ###\n")
+    optimizer = CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0,
+                                 stock_lengths=stock_lengths, stock_objective=objective)
+    results = optimizer.optimize_by_material(cuts)
+    
+    for material_code, data in results.items():
+        for bar in data['bars']:
+            cuts_str = ", ".join(f"{c:.0f}" for c in bar.cuts)
+            print(f"  {material_code} Stange {bar.bar_number} ({bar.bar_length:.0f} mm): [{cuts_str}] Rest {bar.waste:.0f} mm")
+            assert bar.total_used <= bar.bar_length
+    
+    total_stock = sum(bar.bar_length for data in results.values() for bar in data['bars'])
+    print(f"  Materialeinsatz: {total_stock:.0f} mm")
+
+# ALU uses the cheaper 6000 mm bar when minimising cost
+assert results['ALU']['bars'][0].bar_length == 6000
+print("=" * 80)
@@ -0,0 +1,72 @@
+"""
+Test the multi-objective mode: end piece fit, cut model, evaluator and 'Multi'.
+"""
+import random
+
+from objective import ObjectiveWeights, evaluate
+from optimizer import CuttingOptimizer, Cut, Bar
+
+print("=" * 80)
+print("OBJECTIVE TEST")
+print("=" * 80)
+
+# Decimal lengths that add up to the bar length exactly fit (no trailing kerf)
+rng = random.Random(7)
+rejected_before = 0
+for _ in range(2000):
+    kerf = rng.choice([0.0, 2.5, 3.0, 4.2])
+    pieces = [round(rng.uniform(100, 1500), 1) for _ in range(rng.randint(2, 6))]
+    bar_length = round(sum(pieces) + kerf * (len(pieces) - 1), 1)
+    bar = Bar(1, [], 0.0, bar_length)
+    for piece in pieces:
+        assert bar.add_cut(piece, kerf), (pieces, kerf)
+    assert bar.waste == 0 and bar.saw_cuts == len(pieces) - 1
+    # The plain float comparison rejects some of these end pieces
+    used = pieces[0] + sum(piece + kerf for piece in pieces[1:-1])
+    rejected_before += used + pieces[-1] + kerf > bar_length
+print(f"Ohne Toleranz abgelehnt: {rejected_before} von 2000")
+assert rejected_before > 0
+print("Exakte Endstücke passen ✓")
+
+# Cut model: an exact end piece needs no extra cut, a rest does
+bar = Bar(1, [], 0.0, 6000)
+for length in [2000, 2000, 1994]:
+    assert bar.add_cut(length, 3.0)
+assert bar.waste == 0 and bar.saw_cuts == 2 and bar.kerf_loss(3.0) == 6.0
+assert not bar.can_fit(0.5, 3.0)
+bar = Bar(1, [], 0.0, 6000)
+for length in [2000, 2000, 1992]:
+    bar.add_cut(length, 3.0)
+assert bar.waste == 2.0 and bar.saw_cuts == 3 and bar.kerf_loss(3.0) == 8.0
+assert Bar(1, [], 0.0, 6000).saw_cuts == 0
+
+# Evaluator matches the per-bar values
+bars = CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0).optimize(
+    [2500] * 9 + [1800] * 14 + [1200] * 11 + [640] * 25 + [333] * 17)
+weights = ObjectiveWeights.from_dict({'bars': 1, 'kerf_loss': 0.001, 'cuts': 0.01, 'unknown': 5})
+evaluation = evaluate(bars, 3.0, weights)
+print(f"BFD: {evaluation}")
+assert evaluation.bars == len(bars)
+assert evaluation.cuts == sum(bar.saw_cuts for bar in bars)
+assert abs(evaluation.kerf_loss - sum(bar.kerf_loss(3.0) for bar in bars)) < 1e-6
+assert abs(evaluation.cost - (evaluation.bars + 0.001 * evaluation.kerf_loss + 0.01 * evaluation.cuts)) < 1e-9
+
+# 'Multi' is never worse than any single algorithm under its own objective
+for seed in range(5):
+    rng = random.Random(seed)
+    cuts = [Cut(rng.choice([2480, 1733, 1250, 980.5, 612, 333.3]), "ST37", "Stahl") for _ in range(rng.randint(20, 200))]
+    lengths = [cut.length for cut in cuts]
+    costs = {}
+    for algorithm in ['BFD', 'FFD', 'Heuristic', 'Pattern', 'Multi']:
+        optimizer = CuttingOptimizer(bar_length=6000, algorithm=algorithm, kerf=3.0)
+        costs[algorithm] = evaluate(optimizer.optimize(lengths), 3.0, optimizer.objective_weights).cost
+    assert costs['Multi'] <= min(costs.values()) + 1e-9, costs
+    results = CuttingOptimizer(bar_length=6000, algorithm='Multi', kerf=3.0).optimize_by_material(cuts)
+    assert sorted(c for bar in results['ST37']['bars'] for c in bar.cuts) == sorted(lengths)
+    print(f"Seed {seed}: " + ", ".join(f"{name} {cost:.3f}" for name, cost in costs.items()))
+
+# Custom weights are applied: free cuts cost at most the default weights
+cheap = CuttingOptimizer(bar_length=6000, algorithm='Multi', kerf=3.0, objective_weights={'bars': 1, 'cuts': 0})
+assert evaluate(cheap.optimize(lengths), 3.0, cheap.objective_weights).cost <= costs['Multi']
+
+print("\n" + "=" * 80)
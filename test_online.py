@@ -0,0 +1,91 @@
+"""
+Test online packing: best fit per cut, closing by fill and time, export.
+"""
+import io
+import random
+import time
+from collections import Counter
+
+from excel_handler import ExcelHandler
+from objective import EPSILON
+from optimizer import CuttingOptimizer, Cut
+from orders import order_summary
+from pdf_generator import WorkPlanPDFGenerator
+
+print("=" * 80)
+print("ONLINE PACKING TEST")
+print("=" * 80)
+
+optimizer = CuttingOptimizer(bar_length=6000, kerf=3.0)
+
+# Closing by fill threshold: the callback gets every closed bar once
+closed = []
+packer = optimizer.online(fill_threshold=0.99, max_open_seconds=None,
+                          on_close=lambda code, bar: closed.append((code, list(bar.cuts))))
+for _ in range(7):
+    packer.add(Cut(1997, "ST37", "Stahl"))
+assert closed == [("ST37", [1997, 1997, 1997])] * 2
+assert [bar.cuts for bar in packer.open_bars("ST37")] == [[1997]]
+
+# Best fit: a cut goes to the open bar with the least room that holds it
+packer = optimizer.online(fill_threshold=1.0, max_open_seconds=None)
+a = packer.add(Cut(4000, "ST37", "Stahl"))
+b = packer.add(Cut(5000, "ST37", "Stahl"))
+c = packer.add(Cut(3000, "ST37", "Stahl"))
+assert packer.add(Cut(900, "ST37", "Stahl")) is b
+assert packer.add(Cut(1500, "ST37", "Stahl")) is a
+assert packer.add(Cut(2997, "ST37", "Stahl")) is c and c.waste == 0
+
+# Closing by time limit (fake clock)
+now = [0.0]
+packer = optimizer.online(max_open_seconds=600, clock=lambda: now[0])
+packer.add(Cut(1000, "ST37", "Stahl"))
+now[0] = 300
+packer.add(Cut(5500, "ST37", "Stahl"))
+now[0] = 700
+expired = packer.close_expired()
+assert [bar.cuts for _, bar in expired] == [[1000]]
+assert [bar.cuts for bar in packer.open_bars("ST37")] == [[5500]]
+now[0] = 1000
+packer.add(Cut(400, "AL", "Alu"))  # adding also closes expired bars
+assert packer.open_bars("ST37") == []
+
+# A day of cuts in small batches: every piece placed once, no bar overfull
+rng = random.Random(11)
+stream = [Cut(rng.choice([2350, 1720, 1280, 860, 640, 415.5]), rng.choice(["ST37", "AL"]), "Profil",
+              f"A{rng.randrange(50):02d}") for _ in range(3000)]
+packer = optimizer.online(max_open_seconds=None)
+for start in range(0, len(stream), 10):
+    packer.add_many(stream[start:start + 10])
+results = packer.finish()
+assert all(not packer.open_bars(code) for code in results)
+placed = Counter((code, c, o) for code, data in results.items() for bar in data['bars']
+                 for c, o in zip(bar.cuts, bar.orders))
+assert placed == Counter((cut.material_code, cut.length, cut.order_id) for cut in stream)
+assert all(bar.total_used <= bar.bar_length + EPSILON for data in results.values() for bar in data['bars'])
+assert all([bar.bar_number for bar in data['bars']] == list(range(1, len(data['bars']) + 1))
+           for data in results.values())
+offline = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_by_material(stream)
+for code, data in results.items():
+    print(f"{code}: online {len(data['bars'])} Stangen, offline BFD {len(offline[code]['bars'])}, "
+          f"Schranke {data['lower_bound']}")
+    assert len(data['bars']) <= len(offline[code]['bars']) * 1.1
+
+# The final state goes through the usual writers and the order split
+ExcelHandler.write_results_to_excel(results, io.BytesIO(), 6000)
+assert WorkPlanPDFGenerator(results, 6000, 3.0, 'Online').generate_compact_plan()[:4] == b'%PDF'
+assert sum(row['pieces'] for row in order_summary(optimizer.split_by_order(results))) == 3000
+
+# Latency per cut stays flat as the number of open bars grows
+packer = optimizer.online(fill_threshold=1.0, max_open_seconds=None)
+timings = []
+for size in (2000, 20000):
+    cuts = [Cut(rng.uniform(3100, 5900), "ST37", "Stahl") for _ in range(size)]  # one per bar, all stay open
+    start = time.perf_counter()
+    for cut in cuts:
+        packer.add(cut)
+    timings.append((time.perf_counter() - start) / size * 1e6)
+    print(f"{len(packer.open_bars('ST37')):6d} offene Stangen: {timings[-1]:.1f} µs pro Schnitt")
+assert timings[1] < timings[0] * 5
+
+print("\n" + "=" * 80)
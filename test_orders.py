@@ -0,0 +1,97 @@
+"""
+Test multi-order batching: joint packing, order tags, split per order.
+"""
+import io
+import random
+import time
+from collections import Counter
+
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer, Cut, StockLength, aggregate_demand, expand_demand
+from orders import order_summary
+from service import parse_job, solve_job
+
+print("=" * 80)
+print("ORDER BATCHING TEST")
+print("=" * 80)
+
+# A day of small orders: a few pieces of two materials each
+rng = random.Random(3)
+cuts = []
+for order in range(40):
+    for _ in range(rng.randint(2, 8)):
+        code = rng.choice(["ST37", "AL"])
+        cuts.append(Cut(rng.choice([2350, 1720, 1280, 860, 415.5]), code, f"Profil {code}", f"A{order:03d}"))
+
+separate = 0
+for order in sorted({cut.order_id for cut in cuts}):
+    results = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_by_material(
+        [cut for cut in cuts if cut.order_id == order])
+    separate += sum(len(data['bars']) for data in results.values())
+
+optimizer = CuttingOptimizer(bar_length=6000, kerf=3.0, stock_lengths={'AL': [StockLength(6000, 42.0)]})
+joint = optimizer.optimize_by_material(cuts)
+joint_bars = sum(len(data['bars']) for data in joint.values())
+print(f"Stangen: einzeln {separate}, gemeinsam {joint_bars}")
+assert joint_bars < separate * 0.6
+
+# Every piece is tagged with its order, counts per (order, material, length) match
+tagged = Counter((order_id, code, length) for code, data in joint.items()
+                 for bar in data['bars'] for length, order_id in zip(bar.cuts, bar.orders))
+assert tagged == Counter((cut.order_id, cut.material_code, cut.length) for cut in cuts)
+
+# Split per order: pieces, material and cost add up to the joint plan
+plans = optimizer.split_by_order(joint)
+assert set(plans) == {cut.order_id for cut in cuts}
+for order_id, materials in plans.items():
+    assert Counter((code, c) for code, data in materials.items() for bar in data['bars'] for c in bar.cuts) == \
+           Counter((cut.material_code, cut.length) for cut in cuts if cut.order_id == order_id)
+for code, data in joint.items():
+    total_length = sum(bar.bar_length for bar in data['bars'])
+    charged = sum(materials[code]['material_length'] for materials in plans.values() if code in materials)
+    assert abs(charged - total_length) < 1e-6, (code, charged, total_length)
+total_cost = sum(row['cost'] for row in order_summary(plans))
+expected = sum(len(joint[code]['bars']) * 42.0 if code == 'AL' else len(joint[code]['bars']) * 6.0 for code in joint)
+assert abs(total_cost - expected) < 1e-6, (total_cost, expected)
+for row in order_summary(plans)[:3]:
+    print(f"  {row['order_id']}: {row['pieces']} Teile, {row['bars']} Stangen ({row['shared_bars']} geteilt), "
+          f"{row['material_m']:.2f} m, {row['cost']:.2f}")
+
+# Per-order plans go through the usual writers; bar numbers are those of the joint saw plan
+first = plans['A000']
+ExcelHandler.write_results_to_excel(first, io.BytesIO(), 6000)
+numbers = {code: {bar.bar_number for bar in data['bars']} for code, data in joint.items()}
+assert all({bar.bar_number for bar in data['bars']} <= numbers[code] for code, data in first.items())
+
+# Demand lines keep the order; the same plan as with single cuts
+demand = aggregate_demand(cuts)
+assert sorted(map(repr, expand_demand(demand))) == sorted(map(repr, cuts))
+assert Counter(cut.order_id for cut in expand_demand(demand)) == Counter(cut.order_id for cut in cuts)
+from_demand = optimizer.optimize_demand(demand)
+assert {code: [(bar.cuts, bar.orders) for bar in data['bars']] for code, data in from_demand.items()} == \
+       {code: [(bar.cuts, bar.orders) for bar in data['bars']] for code, data in joint.items()}
+
+# Without order IDs nothing is tagged
+plain = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_by_material([Cut(1000, "X", "X")] * 5)
+assert plain['X']['bars'][0].orders == []
+
+# Service: optional order per cut
+body = solve_job(parse_job({'bar_length': 6000, 'kerf': 3.0, 'cuts': [
+    {'length': 2500, 'quantity': 1, 'material': 'ST37', 'order': 'A-1'},
+    {'length': 2500, 'quantity': 1, 'material': 'ST37', 'order': 'A-2'},
+    {'length': 900, 'quantity': 2, 'material': 'ST37'},
+]}))
+assert sorted(row['order_id'] or '' for row in body['orders']) == ['', 'A-1', 'A-2']
+assert sorted(o or '' for bar in body['materials']['ST37']['bars'] for o in bar['orders']) == ['', '', 'A-1', 'A-2']
+
+# Thousands of pieces from hundreds of orders
+cuts = [Cut(rng.choice([2350, 1720, 1280, 860, 640, 415.5, 333]), "ST37", "Stahl", f"A{rng.randrange(300):03d}")
+        for _ in range(20000)]
+start = time.perf_counter()
+big = CuttingOptimizer(bar_length=6000, kerf=3.0)
+plans = big.split_by_order(big.optimize_by_material(cuts))
+seconds = time.perf_counter() - start
+print(f"20000 Teile, {len(plans)} Aufträge: {seconds:.2f} s")
+assert sum(row['pieces'] for row in order_summary(plans)) == 20000
+
+print("\n" + "=" * 80)
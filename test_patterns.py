@@ -0,0 +1,52 @@
+"""
+Test the cutting pattern table.
+"""
+from patterns import _enumerate_cached, enumerate_patterns, best_pattern, group_bars_by_pattern
+from optimizer import CuttingOptimizer
+
+lengths = [1500, 1000, 600]
+bar_length = 3000
+kerf = 3.0
+
+print("=" * 80)
+print("PATTERN TABLE TEST")
+print("=" * 80)
+print(f"Längen: {lengths}, Stangenlänge: {bar_length}mm, Sägeblatt: {kerf}mm")
+
+patterns = enumerate_patterns(lengths, bar_length, kerf)
+print(f"\n{len(patterns)} nicht dominierte Muster:")
+for pattern in patterns:
+    print(f"  {pattern.counts} -> {pattern.used_length:.0f}mm genutzt, Rest {pattern.waste(bar_length):.0f}mm")
+    assert pattern.used_length <= bar_length
+
+# No pattern may contain another one
+for p in patterns:
+    for q in patterns:
+        if p is not q:
+            assert not all(a <= b for a, b in zip(p.counts, q.counts)), f"{p.counts} dominated by {q.counts}"
+
+# Cached: same arguments return the same table object
+assert enumerate_patterns(lengths, bar_length, kerf) is patterns
+
+# Best pattern for a small open demand is fitted to that demand
+best = best_pattern(patterns, [1, 1, 4], lengths, kerf, bar_length)
+print(f"\nBestes Muster für Bedarf (1, 1, 4): {best.counts}, {best.used_length:.0f}mm")
+assert all(n <= open_n for n, open_n in zip(best.counts, [1, 1, 4]))
+
+# Clamped patterns are filled up with other open pieces (no table for the demand)
+best = best_pattern(patterns, [1, 0, 4], lengths, kerf, bar_length)
+assert best.counts == (1, 0, 2), best.counts
+assert best_pattern(patterns, [0, 0, 0], lengths, kerf, bar_length) is None
+
+cuts = [1500] * 7 + [1000] * 9 + [600] * 12
+_enumerate_cached.cache_clear()
+bars = CuttingOptimizer(bar_length, 'Pattern', kerf).optimize(cuts)
+CuttingOptimizer(bar_length, 'Pattern', kerf).optimize(cuts[:-3])
+info = _enumerate_cached.cache_info()
+print(f"Mustertabellen: {info.misses} erstellt, {info.hits} wiederverwendet")
+assert info.misses == 1   # one table per (lengths, bar length, kerf), whatever the demand
+print(f"\nPattern-Algorithmus: {len(bars)} Stangen")
+for pattern_cuts, group in group_bars_by_pattern(bars):
+    print(f"  {len(group)}x {list(pattern_cuts)}")
+assert sorted(c for bar in bars for c in bar.cuts) == sorted(cuts)
+print("=" * 80)
@@ -0,0 +1,68 @@
+"""
+Test profiling hooks: stage timers and solver counters.
+"""
+import io
+import threading
+
+import profiling
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer, Cut
+
+print("=" * 80)
+print("PROFILING TEST")
+print("=" * 80)
+
+cuts = [Cut(length, "ST37", "Stahl S235JR") for length in [2500] * 10 + [1200] * 8 + [700] * 5]
+
+# Without an active profiler the hooks do nothing
+CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0).optimize_by_material(cuts)
+assert profiling.active() is None
+
+with profiling.profile() as profiler:
+    results = CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0).optimize_by_material(cuts)
+    ExcelHandler.write_results_to_excel(results, io.BytesIO(), 6000)
+
+report = profiler.report()
+names = [entry['name'] for entry in report['stages']]
+print(f"Stufen: {names}")
+print(f"Zähler: {report['counters']}")
+for name in ['optimizer.group', 'optimizer.pack.BFD', 'optimizer.lower_bound', 'excel.build', 'excel.save']:
+    assert name in names, name
+assert report['counters']['cuts_placed'] == len(cuts)
+assert report['counters']['fit_checks'] >= report['counters']['bars_scanned'] > 0
+assert report['total_seconds'] >= max(entry['seconds'] for entry in report['stages']) - 1e-6
+
+# Multi keeps the counters of the chosen solution only, not of all candidates
+cuts = [2500.0, 1800.0, 1200.0, 900.0] * 13
+with profiling.profile() as profiler:
+    CuttingOptimizer(bar_length=6000, algorithm='Multi', kerf=3.0).optimize(cuts)
+print(f"Multi: cuts_placed = {profiler.counters['cuts_placed']} bei {len(cuts)} Schnitten")
+assert profiler.counters['cuts_placed'] == len(cuts)
+
+# Nested stages count once towards the total
+profiler = profiling.Profiler()
+with profiling.profile(profiler):
+    with profiling.stage('outer'):
+        with profiling.stage('inner'):
+            pass
+assert profiler.report()['total_seconds'] == profiler.report()['stages'][1]['seconds']
+
+# Profilers of concurrent threads stay separate
+reports = {}
+
+
+def job(name, count):
+    with profiling.profile() as own:
+        CuttingOptimizer(bar_length=6000, algorithm='FFD').optimize([1000.0] * count)
+    reports[name] = own.report()['counters']['cuts_placed']
+
+
+threads = [threading.Thread(target=job, args=(f"t{n}", 50 * (n + 1))) for n in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"Threads: {reports}")
+assert reports == {'t0': 50, 't1': 100, 't2': 150, 't3': 200}
+
+print("\n" + "=" * 80)
@@ -0,0 +1,67 @@
+"""
+Test the remnant inventory (Reststücklager).
+"""
+import os
+import tempfile
+import threading
+
+from optimizer import CuttingOptimizer, Cut
+from remnant_store import RemnantStore
+
+db_path = os.path.join(tempfile.mkdtemp(), "reststuecke_test.db")
+store = RemnantStore(db_path)
+store.add("ST37", 1300)
+store.add("ST37", 2600)
+store.add("ST37", 400)
+store.add("ALU", 2000)
+
+cuts = [Cut(2500, "ST37", "Stahl S235JR"), Cut(1200, "ST37", "Stahl S235JR"),
+        Cut(1800, "ST37", "Stahl S235JR"), Cut(1800, "ST37", "Stahl S235JR")]
+
+print("=" * 80)
+print("REMNANT INVENTORY TEST")
+print("=" * 80)
+print(f"Lager vorher: {store.summary()}")
+print(f"Best fit für 1000 mm ST37: {store.best_fit('ST37', 1000)}")
+
+optimizer = CuttingOptimizer(bar_length=3000, algorithm='FFD', kerf=3.0, remnant_store=store)
+results = optimizer.optimize_by_material(cuts)
+
+for bar in results['ST37']['bars']:
+    print(f"  {bar}")
+
+remnant_bars = [bar for bar in results['ST37']['bars'] if bar.remnant_id is not None]
+assert len(remnant_bars) == 2  # 2600 and 1300 are used, 400 is too short for any cut
+assert [bar.bar_number for bar in results['ST37']['bars']] == [1, 2, 3, 4]
+
+available = store.available("ST37")
+print(f"Lager nachher: {store.summary()}")
+for remnant in available:
+    print(f"  {remnant}")
+assert all(remnant.length >= 500 or remnant.length == 400 for remnant in available)
+assert store.summary()['ALU']['count'] == 1  # Untouched material
+
+# A remnant can only be claimed once
+remnant_id = store.add("INOX", 3000)
+assert store.claim([remnant_id]) is True
+assert store.claim([remnant_id]) is False
+
+# Concurrent sessions on the same inventory never plan with the same remnant
+store.add_many([("INOX", 3000)] * 5)
+used = []
+
+
+def session():
+    optimizer = CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0, remnant_store=RemnantStore(db_path))
+    results = optimizer.optimize_by_material([Cut(2900, "INOX", "Edelstahl")] * 2)
+    used.extend(bar.remnant_id for bar in results['INOX']['bars'] if bar.remnant_id is not None)
+
+
+threads = [threading.Thread(target=session) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(f"Parallele Sitzungen: Reststücke {sorted(used)}")
+assert len(used) == len(set(used))
+print("=" * 80)
@@ -0,0 +1,41 @@
+"""
+Test the saw schedule: fewer length stop changes, same packing.
+"""
+from optimizer import CuttingOptimizer, Cut, Bar
+from saw_schedule import schedule_bars, stop_changes, saw_statistics, format_duration
+
+print("=" * 80)
+print("SAW SCHEDULE TEST")
+print("=" * 80)
+
+# Three identical bars 2000/1500/1500 and two bars 1500/900/900/900
+bars = [Bar(n, list(cuts), 0.0, 6000) for n, cuts in enumerate(
+    [[2000, 1500, 1500], [1500, 900, 900, 900], [2000, 1500, 1500], [2000, 1500, 1500], [1500, 900, 900, 900]],
+    start=1)]
+before = stop_changes(bars)
+scheduled = schedule_bars(bars)
+for bar in scheduled:
+    print(f"  Stange {bar.bar_number}: {bar.cuts}")
+print(f"Anschlagwechsel: {before} -> {stop_changes(scheduled)}")
+assert [bar.bar_number for bar in scheduled] == [1, 2, 3, 4, 5]
+# Optimal: one change inside every bar per extra length plus the first setting
+assert stop_changes(scheduled) == sum(len(set(bar.cuts)) - 1 for bar in bars) + 1 == 6
+assert sorted(tuple(sorted(bar.cuts)) for bar in scheduled) == sorted(tuple(sorted(bar.cuts)) for bar in bars)
+
+# Same packing with and without schedule, fewer stop changes with it
+cuts = [Cut(length, "ST37", "Stahl") for length in [2500] * 9 + [1800] * 14 + [1200] * 11 + [640] * 25 + [333] * 17]
+plain = CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0, saw_schedule=False).optimize_by_material(cuts)
+sawed = CuttingOptimizer(bar_length=6000, algorithm='BFD', kerf=3.0).optimize_by_material(cuts)
+plain_bars, sawed_bars = plain['ST37']['bars'], sawed['ST37']['bars']
+assert sorted(sorted(bar.cuts) for bar in plain_bars) == sorted(sorted(bar.cuts) for bar in sawed_bars)
+assert [bar.waste for bar in sorted(plain_bars, key=lambda b: b.waste)] == \
+       [bar.waste for bar in sorted(sawed_bars, key=lambda b: b.waste)]
+plain_stats, sawed_stats = saw_statistics(plain_bars), saw_statistics(sawed_bars)
+print(f"BFD: {plain_stats['stop_changes']} -> {sawed_stats['stop_changes']} Anschlagwechsel, "
+      f"{format_duration(plain_stats['seconds'])} -> {format_duration(sawed_stats['seconds'])}")
+assert sawed_stats['stop_changes'] < plain_stats['stop_changes']
+
+assert format_duration(12 * 60) == "12 min"
+assert format_duration(65 * 60) == "1 h 05 min"
+
+print("\n" + "=" * 80)
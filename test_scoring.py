@@ -0,0 +1,85 @@
+"""
+Test configurable Heuristic scorers.
+"""
+import json
+import os
+import random
+import tempfile
+
+import tune_heuristic
+from optimizer import CuttingOptimizer, Cut
+from scoring import ScoreParams, resolve_scorer, register_scorer, Scorer, SCORERS
+
+print("=" * 80)
+print("HEURISTIC SCORING TEST")
+print("=" * 80)
+
+# Default scorer reproduces the built-in rule
+scorer = resolve_scorer()
+print(f"Standard: {scorer.name} {scorer.params}")
+assert scorer.params == ScoreParams()
+assert scorer.score(200, 3000) == -200 + 50
+assert scorer.score(100, 3000) == -100 - 100
+assert scorer.score(50, 12000) == -50 - 100
+
+# Zero weights resolve to plain best fit, which packs exactly like BFD
+assert resolve_scorer({'useful_bonus': 0, 'nearly_full_penalty': 0}).name == 'best_fit'
+rng = random.Random(11)
+for run in range(10):
+    cuts = [rng.randint(100, 2900) for _ in range(rng.randint(5, 80))]
+    for backend in ['python', 'numpy']:
+        heuristic = CuttingOptimizer(bar_length=3000, algorithm='Heuristic', kerf=3.0, backend=backend,
+                                     heuristic_scoring={'default': 'best_fit'})
+        bfd = CuttingOptimizer(bar_length=3000, algorithm='BFD', kerf=3.0, backend=backend)
+        assert [bar.cuts for bar in heuristic.optimize(cuts)] == [bar.cuts for bar in bfd.optimize(cuts)]
+print("best_fit = BFD ✓")
+
+try:
+    resolve_scorer('gibt_es_nicht')
+    raise AssertionError("unknown scorer accepted")
+except ValueError as error:
+    print(f"Unbekannte Bewertung abgelehnt: {error}")
+
+
+# Custom scorer plugin: always the first fitting bar (like FFD)
+@register_scorer('first_fit')
+def first_fit_scorer(params: ScoreParams) -> Scorer:
+    return Scorer('first_fit', params, lambda remaining, length: 0.0, lambda remaining, length: 0.0 * remaining)
+
+
+try:
+    # Scoring per material: aluminium with its own parameters, steel with the plugin
+    optimizer = CuttingOptimizer(bar_length=3000, algorithm='Heuristic', heuristic_scoring={
+        'default': {'useful_remnant': 100, 'useful_bonus': 50},
+        'ALU': {'useful_remnant': 20, 'useful_bonus': 10, 'nearly_full_ratio': 0.01},
+        'ST37': 'first_fit',
+    })
+    assert optimizer.scorer_for('ALU').params.useful_remnant == 20
+    assert optimizer.scorer_for('ST37').name == 'first_fit'
+    assert optimizer.scorer_for('ST52').name == 'standard'
+
+    cuts = [Cut(length, 'ST37', 'Stahl') for length in [1800, 1200, 1000, 900]]
+    cuts += [Cut(length, 'ALU', 'Aluminium') for length in [700, 650, 500, 450]]
+    results = optimizer.optimize_by_material(cuts)
+    ffd = CuttingOptimizer(bar_length=3000, algorithm='FFD').optimize([1800, 1200, 1000, 900])
+    assert [bar.cuts for bar in results['ST37']['bars']] == [bar.cuts for bar in ffd]
+    for code, data in results.items():
+        print(f"{code}: {[bar.cuts for bar in data['bars']]}")
+finally:
+    del SCORERS['first_fit']
+
+# Tuner: JSON jobs in the request format of service.py (5-field cuts with order)
+with tempfile.TemporaryDirectory() as temp_dir:
+    job_path = os.path.join(temp_dir, 'auftrag.json')
+    with open(job_path, 'w', encoding='utf-8') as handle:
+        json.dump({'bar_length': 3000, 'kerf': 3.0, 'multiplier': 2, 'cuts': [
+            {'length': 1200, 'quantity': 2, 'material': 'ST37', 'order': 'A-1'},
+            {'length': 800, 'material': 'ALU', 'name': 'Aluminium'}]}, handle)
+    job = tune_heuristic.load_job(job_path, 6000, 0.0)
+    assert job == (3000.0, 3.0, {'ST37': [1200.0] * 4, 'ALU': [800.0] * 2})
+    tune_heuristic._init_worker([job])
+    totals = tune_heuristic.evaluate(ScoreParams())
+    assert totals['ST37'][0] == 2 and totals['ALU'][0] == 1
+    print(f"Tuner (JSON-Auftrag): {totals}")
+
+print("\n" + "=" * 80)
@@ -0,0 +1,92 @@
+"""
+Test the result serialization: round trips, versions, zero-copy columns, size.
+"""
+import json
+import pickle
+import random
+
+import serialization
+from optimizer import CuttingOptimizer, Cut, Bar
+from serialization import to_json, from_json, to_binary, from_binary, binary_columns
+
+print("=" * 80)
+print("SERIALIZATION TEST")
+print("=" * 80)
+
+
+def plan(results):
+    """Everything a result holds, for comparisons."""
+    return {code: (data['name'], data.get('lower_bound'),
+                   [(bar.bar_number, bar.bar_length, bar.total_used, bar.remnant_id, bar.cuts, bar.orders)
+                    for bar in data['bars']])
+            for code, data in results.items()}
+
+
+rng = random.Random(5)
+cuts = [Cut(rng.choice([2350, 1720, 1280.5, 860, 415.25]), rng.choice(["ST37", "AL", "VA 1.4301"]),
+            "Profil äöü", rng.choice([None, "A-1", "A-2", "Ä-3"])) for _ in range(800)]
+optimizer = CuttingOptimizer(bar_length=6000, kerf=3.0, stock_lengths={'AL': [(6000, 30.0), (6500, 32.0)]})
+cases = {
+    'orders': optimizer.optimize_by_material(cuts),
+    'plain': CuttingOptimizer(bar_length=6000, algorithm='Pattern', kerf=3.0).optimize_by_material(
+        [Cut(cut.length, cut.material_code, cut.material_name) for cut in cuts]),
+    'remnants': {'ST37': {'name': 'Stahl', 'lower_bound': None,
+                          'bars': [Bar(1, [2000.0, 1500.0], 3503.0, 4200.0, 17), Bar(2, [900.0], 900.0, 6000.0)]}},
+    'split': optimizer.split_by_order(optimizer.optimize_by_material(cuts))['A-1'],
+    'empty': {},
+}
+
+# Round trips through both forms
+for name, results in cases.items():
+    assert plan(from_json(to_json(results))) == plan(results), name
+    assert plan(from_binary(to_binary(results))) == plan(results), name
+    assert plan(from_binary(bytearray(to_binary(results)))) == plan(results), name
+print(f"Rundreisen: {', '.join(cases)} ✓")
+
+# Identical bars share one pattern
+results = cases['plain']
+data = serialization.to_columnar(results)
+bars = sum(len(d['bars']) for d in results.values())
+patterns = sum(len(m['columns']['pattern_offsets']) - 1 for m in data['materials'])
+print(f"{bars} Stangen, {patterns} Muster")
+assert patterns < bars
+
+# Columns are mapped without copying
+buffer = bytearray(to_binary(cases['orders']))
+columns = binary_columns(buffer)['materials'][0]['columns']
+first = next(iter(cases['orders'].values()))['bars']
+assert list(columns['bar_number']) == [bar.bar_number for bar in first]
+last = binary_columns(buffer)['materials'][-1]['columns']['cut_order']
+buffer[-8:] = (7).to_bytes(4, 'little') * 2  # the mapped column sees changes of the buffer
+assert last[-1] == 7
+
+# Unknown versions and foreign data are rejected
+for bad in [b'PK\x03\x04' + b'\0' * 20, b'', to_binary({})[:4] + b'\x09\x00' + to_binary({})[6:]]:
+    try:
+        from_binary(bad)
+        raise AssertionError("accepted")
+    except ValueError as e:
+        print(f"  abgelehnt: {e}")
+try:
+    from_json(json.dumps({**json.loads(to_json({})), 'version': 99}))
+    raise AssertionError("accepted")
+except ValueError:
+    pass
+
+# The service answers in the columnar form on request
+from service import parse_job, solve_job
+job = parse_job({'bar_length': 6000, 'kerf': 3.0, 'result_format': 'columnar',
+                 'cuts': [{'length': 1997, 'quantity': 9, 'material': 'ST37', 'order': 'A-1'}]})
+response = json.loads(json.dumps(solve_job(job)))
+assert 'materials' not in response
+assert plan(serialization.from_columnar(response['result']))['ST37'][2] == [
+    (n, 6000.0, 5997.0, None, [1997.0] * 3, ['A-1'] * 3) for n in (1, 2, 3)]
+
+# Smaller than pickle
+big = [Cut(rng.choice([2350, 1720, 1280, 860, 640, 415.5]), f"M{rng.randrange(5)}", "Profil") for _ in range(20000)]
+results = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_by_material(big)
+sizes = {'pickle': len(pickle.dumps(results)), 'json': len(to_json(results)), 'binary': len(to_binary(results))}
+print(f"Größen: {sizes}")
+assert sizes['binary'] < sizes['pickle'] / 4 and sizes['json'] < sizes['pickle'] / 4
+
+print("\n" + "=" * 80)
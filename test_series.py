@@ -0,0 +1,69 @@
+"""
+Test run-aware placement for series jobs with many equal lengths.
+"""
+import random
+import time
+
+import fitscan
+from optimizer import CuttingOptimizer, Bar
+
+
+def place_one_by_one(cuts, bar_length, kerf):
+    """Plain per-piece Best Fit Decreasing as reference."""
+    bars = []
+    for cut in sorted(cuts, reverse=True):
+        best, best_remaining = None, float('inf')
+        for bar in bars:
+            used = sum(bar) + len(bar) * kerf
+            if used + cut <= bar_length and bar_length - used - cut < best_remaining:
+                best, best_remaining = bar, bar_length - used - cut
+        if best is None:
+            bars.append([cut])
+        else:
+            best.append(cut)
+    return bars
+
+
+print("=" * 80)
+print("SERIES JOB TEST")
+print("=" * 80)
+
+# 400 x 2500 mm and 300 x 900 mm on 6000 mm bars with 3 mm kerf:
+# two 2500 per bar (5003 mm), the 997 mm rest takes one 900
+cuts = [2500] * 400 + [900] * 300
+for algorithm in ['FFD', 'BFD', 'Heuristic']:
+    optimizer = CuttingOptimizer(bar_length=6000, algorithm=algorithm, kerf=3.0)
+    start = time.perf_counter()
+    bars = optimizer.optimize(cuts)
+    elapsed = time.perf_counter() - start
+    print(f"{algorithm:10s} {len(bars)} Stangen in {elapsed * 1000:.1f} ms")
+    assert sorted(c for bar in bars for c in bar.cuts) == sorted(cuts)
+    assert all(bar.total_used <= bar.bar_length for bar in bars)
+    assert bars[0].cuts == [2500, 2500, 900]
+
+print("\nVergleich mit stückweiser Platzierung (BFD):")
+rng = random.Random(7)
+for run in range(20):
+    lengths = [rng.randint(300, 2900) for _ in range(rng.randint(1, 6))]
+    cuts = [rng.choice(lengths) for _ in range(rng.randint(10, 200))]
+    kerf = rng.choice([0.0, 3.0])
+    bars = CuttingOptimizer(bar_length=3000, algorithm='BFD', kerf=kerf).optimize(cuts)
+    reference = place_one_by_one(cuts, 3000, kerf)
+    assert [bar.cuts for bar in bars] == reference, (cuts, kerf)
+print("  20 zufällige Serien identisch ✓")
+
+if fitscan.available():
+    print("\nNumPy-Backend vs. Python-Backend:")
+    for run in range(20):
+        cuts = [round(rng.uniform(50, 2990), 1) for _ in range(rng.randint(10, 300))]
+        kerf = rng.choice([0.0, 3.0])
+        for algorithm in ['BFD', 'Heuristic']:
+            results = []
+            for backend in ['python', 'numpy']:
+                stock = [Bar(bar_number=1, cuts=[], total_used=0.0, bar_length=1200, remnant_id=1)]
+                optimizer = CuttingOptimizer(bar_length=3000, algorithm=algorithm, kerf=kerf, backend=backend)
+                results.append([(bar.bar_length, bar.cuts) for bar in optimizer.optimize(cuts, stock)])
+            assert results[0] == results[1], (algorithm, cuts, kerf)
+    print("  20 zufällige Listen identisch ✓")
+
+print("\n" + "=" * 80)
@@ -0,0 +1,117 @@
+"""
+Test the local HTTP/JSON optimization service with a local client.
+"""
+import asyncio
+import http.client
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import service as service_module
+from service import OptimizationService
+
+payload = {
+    'bar_length': 6000,
+    'kerf': 3.0,
+    'algorithm': 'BFD',
+    'cuts': [
+        {'length': 2500, 'quantity': 3, 'material': 'ST37', 'name': 'Stahl S235JR'},
+        {'length': 1800, 'quantity': 5, 'material': 'ST37', 'name': 'Stahl S235JR'},
+        {'length': 1500, 'quantity': 4, 'material': 'ALU', 'name': 'Aluminium 6060'},
+    ]
+}
+
+
+def request(port, method, path, body=None):
+    """Send one request with http.client and return (status, json)."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    conn.request(method, path, body=data, headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    result = response.status, json.loads(response.read())
+    conn.close()
+    return result
+
+
+async def run():
+    service = OptimizationService(workers=2, batch_window=0.05)
+    await service.start('127.0.0.1', 0)
+    port = service.port
+    loop = asyncio.get_running_loop()
+
+    try:
+        # Four identical requests at once are coalesced into one solve
+        responses = await asyncio.gather(*[
+            loop.run_in_executor(None, request, port, 'POST', '/optimize', payload)
+            for _ in range(4)
+        ])
+        for status, body in responses:
+            assert status == 200, body
+        body = responses[0][1]
+        print(f"Materialien: {sorted(body['materials'])}")
+        print(f"Stangen gesamt: {body['statistics']['total_bars']}")
+        for code, data in body['materials'].items():
+            for bar in data['bars']:
+                print(f"  {code} Stange {bar['bar_number']}: {bar['cuts']} Rest {bar['waste']:.0f}mm")
+
+        # Same request again is answered from the cache
+        status, _ = await loop.run_in_executor(None, request, port, 'POST', '/optimize', payload)
+        assert status == 200
+
+        # Invalid payload is rejected
+        status, error = await loop.run_in_executor(None, request, port, 'POST', '/optimize', {'cuts': []})
+        print(f"Ungültige Anfrage: {status} {error['error']}")
+        assert status == 400
+
+        # Too many pieces for a few bytes of JSON
+        huge = {**payload, 'cuts': [{'length': 1000, 'quantity': 10 ** 9, 'material': 'ST37'}]}
+        status, error = await loop.run_in_executor(None, request, port, 'POST', '/optimize', huge)
+        print(f"Zu viele Teile: {status} {error['error']}")
+        assert status == 400
+
+        # Non-finite numbers and fractional quantities are bad input, not solver failures
+        for bad in ({**payload, 'cuts': [{'length': 'inf', 'material': 'ST37'}]},
+                    {**payload, 'cuts': [{'length': float('nan'), 'material': 'ST37'}]},
+                    {**payload, 'bar_length': float('inf')},
+                    {**payload, 'cuts': [{'length': 1000, 'quantity': 2.7, 'material': 'ST37'}]},
+                    {**payload, 'multiplier': 1.5}):
+            status, error = await loop.run_in_executor(None, request, port, 'POST', '/optimize', bad)
+            assert status == 400, (bad, status, error)
+        print(f"Nicht endlich/gebrochen: {status} {error['error']}")
+
+        status, health = await loop.run_in_executor(None, request, port, 'GET', '/health')
+        print(f"Health: {health}")
+        assert health['solved'] == 1
+        assert health['cache_hits'] + health['coalesced'] == 4
+    finally:
+        await service.close()
+
+
+async def run_failing_solver():
+    """A valid job whose solve fails is a server error (500), not bad input (400)."""
+    def fail(job):
+        raise RuntimeError("solver crashed")
+
+    solve_job = service_module.solve_job
+    service_module.solve_job = fail
+    executor = ThreadPoolExecutor(max_workers=1)
+    service = OptimizationService(executor=executor, batch_window=0.0)
+    await service.start('127.0.0.1', 0)
+    try:
+        loop = asyncio.get_running_loop()
+        status, error = await loop.run_in_executor(None, request, service.port, 'POST', '/optimize', payload)
+        print(f"Solver-Fehler: {status} {error['error']}")
+        assert status == 500
+        status, _ = await loop.run_in_executor(None, request, service.port, 'POST', '/optimize', {'cuts': []})
+        assert status == 400
+    finally:
+        service_module.solve_job = solve_job
+        await service.close()
+        executor.shutdown()
+
+
+print("=" * 60)
+print("SERVICE TEST")
+print("=" * 60)
+asyncio.run(run())
+asyncio.run(run_failing_solver())
+print("=" * 60)
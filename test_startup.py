@@ -0,0 +1,27 @@
+"""
+Test lazy imports: the core modules load no heavy libraries at import time.
+"""
+import io
+import subprocess
+import sys
+
+HEAVY = ['numpy', 'pandas', 'openpyxl', 'plotly', 'reportlab']
+
+print("=" * 80)
+print("STARTUP TEST")
+print("=" * 80)
+
+for module in ['optimizer', 'excel_handler', 'service', 'cli']:
+    script = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout.strip()
+    print(f"{module:15s} lädt: {loaded or '-'}")
+    assert not loaded, f"{module} imports {loaded}"
+
+# Excel reading still works and loads pandas on first use
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer, Cut
+results = CuttingOptimizer(bar_length=6000).optimize_by_material([Cut(2500, "ST37", "Stahl")] * 4)
+ExcelHandler.write_results_to_excel(results, io.BytesIO(), 6000)
+assert 'openpyxl' in sys.modules
+
+print("\n" + "=" * 80)
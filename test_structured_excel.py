@@ -0,0 +1,105 @@
+"""
+Test the structured Excel export: numeric cells, pattern counts, flat cuts, streaming.
+"""
+import io
+import os
+import random
+import tempfile
+import time
+
+from openpyxl import load_workbook
+
+import excel_handler
+import table_io
+from excel_handler import MATERIAL_HEADERS, PATTERN_HEADERS, ExcelHandler
+from optimizer import Bar, Cut, CuttingOptimizer
+
+print("=" * 80)
+print("STRUCTURED EXCEL TEST")
+print("=" * 80)
+
+
+def read_sheets(data: bytes) -> dict:
+    workbook = load_workbook(io.BytesIO(data))
+    return {ws.title: (ws, [list(row) for row in ws.iter_rows(values_only=True)]) for ws in workbook.worksheets}
+
+
+results = {
+    'ST37': {'name': 'Stahl', 'lower_bound': 3, 'bars': [
+        Bar(1, [2500.0, 1800.0, 1200.0], 5509.0, 6000, orders=['A-1', 'A-1', 'B-2']),
+        Bar(2, [1800.0, 2500.0, 1200.0], 5509.0, 6000, orders=['B-2', 'A-1', 'A-1']),
+        Bar(3, [900.5], 903.5, 1200, remnant_id=7, orders=['A-1']),
+        Bar(4, [2500.0, 2500.0], 5006.0, 6000, orders=['B-2', 'B-2']),
+    ]},
+    'AL': {'name': 'Alu', 'lower_bound': 1, 'bars': [Bar(1, [3000.0], 3003.0, 6000)]},
+    'LEER': {'name': 'Leer', 'lower_bound': 0, 'bars': []},
+}
+buffer = io.BytesIO()
+ExcelHandler.write_structured_results(results, buffer)
+sheets = read_sheets(buffer.getvalue())
+assert list(sheets) == ['Materialien', 'Muster', 'Schnitte']
+
+# One row per material, numbers as numbers
+ws, rows = sheets['Materialien']
+assert rows[0] == MATERIAL_HEADERS and ws.freeze_panes == 'A2' and ws.auto_filter.ref == 'A1:M3'
+steel = dict(zip(MATERIAL_HEADERS, rows[1]))
+assert steel['Stangen'] == 4 and steel['Reststücke'] == 1 and steel['Muster'] == 3 and steel['Schnitte'] == 9
+assert steel['Stangenlänge gesamt'] == 19200 and steel['Genutzt'] == 16927.5 and steel['Verschnitt'] == 2272.5
+assert steel['Untere Schranke'] == 3 and isinstance(steel['Effizienz %'], float)
+assert [row[0] for row in rows[1:]] == ['ST37', 'AL']   # materials without bars are left out
+print(f"Materialien: {steel['Effizienz %']} % Effizienz, {steel['Sägezeit s']} s Sägezeit")
+
+# One row per pattern; bars with the same cuts in another order share one
+ws, rows = sheets['Muster']
+assert rows[0] == PATTERN_HEADERS + ['Länge 1', 'Länge 2', 'Länge 3']
+patterns = [dict(zip(rows[0], row)) for row in rows[1:]]
+assert [(p['Material'], p['Muster'], p['Anzahl'], p['Reststücke'], p['Stangenlänge']) for p in patterns] == [
+    ('ST37', 1, 2, 0, 6000), ('ST37', 2, 1, 1, 1200), ('ST37', 3, 1, 0, 6000), ('AL', 1, 1, 0, 6000)]
+assert [patterns[0][f'Länge {i}'] for i in (1, 2, 3)] == [2500, 1800, 1200]
+assert patterns[1]['Länge 2'] is None and patterns[1]['Rest'] == 296.5
+assert sum(p['Anzahl'] for p in patterns) == sum(len(data['bars']) for data in results.values())
+
+# One row per cut, as table_io.result_rows
+ws, rows = sheets['Schnitte']
+assert rows[0] == table_io.RESULT_HEADERS
+assert [tuple(row) for row in rows[1:]] == list(table_io.result_rows(results))
+assert rows[7] == ['ST37', 'Stahl', 3, 1200, 7, 1, 900.5, 'A-1']
+
+# More cuts than a sheet holds continue on further sheets
+excel_handler.EXCEL_MAX_ROWS, limit = 5, excel_handler.EXCEL_MAX_ROWS
+try:
+    buffer = io.BytesIO()
+    ExcelHandler.write_structured_results(results, buffer)
+finally:
+    excel_handler.EXCEL_MAX_ROWS = limit
+split = read_sheets(buffer.getvalue())
+assert list(split)[2:] == ['Schnitte', 'Schnitte 2', 'Schnitte 3']
+assert [row for name in list(split)[2:] for row in split[name][1][1:]] == sheets['Schnitte'][1][1:]
+print(f"Aufteilung: {[len(split[name][1]) - 1 for name in list(split)[2:]]} Schnitte pro Blatt")
+
+# Empty result: header rows only
+buffer = io.BytesIO()
+ExcelHandler.write_structured_results({}, buffer)
+assert [len(rows) for _, rows in read_sheets(buffer.getvalue()).values()] == [1, 1, 1]
+
+# Larger result: structured vs. formatted export
+rng = random.Random(50)
+lengths = [float(rng.randrange(300, 3000, 5)) for _ in range(40)]
+cuts = [Cut(rng.choice(lengths), f"M{rng.randrange(5)}", "Profil") for _ in range(20000)]
+results = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_by_material(cuts)
+temp_dir = tempfile.mkdtemp()
+timings = {}
+for name, write in (('formatiert', lambda path: ExcelHandler.write_results_to_excel(results, path, 6000)),
+                    ('strukturiert', lambda path: ExcelHandler.write_structured_results(results, path))):
+    path = os.path.join(temp_dir, f'{name}.xlsx')
+    start = time.perf_counter()
+    write(path)
+    timings[name] = (time.perf_counter() - start, os.path.getsize(path))
+    print(f"{name:12s} {timings[name][0] * 1000:8.0f} ms {timings[name][1] / 1024:8.0f} KB")
+workbook = load_workbook(path, read_only=True)
+assert sum(1 for _ in workbook['Schnitte'].iter_rows(min_row=2)) == 20000
+assert sum(row[3] for row in workbook['Muster'].iter_rows(min_row=2, values_only=True)) == \
+    sum(len(data['bars']) for data in results.values())
+workbook.close()
+
+print("\n" + "=" * 80)
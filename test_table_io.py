@@ -0,0 +1,103 @@
+"""
+Test CSV and Parquet input/output: same demand as Excel, streaming, optimizer input.
+"""
+import csv
+import io
+import os
+import random
+import tempfile
+import time
+
+import table_io
+from excel_handler import ExcelHandler
+from optimizer import CuttingOptimizer, DemandLine
+from validation import ValidationReport, validate_table
+
+print("=" * 80)
+print("CSV/PARQUET TEST")
+print("=" * 80)
+
+temp_dir = tempfile.mkdtemp()
+excel_path = os.path.join(temp_dir, 'stueckliste.xlsx')
+ExcelHandler.create_example_input(excel_path)
+excel_demand = table_io.read_demand(excel_path)
+assert excel_demand == ExcelHandler.read_demand_from_excel(excel_path)
+
+# CSV round trip, comma and semicolon (decimal comma) files
+for delimiter in (',', ';', '\t'):
+    path = os.path.join(temp_dir, 'stueckliste.csv')
+    table_io.write_demand_csv(excel_demand, path, delimiter=delimiter)
+    assert table_io.read_demand(path) == excel_demand, delimiter
+    assert [(c.length, c.material_code) for c in table_io.read_cuts(path)] == \
+           [(c.length, c.material_code) for c in ExcelHandler.read_cuts_from_excel(excel_path)]
+print(f"CSV: {len(excel_demand)} Bedarfszeilen wie aus Excel ✓")
+
+# ERP export: BOM, decimal comma, invalid rows dropped, lines summed, file objects
+erp = ("﻿Länge;Anzahl;Material;Bezeichnung\n"
+       "1250,5;2;ST37;Stahl\n"
+       "abc;1;ST37;Stahl\n"
+       "800;0;ST37;Stahl\n"
+       "900;1;;Leer\n"
+       "1250,5;3;ST37;Stahl\n"
+       "600;1;\"AL;X\";Alu\n"
+       "kurz\n").encode('utf-8')
+source = io.BytesIO(erp)
+assert table_io.read_demand(source, 'csv') == [DemandLine(1250.5, 5, 'ST37', 'Stahl'),
+                                               DemandLine(600.0, 1, 'AL;X', 'Alu')]
+assert not source.closed
+
+# Chunk size does not change the result
+rng = random.Random(3)
+demand = [DemandLine(float(rng.randrange(200, 5900)), rng.randrange(1, 5), f"M{rng.randrange(20)}", "Profil")
+          for _ in range(20000)]
+path = os.path.join(temp_dir, 'gross.csv')
+table_io.write_demand_csv(demand, path)
+chunks = list(table_io.iter_csv_chunks(path, chunk_rows=3000))
+assert [len(chunk) for chunk in chunks] == [3000] * 6 + [2000]
+assert table_io._aggregate(chunks) == table_io.read_demand(path)
+
+# Worksheet rows in chunks: same rows and issues as validate_table on the whole sheet
+sheet = [("Projekt 4711", None, None), ("Länge [cm]", "Anzahl", "Material")]
+sheet += [(rng.randrange(20, 590), rng.randrange(0, 4), f"M{rng.randrange(5)}") for _ in range(1000)]
+report = ValidationReport()
+rows = [row for chunk in table_io.iter_row_chunks(iter(sheet), chunk_rows=64, report=report) for row in chunk]
+frame, expected = validate_table(sheet)
+assert rows == list(frame.itertuples(index=False, name=None))
+assert report.issues == expected.issues and report.issues and report.mapping == expected.mapping
+
+# Feeds the optimizer directly; results as one row per cut
+start = time.perf_counter()
+csv_demand = table_io.read_demand(path)
+print(f"CSV {len(demand)} Zeilen gelesen: {(time.perf_counter() - start) * 1000:.0f} ms")
+results = CuttingOptimizer(bar_length=6000, kerf=3.0).optimize_demand(csv_demand)
+output = io.StringIO()
+table_io.write_results_csv(results, output)
+rows = list(csv.reader(io.StringIO(output.getvalue())))
+assert rows[0] == table_io.RESULT_HEADERS
+assert len(rows) - 1 == sum(line.quantity for line in demand)
+assert rows[1][2] == '1' and rows[1][5] == '1'
+
+# Unknown extensions are rejected
+try:
+    table_io.read_demand('stueckliste.txt')
+    raise AssertionError("accepted")
+except ValueError as e:
+    print(f"  abgelehnt: {e}")
+
+# Parquet with pyarrow, otherwise a clear error
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    try:
+        table_io.read_demand(os.path.join(temp_dir, 'stueckliste.parquet'))
+        raise AssertionError("read without pyarrow")
+    except ImportError as e:
+        print(f"Parquet: {e}")
+else:
+    parquet_path = os.path.join(temp_dir, 'stueckliste.parquet')
+    table_io.write_demand_parquet(demand, parquet_path)
+    assert table_io.read_demand(parquet_path) == csv_demand
+    table_io.write_results_parquet(results, os.path.join(temp_dir, 'zuschnitt.parquet'))
+    print("Parquet: Rundreise ✓")
+
+print("\n" + "=" * 80)
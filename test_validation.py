@@ -0,0 +1,113 @@
+"""
+Test header detection, unit conversion and the vectorized row validation report.
+"""
+import io
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+import ingest
+import table_io
+from excel_handler import ExcelHandler
+from optimizer import DemandLine
+from validation import ValidationReport, detect_columns, normalize_header, validate_table
+
+print("=" * 80)
+print("VALIDATION TEST")
+print("=" * 80)
+
+# Header names: case, umlauts, spaces and units
+assert normalize_header("Länge [cm]") == ('laenge', 'cm')
+assert normalize_header(" LÄNGE in m ") == ('laenge', 'm')
+assert normalize_header("Länge (mm)") == ('laenge', 'mm')
+assert normalize_header("Stück-Zahl") == ('stueckzahl', None)
+assert normalize_header(None) == ('', None)
+
+# Title rows, reordered columns and aliases
+rows = [
+    ["Projekt 4711", None, None, None],
+    [None, None, None, None],
+    ["Bezeichnung", "Werkstoff", "Menge", "Länge [cm]"],
+    ["Stahl", "ST37", 2, 250],
+    ["Stahl", "ST37", "3", "125,5"],
+    ["Alu", "AL", 1, "abc"],
+    [None, None, None, None],
+    ["Alu", None, 1, 100],
+    ["Alu", "AL", 2.5, 80],
+    ["Alu", "AL", 0, 80],
+    ["", "AL", 1, -5],
+]
+mapping = detect_columns(rows)
+assert mapping.detected and mapping.header_row == 2 and mapping.unit == 'cm'
+assert mapping.columns == {'name': 0, 'material': 1, 'quantity': 2, 'length': 3}
+frame, report = validate_table(rows)
+assert list(frame.itertuples(index=False, name=None)) == [
+    (2500.0, 2, 'ST37', 'Stahl'), (1255.0, 3, 'ST37', 'Stahl'), (800.0, 2, 'AL', 'Alu')]
+assert (report.rows, report.valid, report.rejected) == (7, 3, 4)
+assert [(issue.row, issue.column, issue.value, issue.error) for issue in report.issues] == [
+    (6, 'length', 'abc', True), (8, 'material', '', True), (9, 'quantity', '2.5', False),
+    (10, 'quantity', '0', True), (11, 'length', '-5', True)]
+assert report.units == {'cm': 3}
+print(f"Titelzeilen/Aliase: {report.summary()}")
+for issue in report.issues:
+    print(f"  Zeile {issue.row}: {issue.message} ({issue.column} = {issue.value!r})")
+
+# Unit column; rows without unit use the header unit, unknown units are rejected
+frame, report = validate_table([
+    ["Länge", "Einheit", "Anzahl", "Material"],
+    [2.5, "m", 1, "ST37"],
+    [300, "CM", 1, "ST37"],
+    [1200, None, 1, "ST37"],
+    [5, "zoll", 1, "ST37"],
+])
+assert list(frame['length']) == [2500.0, 3000.0, 1200.0]
+assert list(frame['material_name']) == ['ST37'] * 3   # no name column: material code
+assert report.units == {'m': 1, 'cm': 1, 'mm': 1}
+assert [(issue.row, issue.message) for issue in report.issues] == [(5, "Unbekannte Einheit")]
+assert "umgerechnet aus m (1), cm (1)" in report.summary()
+
+# No header found: EXCEL_COLUMNS positions, with or without a header row
+frame, report = validate_table([["A", "B", "C", "D"], [1000, 2, "ST37", "Stahl"]])
+assert not report.mapping.detected and report.mapping.header_row == 0 and len(frame) == 1
+frame, report = validate_table([[1000, 2, "ST37", "Stahl"], [500, 1, 4711.0, "Nummer"]])
+assert report.mapping.header_row is None
+assert list(frame['material_code']) == ['ST37', '4711'] and report.issues == []
+frame, report = validate_table([])
+assert frame.empty and report.rows == 0
+
+# Excel, CSV and ingest report the same rows with their sheet/file row numbers
+temp_dir = tempfile.mkdtemp()
+excel_path = os.path.join(temp_dir, 'stueckliste.xlsx')
+pd.DataFrame(rows).to_excel(excel_path, sheet_name='Stueckliste', index=False, header=False)
+excel_report = ValidationReport()
+demand = ExcelHandler.read_demand_from_excel(excel_path, excel_report)
+assert demand == [DemandLine(2500.0, 2, 'ST37', 'Stahl'), DemandLine(1255.0, 3, 'ST37', 'Stahl'),
+                  DemandLine(800.0, 2, 'AL', 'Alu')]
+csv_report = ValidationReport()
+csv_text = "\n".join(";".join("" if value is None else str(value) for value in row) for row in rows)
+assert table_io.read_demand(io.BytesIO(csv_text.encode()), 'csv', csv_report) == demand
+sheets = ingest.ingest([excel_path])[1]
+expected = validate_table(rows)[1].issues
+assert expected and excel_report.issues == csv_report.issues == sheets[0].report.issues == expected
+print(f"Excel/CSV/ingest: {excel_report.summary()}")
+
+# Speed: 100,000 rows with a few bad ones
+rng = random.Random(49)
+big = [["Länge (mm)", "Anzahl", "Material", "Materialname"]]
+for index in range(100000):
+    length = rng.choice([str(rng.randrange(200, 5900)), f"{rng.randrange(200, 5900)},5"])
+    big.append([length if index % 1000 else "?", rng.randrange(1, 5), f"M{rng.randrange(20)}", "Profil"])
+table = pd.DataFrame(big)
+start = time.perf_counter()
+frame, report = validate_table(table)
+elapsed = time.perf_counter() - start
+assert report.valid == 99900 and len(report.issues) == 100
+assert report.issues[0].row == 2 and report.issues[1].row == 1002
+per_thousand = report.seconds * 1000 / 100
+print(f"100.000 Zeilen geprüft: {elapsed * 1000:.0f} ms gesamt, {per_thousand:.2f} ms pro 1000 Zeilen")
+assert per_thousand < 5, per_thousand
+
+print("\n" + "=" * 80)
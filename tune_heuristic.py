@@ -0,0 +1,172 @@
+"""
+Offline tuner for the Heuristic scorer weights.
+
+Grid-searches ScoreParams on historical jobs and reports the parameter set
+with the fewest bars (then least waste), overall or per material. The grid
+points are evaluated in parallel worker processes. The result is printed as
+a HEURISTIC_SCORING entry for config.py and can be written to a JSON file.
+
+Jobs are Excel cut lists (.xlsx, sheet "Stueckliste") or JSON files in the
+request format of service.py.
+
+Usage:
+    python tune_heuristic.py auftraege/*.xlsx --bar-length 6000 --kerf 3
+    python tune_heuristic.py jobs/*.json --per-material --output scoring.json
+"""
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Tuple
+
+from config import DEFAULT_BAR_LENGTH, DEFAULT_KERF
+from optimizer import CuttingOptimizer
+from scoring import ScoreParams
+
+# Default search grid
+GRID = {
+    'useful_remnant': [50, 100, 200, 500],
+    'useful_bonus': [0, 25, 50, 100],
+    'nearly_full_ratio': [0.01, 0.02, 0.05, 0.1],
+    'nearly_full_penalty': [0, 50, 100, 200],
+}
+
+# Job = (bar_length, kerf, {material_code: cut lengths})
+Job = Tuple[float, float, Dict[str, List[float]]]
+
+_jobs: List[Job] = []
+
+
+def load_job(path: str, bar_length: float, kerf: float) -> Job:
+    """
+    Load one historical job.
+
+    Args:
+        path: Excel cut list or JSON job file
+        bar_length: Bar length for Excel files (JSON jobs carry their own)
+        kerf: Kerf for Excel files (JSON jobs carry their own)
+
+    Returns:
+        Job tuple with the cut lengths grouped by material
+    """
+    groups: Dict[str, List[float]] = {}
+    if path.lower().endswith('.json'):
+        from service import parse_job
+        with open(path, encoding='utf-8') as handle:
+            job = parse_job(json.load(handle))
+        for length, quantity, material_code, *_ in job['cuts']:
+            groups.setdefault(material_code, []).extend([length] * quantity * job['multiplier'])
+        return job['bar_length'], job['kerf'], groups
+
+    from excel_handler import ExcelHandler
+    for cut in ExcelHandler.read_cuts_from_excel(path):
+        groups.setdefault(cut.material_code, []).append(cut.length)
+    return bar_length, kerf, groups
+
+
+def _init_worker(jobs: List[Job]):
+    global _jobs
+    _jobs = jobs
+
+
+def evaluate(params: ScoreParams) -> Dict[str, Tuple[int, float]]:
+    """
+    Solve all jobs with one parameter set.
+
+    Returns:
+        (bars, waste) per material code, summed over all jobs
+    """
+    totals: Dict[str, Tuple[int, float]] = {}
+    for bar_length, kerf, groups in _jobs:
+        optimizer = CuttingOptimizer(bar_length=bar_length, algorithm='Heuristic', kerf=kerf,
+                                     heuristic_scoring={'default': params})
+        for material_code, cut_lengths in groups.items():
+            bars = optimizer.optimize(cut_lengths, material_code=material_code)
+            count, waste = totals.get(material_code, (0, 0.0))
+            totals[material_code] = (count + len(bars), waste + sum(bar.waste for bar in bars))
+    return totals
+
+
+def grid(values: Dict[str, List[float]]) -> List[ScoreParams]:
+    """All parameter combinations of a grid."""
+    names = list(values)
+    return [ScoreParams(**dict(zip(names, combination)))
+            for combination in itertools.product(*(values[name] for name in names))]
+
+
+def tune(jobs: List[Job], candidates: List[ScoreParams], per_material: bool = False,
+         workers: int = None) -> Dict[str, Tuple[ScoreParams, Tuple[int, float]]]:
+    """
+    Evaluate all candidates in parallel and pick the best one.
+
+    Args:
+        jobs: Historical jobs
+        candidates: Parameter sets to try
+        per_material: Pick the best parameter set per material instead of overall
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Dictionary mapping 'default' (or each material code) to (params, (bars, waste))
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(jobs,)) as executor:
+        results = list(executor.map(evaluate, candidates, chunksize=max(1, len(candidates) // 64)))
+
+    keys = sorted({code for totals in results for code in totals}) if per_material else ['default']
+    best = {}
+    for key in keys:
+        for params, totals in zip(candidates, results):
+            if key == 'default':
+                score = (sum(c for c, _ in totals.values()), sum(w for _, w in totals.values()))
+            else:
+                score = totals[key]
+            # Ties keep the earlier grid point
+            if key not in best or score < best[key][1]:
+                best[key] = (params, score)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gewichte der Heuristik auf historischen Aufträgen optimieren")
+    parser.add_argument('files', nargs='+', help="Excel-Stücklisten oder JSON-Aufträge")
+    parser.add_argument('--bar-length', type=float, default=DEFAULT_BAR_LENGTH,
+                        help="Stangenlänge für Excel-Dateien (Standard: %(default)s)")
+    parser.add_argument('--kerf', type=float, default=DEFAULT_KERF,
+                        help="Schnittbreite für Excel-Dateien (Standard: %(default)s)")
+    parser.add_argument('--per-material', action='store_true', help="Beste Gewichte je Material")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker-Prozesse")
+    parser.add_argument('--output', help="Ergebnis als JSON (HEURISTIC_SCORING) speichern")
+    args = parser.parse_args()
+
+    jobs = [load_job(path, args.bar_length, args.kerf) for path in args.files]
+    baseline = ScoreParams()
+    # The current defaults come first, so they win ties
+    candidates = [baseline] + [params for params in grid(GRID) if params != baseline]
+    print(f"{len(jobs)} Aufträge, {len(candidates)} Parametersätze, {args.workers} Prozesse")
+
+    _init_worker(jobs)
+    reference = evaluate(baseline)
+    best = tune(jobs, candidates, args.per_material, args.workers)
+
+    scoring = {}
+    for key, (params, (bars, waste)) in best.items():
+        if key == 'default':
+            ref_bars = sum(c for c, _ in reference.values())
+            ref_waste = sum(w for _, w in reference.values())
+        else:
+            ref_bars, ref_waste = reference[key]
+        print(f"\n{key}: {bars} Stangen, {waste:.0f}mm Verschnitt "
+              f"(Standard: {ref_bars} Stangen, {ref_waste:.0f}mm)")
+        print(f"  {asdict(params)}")
+        scoring[key] = {'scorer': 'standard', **asdict(params)}
+
+    print("\nHEURISTIC_SCORING = " + json.dumps(scoring, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(scoring, handle, indent=2)
+        print(f"Gespeichert: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Header detection and vectorized validation of input rows.
+
+The header row is searched in the first HEADER_SCAN_ROWS rows by the names
+in HEADER_ALIASES (Länge/Anzahl/Material/Materialname and aliases, compared
+without case, umlauts, spaces and unit), so columns may be in any order and
+preceded by title rows. A unit in the length header ("Länge [cm]", "Länge in
+m") or an optional unit column converts lengths to mm. Without a recognized
+header the EXCEL_COLUMNS positions are used as before.
+
+Values are coerced column by column with pandas (decimal commas included)
+and checked with boolean masks, so a 100k-row import is validated in a few
+pandas operations instead of one exception per bad row. Every rejected row
+(and every row with a rounded quantity) is listed in a ValidationReport with
+its row number in the sheet or file.
+"""
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import EXCEL_COLUMNS, HEADER_ALIASES, HEADER_SCAN_ROWS, INPUT_LENGTH_UNIT, LENGTH_UNITS
+
+KEYS = ('length', 'quantity', 'material', 'name')
+REQUIRED = ('length', 'quantity', 'material')
+
+# Columns of the validated rows
+ROW_COLUMNS = ['length', 'quantity', 'material_code', 'material_name']
+
+MESSAGES = {
+    'material': "Material fehlt",
+    'length_nan': "Länge ist keine Zahl",
+    'length_range': "Länge ≤ 0",
+    'quantity_nan': "Anzahl ist keine Zahl",
+    'quantity_range': "Anzahl < 1",
+    'quantity_fraction': "Anzahl nicht ganzzahlig (abgerundet)",
+    'unit': "Unbekannte Einheit",
+}
+
+_UNITS = '|'.join(sorted(LENGTH_UNITS, key=len, reverse=True))
+_UNIT_PATTERN = re.compile(rf'[(\[]\s*({_UNITS})\s*[)\]]|(?:\bin)?\s+({_UNITS})\s*$')
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+
+def normalize_header(value) -> Tuple[str, Optional[str]]:
+    """
+    Header cell reduced for comparison, and the length unit it names.
+
+    Example: "Länge [cm]" -> ('laenge', 'cm'), "Anzahl" -> ('anzahl', None)
+    """
+    if value is None or value != value:  # None or NaN
+        return '', None
+    text = str(value).strip().lower()
+    unit = None
+    match = _UNIT_PATTERN.search(text)
+    if match:
+        unit = match.group(1) or match.group(2)
+        text = text[:match.start()] + text[match.end():]
+    return re.sub(r'[^a-z0-9]', '', text.translate(_UMLAUTS)), unit
+
+
+_ALIASES = {normalize_header(alias)[0]: key for key, aliases in HEADER_ALIASES.items() for alias in aliases}
+
+
+@dataclass
+class ColumnMapping:
+    """Where the input columns are."""
+    columns: Dict[str, int]       # 'length', 'quantity', 'material', 'name', 'unit' -> column index
+    header_row: Optional[int]     # index of the header row, None if the data has no header
+    unit: str                     # length unit of rows without own unit
+    detected: bool                # True if found by header names, False for EXCEL_COLUMNS
+
+    @property
+    def first_data_row(self) -> int:
+        """Index of the first data row."""
+        return 0 if self.header_row is None else self.header_row + 1
+
+
+@dataclass
+class Issue:
+    """A problem with one input row."""
+    row: int        # row number in the sheet or file (first row = 1)
+    column: str     # 'length', 'quantity', 'material' or 'unit'
+    value: str
+    message: str
+    error: bool = True  # False: the row was kept (e.g. quantity rounded down)
+
+
+@dataclass
+class ValidationReport:
+    """Result of validating the rows of one sheet or file."""
+    mapping: Optional[ColumnMapping] = None
+    rows: int = 0                 # data rows checked (empty rows are skipped)
+    valid: int = 0                # rows taken over
+    units: Dict[str, int] = field(default_factory=dict)  # taken over rows per length unit
+    issues: List[Issue] = field(default_factory=list)
+    seconds: float = field(default=0.0, compare=False)  # time spent validating
+
+    @property
+    def rejected(self) -> int:
+        return self.rows - self.valid
+
+    def counts(self) -> Dict[str, int]:
+        """Number of issues per message."""
+        return dict(Counter(issue.message for issue in self.issues))
+
+    def summary(self) -> str:
+        """One line for the user, e.g. '998 von 1000 Zeilen übernommen (2 verworfen)'."""
+        text = f"{self.valid} von {self.rows} Zeilen übernommen"
+        if self.rejected:
+            text += f" ({self.rejected} verworfen)"
+        converted = {unit: count for unit, count in self.units.items() if unit != 'mm'}
+        if converted:
+            text += ", umgerechnet aus " + ", ".join(f"{unit} ({count})" for unit, count in converted.items())
+        return text
+
+
+def _is_number(value) -> bool:
+    try:
+        number = float(str(value).strip().replace(',', '.'))
+    except (TypeError, ValueError):
+        return False
+    return number == number
+
+
+def detect_columns(rows: Sequence[Sequence], default_unit: str = INPUT_LENGTH_UNIT) -> ColumnMapping:
+    """
+    Find the header row and the input columns.
+
+    Args:
+        rows: The first rows of the sheet or file (cell values)
+        default_unit: Length unit if neither the header nor a unit column names one
+
+    Returns:
+        Mapping found by header names; otherwise the EXCEL_COLUMNS positions
+        with the first row as header (no header if it already holds a length)
+    """
+    for index, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        columns: Dict[str, int] = {}
+        unit = None
+        for position, cell in enumerate(row):
+            text, cell_unit = normalize_header(cell)
+            key = _ALIASES.get(text)
+            if key is not None and key not in columns:
+                columns[key] = position
+                if key == 'length':
+                    unit = cell_unit
+        if all(key in columns for key in REQUIRED):
+            return ColumnMapping(columns, index, unit or default_unit, True)
+
+    columns = {key: EXCEL_COLUMNS[key] for key in KEYS}
+    first = rows[0] if len(rows) else ()
+    has_header = not (len(first) > columns['length'] and _is_number(first[columns['length']]))
+    return ColumnMapping(columns, 0 if has_header else None, default_unit, False)
+
+
+def _text(value) -> str:
+    """Cell value as text; whole floats (e.g. material 4711.0) without decimals."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _distinct(values, convert, empty):
+    """
+    Convert every distinct value of a column once (input columns repeat a lot).
+
+    Returns:
+        Tuple (converted values, mask of missing values: None, NaN or blank text)
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))  # missing values get code -1
+    converted = np.append(convert(uniques), np.array([empty], dtype=object))
+    blank = np.array([isinstance(value, str) and not value.strip() for value in uniques] + [True])
+    return converted[codes], blank[codes]
+
+
+def _numbers(uniques) -> "np.ndarray":
+    """Numbers of distinct raw values, NaN if not numeric (decimal comma allowed)."""
+    import pandas as pd
+
+    values = pd.Series(uniques, dtype=object)
+    numbers = pd.to_numeric(values, errors='coerce')
+    retry = numbers.isna() & values.notna()
+    if retry.any():
+        text = values[retry].astype(str).str.strip().str.replace(',', '.', regex=False)
+        numbers[retry] = pd.to_numeric(text, errors='coerce')
+    return numbers.to_numpy(dtype=float)
+
+
+def _texts(uniques) -> "np.ndarray":
+    import numpy as np
+    return np.array([_text(value) for value in uniques], dtype=object)
+
+
+def validate_columns(columns: Dict[str, Sequence], mapping: ColumnMapping, first_row: int,
+                     report: ValidationReport) -> "pd.DataFrame":
+    """
+    Coerce and check the raw values of a block of rows.
+
+    Args:
+        columns: Raw values per key ('length', 'quantity', 'material' and
+                 optionally 'name' and 'unit'), all of the same length
+        mapping: Column mapping (for the default unit)
+        first_row: Row number of the first value, for the report
+        report: Report to add rows, issues and units to
+
+    Returns:
+        DataFrame with the ROW_COLUMNS of the valid rows, lengths in mm
+    """
+    import numpy as np
+    import pandas as pd
+
+    start = time.perf_counter()
+    material, material_missing = _distinct(columns['material'], _texts, '')
+    length, length_missing = _distinct(columns['length'], _numbers, np.nan)
+    quantity, quantity_missing = _distinct(columns['quantity'], _numbers, np.nan)
+    length, quantity = length.astype(float), quantity.astype(float)
+    checked = ~(length_missing & quantity_missing & material_missing)
+
+    if 'unit' in columns:
+        units, unit_missing = _distinct(columns['unit'], lambda uniques: np.array(
+            [_text(value).lower() for value in uniques], dtype=object), '')
+        units[unit_missing] = mapping.unit
+        factor = np.array([LENGTH_UNITS.get(unit, np.nan) for unit in units], dtype=float) \
+            if len(units) else np.zeros(0)
+        unit_unknown = checked & np.isnan(factor)
+    else:
+        units = None
+        factor = LENGTH_UNITS[mapping.unit]
+        unit_unknown = np.zeros(len(length), dtype=bool)
+
+    length_finite = np.isfinite(length)
+    quantity_finite = np.isfinite(quantity)
+    masks = {
+        'material': (checked & material_missing, 'material', True),
+        'length_nan': (checked & ~length_finite, 'length', True),
+        'length_range': (checked & length_finite & (length <= 0), 'length', True),
+        'quantity_nan': (checked & ~quantity_finite, 'quantity', True),
+        'quantity_range': (checked & quantity_finite & (quantity < 1), 'quantity', True),
+        'unit': (unit_unknown, 'unit', True),
+    }
+    valid = checked.copy()
+    for mask, _, _ in masks.values():
+        valid &= ~mask
+    masks['quantity_fraction'] = (valid & (quantity != np.floor(quantity)), 'quantity', False)
+
+    issues = []
+    for name, (mask, column, error) in masks.items():
+        for index in np.flatnonzero(mask):
+            value = columns[column][index]
+            text = '' if value is None or value != value else str(value)
+            issues.append(Issue(first_row + int(index), column, text, MESSAGES[name], error))
+    issues.sort(key=lambda issue: issue.row)
+
+    material = material[valid]
+    if 'name' in columns:
+        name, name_missing = _distinct(np.asarray(columns['name'], dtype=object)[valid], _texts, '')
+        name = np.where(name_missing, material, name)
+    else:
+        name = material
+    rows = pd.DataFrame({
+        'length': np.round(length[valid] * (factor[valid] if units is not None else factor), 6),
+        'quantity': np.floor(quantity[valid]).astype(int),
+        'material_code': material,
+        'material_name': name,
+    })
+
+    report.rows += int(checked.sum())
+    report.valid += len(rows)
+    counts = Counter(units[valid]) if units is not None else {mapping.unit: len(rows)}
+    for unit, count in counts.items():
+        if count:
+            report.units[unit] = report.units.get(unit, 0) + int(count)
+    report.issues.extend(issues)
+    report.seconds += time.perf_counter() - start
+    return rows
+
+
+def select_columns(rows: Sequence[Sequence], mapping: ColumnMapping) -> Dict[str, list]:
+    """Raw values per key from row lists (short rows padded with None)."""
+    return {key: [row[position] if position < len(row) else None for row in rows]
+            for key, position in mapping.columns.items()}
+
+
+def validate_table(table, default_unit: str = INPUT_LENGTH_UNIT,
+                   report: Optional[ValidationReport] = None) -> Tuple["pd.DataFrame", ValidationReport]:
+    """
+    Detect the columns of a whole sheet and validate its rows.
+
+    Args:
+        table: DataFrame read without header (header=None) or list of row lists
+        default_unit: Length unit if neither the header nor a unit column names one
+        report: Report to add to (default: a new one)
+
+    Returns:
+        Tuple (DataFrame with the ROW_COLUMNS of the valid rows, report)
+    """
+    import pandas as pd
+
+    frame = table if isinstance(table, pd.DataFrame) else pd.DataFrame(list(table))
+    report = report if report is not None else ValidationReport()
+    mapping = detect_columns(frame.head(HEADER_SCAN_ROWS).to_numpy(dtype=object).tolist(), default_unit)
+    report.mapping = mapping
+    if any(mapping.columns[key] >= frame.shape[1] for key in REQUIRED):
+        return pd.DataFrame(columns=ROW_COLUMNS), report
+    data = frame.iloc[mapping.first_data_row:]
+    columns = {key: data.iloc[:, position].to_numpy(dtype=object)
+               for key, position in mapping.columns.items() if position < frame.shape[1]}
+    return validate_columns(columns, mapping, mapping.first_data_row + 1, report), report